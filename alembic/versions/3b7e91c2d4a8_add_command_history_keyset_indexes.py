@@ -0,0 +1,49 @@
+"""Add composite indexes for command history keyset pagination
+
+Revision ID: 3b7e91c2d4a8
+Revises: cea10cff0045
+Create Date: 2026-10-18 11:24:05.118342
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e91c2d4a8"
+down_revision: str | Sequence[str] | None = "cea10cff0045"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_command_history_robot_executed_at",
+        "command_history",
+        ["robot_id", "executed_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_command_history_robot_obstacle_executed_at",
+        "command_history",
+        ["robot_id", "obstacle_detected", "executed_at", "id"],
+        unique=False,
+    )
+    # Superseded by the robot_id prefix of the composite indexes
+    op.drop_index(op.f("ix_command_history_robot_id"), table_name="command_history")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f("ix_command_history_robot_id"),
+        "command_history",
+        ["robot_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_command_history_robot_obstacle_executed_at", table_name="command_history"
+    )
+    op.drop_index("ix_command_history_robot_executed_at", table_name="command_history")
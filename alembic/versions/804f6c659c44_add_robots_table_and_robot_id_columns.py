@@ -0,0 +1,81 @@
+"""Add robots table and robot_id columns for fleet support
+
+Revision ID: 804f6c659c44
+Revises: 59ae276bf76e
+Create Date: 2026-10-18 09:12:40.118304
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision: str = "804f6c659c44"
+down_revision: str | Sequence[str] | None = "59ae276bf76e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "robots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index(op.f("ix_robots_id"), "robots", ["id"], unique=False)
+
+    op.add_column("robot_state", sa.Column("robot_id", sa.Integer(), nullable=True))
+    op.create_unique_constraint(
+        op.f("uq_robot_state_robot_id"), "robot_state", ["robot_id"]
+    )
+    op.create_foreign_key(
+        op.f("fk_robot_state_robot_id_robots"),
+        "robot_state",
+        "robots",
+        ["robot_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+    op.add_column("command_history", sa.Column("robot_id", sa.Integer(), nullable=True))
+    op.create_index(
+        op.f("ix_command_history_robot_id"),
+        "command_history",
+        ["robot_id"],
+        unique=False,
+    )
+    op.create_foreign_key(
+        op.f("fk_command_history_robot_id_robots"),
+        "command_history",
+        "robots",
+        ["robot_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        op.f("fk_command_history_robot_id_robots"),
+        "command_history",
+        type_="foreignkey",
+    )
+    op.drop_index(op.f("ix_command_history_robot_id"), table_name="command_history")
+    op.drop_column("command_history", "robot_id")
+
+    op.drop_constraint(
+        op.f("fk_robot_state_robot_id_robots"), "robot_state", type_="foreignkey"
+    )
+    op.drop_constraint(op.f("uq_robot_state_robot_id"), "robot_state", type_="unique")
+    op.drop_column("robot_state", "robot_id")
+
+    op.drop_index(op.f("ix_robots_id"), table_name="robots")
+    op.drop_table("robots")
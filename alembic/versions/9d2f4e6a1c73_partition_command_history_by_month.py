@@ -0,0 +1,158 @@
+"""Partition command_history by month on executed_at
+
+Revision ID: 9d2f4e6a1c73
+Revises: 3b7e91c2d4a8
+Create Date: 2026-10-18 13:41:52.604217
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision: str = "9d2f4e6a1c73"
+down_revision: str | Sequence[str] | None = "3b7e91c2d4a8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COLUMNS = (
+    "id, robot_id, command, position_x, position_y, direction, "
+    "obstacle_detected, executed_at"
+)
+
+
+def _is_postgresql() -> bool:
+    return bool(op.get_context().dialect.name == "postgresql")
+
+
+def _create_command_history(partitioned: bool) -> None:
+    """Create command_history with ids drawn from the existing sequence"""
+    # The partition key has to be part of the primary key
+    primary_key = ("id", "executed_at") if partitioned else ("id",)
+    kwargs = {"postgresql_partition_by": "RANGE (executed_at)"} if partitioned else {}
+    op.create_table(
+        "command_history",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('command_history_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("robot_id", sa.Integer(), nullable=True),
+        sa.Column("command", sa.Text(), nullable=False),
+        sa.Column("position_x", sa.Integer(), nullable=True),
+        sa.Column("position_y", sa.Integer(), nullable=True),
+        sa.Column("direction", sa.String(length=10), nullable=True),
+        sa.Column("obstacle_detected", sa.Boolean(), nullable=False),
+        sa.Column("executed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["robot_id"],
+            ["robots.id"],
+            name=op.f("fk_command_history_robot_id_robots"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(*primary_key, name="command_history_pkey"),
+        **kwargs,
+    )
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        op.f("ix_command_history_id"), "command_history", ["id"], unique=False
+    )
+    op.create_index(
+        "ix_command_history_robot_executed_at",
+        "command_history",
+        ["robot_id", "executed_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_command_history_robot_obstacle_executed_at",
+        "command_history",
+        ["robot_id", "obstacle_detected", "executed_at", "id"],
+        unique=False,
+    )
+
+
+def _set_aside(old_name: str) -> None:
+    """Rename command_history out of the way, freeing its index names"""
+    op.drop_index(
+        "ix_command_history_robot_obstacle_executed_at", table_name="command_history"
+    )
+    op.drop_index("ix_command_history_robot_executed_at", table_name="command_history")
+    op.drop_index(op.f("ix_command_history_id"), table_name="command_history")
+    op.execute(
+        "ALTER TABLE command_history RENAME CONSTRAINT command_history_pkey "
+        f"TO {old_name}_pkey"
+    )
+    op.rename_table("command_history", old_name)
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE command_history_id_seq OWNED BY NONE")
+
+
+def _take_over(old_name: str) -> None:
+    op.execute(
+        f"INSERT INTO command_history ({COLUMNS}) SELECT {COLUMNS} FROM {old_name}"
+    )
+    op.drop_table(old_name)
+    op.execute("ALTER SEQUENCE command_history_id_seq OWNED BY command_history.id")
+    _create_indexes()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Range partitioning is PostgreSQL only; other databases keep one table
+    if not _is_postgresql():
+        return
+
+    _set_aside("command_history_unpartitioned")
+    _create_command_history(partitioned=True)
+
+    # Rows outside every monthly partition land here until maintenance moves
+    # them into a partition of their own
+    op.execute(
+        "CREATE TABLE command_history_default PARTITION OF command_history DEFAULT"
+    )
+    # One partition per month from the oldest row through next month
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month date := date_trunc(
+                'month',
+                coalesce(
+                    (SELECT min(executed_at) FROM command_history_unpartitioned),
+                    now() AT TIME ZONE 'utc'
+                )
+            );
+            last_month date := date_trunc('month', now() AT TIME ZONE 'utc')
+                + interval '1 month';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF command_history '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'command_history_' || to_char(month, 'YYYY_MM'),
+                    month,
+                    month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+    _take_over("command_history_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Partitions detached or archived by maintenance are not restored
+    if not _is_postgresql():
+        return
+
+    _set_aside("command_history_partitioned")
+    _create_command_history(partitioned=False)
+    _take_over("command_history_partitioned")
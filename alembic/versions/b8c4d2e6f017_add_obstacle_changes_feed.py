@@ -0,0 +1,37 @@
+"""Add obstacle_changes table as the obstacle map change feed
+
+Revision ID: b8c4d2e6f017
+Revises: e5a1b7c3f902
+Create Date: 2026-10-18 16:48:09.731552
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c4d2e6f017"
+down_revision: str | Sequence[str] | None = "e5a1b7c3f902"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "obstacle_changes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=10), nullable=False),
+        sa.Column("position_x", sa.Integer(), nullable=True),
+        sa.Column("position_y", sa.Integer(), nullable=True),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("obstacle_changes")
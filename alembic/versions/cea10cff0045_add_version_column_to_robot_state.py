@@ -0,0 +1,32 @@
+"""Add version column to robot_state for optimistic locking
+
+Revision ID: cea10cff0045
+Revises: 804f6c659c44
+Create Date: 2026-10-18 10:02:17.553019
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision: str = "cea10cff0045"
+down_revision: str | Sequence[str] | None = "804f6c659c44"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "robot_state",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("robot_state", "version")
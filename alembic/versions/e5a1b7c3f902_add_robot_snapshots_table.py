@@ -0,0 +1,52 @@
+"""Add robot_snapshots table for point-in-time pose replay
+
+Revision ID: e5a1b7c3f902
+Revises: 9d2f4e6a1c73
+Create Date: 2026-10-18 15:12:37.290114
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1b7c3f902"
+down_revision: str | Sequence[str] | None = "9d2f4e6a1c73"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "robot_snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("robot_id", sa.Integer(), nullable=True),
+        sa.Column("history_id", sa.Integer(), nullable=True),
+        sa.Column("position_x", sa.Integer(), nullable=False),
+        sa.Column("position_y", sa.Integer(), nullable=False),
+        sa.Column("direction", sa.String(length=10), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["robot_id"],
+            ["robots.id"],
+            name=op.f("fk_robot_snapshots_robot_id_robots"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_robot_snapshots_robot_taken_at",
+        "robot_snapshots",
+        ["robot_id", "taken_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_robot_snapshots_robot_taken_at", table_name="robot_snapshots")
+    op.drop_table("robot_snapshots")
@@ -0,0 +1,43 @@
+"""Make robot snapshots unique per robot and history row
+
+Revision ID: f3c9a1d7e214
+Revises: b8c4d2e6f017
+Create Date: 2026-10-18 17:02:11.418305
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op  # type: ignore[attr-defined]
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c9a1d7e214"
+down_revision: str | Sequence[str] | None = "b8c4d2e6f017"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Drop the duplicates written by concurrent workers, keeping the oldest
+    op.execute(
+        """
+        DELETE FROM robot_snapshots AS s
+        USING robot_snapshots AS t
+        WHERE s.robot_id IS NOT DISTINCT FROM t.robot_id
+          AND s.history_id IS NOT DISTINCT FROM t.history_id
+          AND s.id > t.id
+        """
+    )
+    op.create_index(
+        "uq_robot_snapshots_robot_history",
+        "robot_snapshots",
+        ["robot_id", "history_id"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_robot_snapshots_robot_history", table_name="robot_snapshots")
@@ -0,0 +1,106 @@
+import asyncio
+import base64
+import logging
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.command_processor import CommandProcessor
+from src.services.database import get_db
+from src.services.obstacle_index import ObstacleIndex, current_map_version
+from src.services.reachability import reachability_cache, reachable_cells
+from src.services.robot_service import reach_bounds
+from src.services.robot_state_service import load_robot_state, robot_from_state
+
+logger = logging.getLogger(__name__)
+
+DBSession = Annotated[AsyncSession, Depends(get_db)]
+
+router = APIRouter()
+
+MAX_RADIUS = 1000
+
+Radius = Annotated[int, Query(ge=0, le=MAX_RADIUS)]
+Encoding = Literal["rle", "bitmap"]
+
+
+class ReachableResponse(BaseModel):
+    start: dict[str, int]
+    radius: int
+    map_version: int
+    count: int
+    origin: dict[str, int]
+    size: int
+    runs: list[tuple[int, int, int]] | None = None
+    bitmap: str | None = None
+
+
+async def _reachable(
+    db: AsyncSession, robot_id: int | None, radius: int, encoding: Encoding
+) -> ReachableResponse:
+    try:
+        robot_state = await load_robot_state(db, robot_id)
+        if robot_id is not None and not robot_state:
+            raise HTTPException(status_code=404, detail="Robot not found")
+        robot = robot_from_state(robot_state)
+        start = robot.position
+
+        obstacles = await CommandProcessor(db).get_obstacles(
+            reach_bounds(start, radius)
+        )
+        index = obstacles if isinstance(obstacles, ObstacleIndex) else None
+        if index is not None:
+            map_version = index.map_version
+            key = (start, radius, index.version)
+        else:
+            map_version = await current_map_version(db)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while analysing reachability: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    # Results are only cached against the in-memory index, whose version
+    # changes with every write to the map
+    reachable = reachability_cache.get(key) if index is not None else None
+    if reachable is None:
+        reachable = await asyncio.to_thread(reachable_cells, start, radius, obstacles)
+        # Skip caching when the map changed while the search ran
+        if index is not None and key == (start, radius, index.version):
+            reachability_cache.put(key, reachable)
+
+    response = ReachableResponse(
+        start={"x": start.x, "y": start.y},
+        radius=radius,
+        map_version=map_version,
+        count=reachable.count,
+        origin={"x": reachable.origin.x, "y": reachable.origin.y},
+        size=reachable.size,
+    )
+    if encoding == "bitmap":
+        response.bitmap = base64.b64encode(reachable.bits).decode()
+    else:
+        response.runs = reachable.runs()
+    return response
+
+
+@router.get("/analysis/reachable", response_model=ReachableResponse)
+async def get_reachable(
+    radius: Radius, db: DBSession, encoding: Encoding = "rle"
+) -> ReachableResponse:
+    """
+    Return every cell the robot can reach in at most ``radius`` moves
+    without entering an obstacle, as row runs or as a packed bitmap.
+    """
+    return await _reachable(db, None, radius, encoding)
+
+
+@router.get("/robots/{robot_id}/analysis/reachable", response_model=ReachableResponse)
+async def get_robot_reachable(
+    robot_id: int, radius: Radius, db: DBSession, encoding: Encoding = "rle"
+) -> ReachableResponse:
+    """
+    Return every cell a fleet robot can reach in at most ``radius`` moves.
+    """
+    return await _reachable(db, robot_id, radius, encoding)
@@ -1,16 +1,38 @@
+import json
 import logging
-from typing import Annotated
+from collections.abc import Iterator
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from sqlalchemy.orm.exc import StaleDataError
 
-from src.models import Direction, Robot
 from src.models.command_history import CommandHistory
-from src.models.robot_state import RobotState
+from src.models.robot import Robot
+from src.services.command_dispatcher import command_dispatcher
 from src.services.command_processor import CommandProcessor
+from src.services.command_program import (
+    MAX_COMMAND_LENGTH,
+    CommandSyntaxError,
+    parse_commands,
+)
 from src.services.database import get_db
+from src.services.execution_cache import execution_cache
+from src.services.history_writer import history_writer
+from src.services.occupancy_index import CellOccupiedError, occupancy_index
+from src.services.robot_service import Trajectory
+from src.services.robot_state_service import (
+    PositionRangeError,
+    apply_result,
+    check_position_range,
+    history_row,
+    load_robot_state,
+    robot_from_state,
+)
+from src.services.status_cache import RobotStatus, status_cache
 from src.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -19,6 +41,8 @@ DBSession = Annotated[AsyncSession, Depends(get_db)]
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 500
+
 
 class CommandRequest(BaseModel):
     command: str
@@ -30,73 +54,186 @@ class CommandResponse(BaseModel):
     obstacle_detected: bool = False
 
 
-@router.post("/commands", response_model=CommandResponse)
-async def execute_commands(request: CommandRequest, db: DBSession) -> CommandResponse:
-    """
-    Execute a string of commands and return the final position.
-    """
-    try:
-        if len(request.command) > 1000:
-            raise HTTPException(status_code=400, detail="Command string too long")
+class BatchCommandRequest(BaseModel):
+    commands: list[str]
 
-        stmt = select(RobotState).order_by(RobotState.updated_at.desc()).limit(1)
-        result = await db.execute(stmt)
-        robot_state = result.scalars().first()
 
-        if not robot_state:
-            start_position = settings.start_position
-            start_direction = Direction[settings.start_direction]
-            robot = Robot(position=start_position, direction=start_direction)
-        else:
-            robot = Robot(
-                position=(robot_state.position_x, robot_state.position_y),
-                direction=Direction[robot_state.direction],
-            )
+class BatchCommandResponse(BaseModel):
+    results: list[CommandResponse]
 
-        command_processor = CommandProcessor(db)
-        command_result = await command_processor.process_commands(
-            request.command, (robot.position.x, robot.position.y), robot.direction
+
+class ExecutionCacheResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    size: int
+    max_size: int
+    hit_ratio: float
+
+
+def _check_commands(commands: list[str]) -> None:
+    """Reject over-long or malformed command strings before touching state"""
+    if any(len(command) > MAX_COMMAND_LENGTH for command in commands):
+        raise HTTPException(status_code=400, detail="Command string too long")
+    try:
+        for command in commands:
+            parse_commands(command)
+    except CommandSyntaxError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+def _reserve_cell(
+    robot_id: int | None, command_result: dict[str, Any]
+) -> tuple[int, int]:
+    """Move the robot to its new cell in the occupancy index before committing"""
+    position = (command_result["position"]["x"], command_result["position"]["y"])
+    if not occupancy_index.try_move(robot_id, position):
+        raise HTTPException(
+            status_code=409, detail="Target cell is occupied by another robot"
         )
+    return position
 
-        x_position = command_result["position"]["x"]
-        y_position = command_result["position"]["y"]
-        direction = command_result["direction"]
-        obstacle_detected = command_result["obstacle_detected"]
 
-        try:
-            command_history = CommandHistory(
-                command=request.command,
-                position_x=x_position,
-                position_y=y_position,
-                direction=direction,
-                obstacle_detected=obstacle_detected,
-            )
-            db.add(command_history)
+def _release_cell(robot_id: int | None, previous: tuple[int, int] | None) -> None:
+    """Undo a reservation after the state write failed"""
+    if previous is None or not occupancy_index.try_move(robot_id, previous):
+        # The next reload puts the robot back on its committed cell
+        occupancy_index.remove(robot_id)
+    else:
+        occupancy_index.settle(robot_id, previous)
+
+
+async def _insert_history(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if len(rows) == 1:
+        db.add(CommandHistory(**rows[0]))
+    else:
+        await db.execute(insert(CommandHistory), rows)
+
+
+def _ndjson(steps: Iterator[dict[str, Any]]) -> Iterator[str]:
+    for step in steps:
+        yield json.dumps(step) + "\n"
 
-            if not robot_state:
-                robot_state = RobotState(
-                    position_x=x_position, position_y=y_position, direction=direction
+
+async def _execute_and_save(
+    db: AsyncSession,
+    commands: list[str],
+    robot_id: int | None,
+    trajectory: Trajectory | None = None,
+) -> tuple[Robot, list[dict[str, Any]]]:
+    """
+    Execute command strings against the robot's current state and persist
+    the results. The state row is versioned, so a concurrent update makes
+    the commit fail; the commands are then re-executed against the fresh
+    state, up to STATE_UPDATE_RETRIES times.
+    Returns the starting robot and the result after each command string.
+    A single command string can record its steps into ``trajectory``.
+    """
+    for attempt in range(1, settings.STATE_UPDATE_RETRIES + 1):
+        robot_state = await load_robot_state(db, robot_id)
+        if robot_id is not None and not robot_state:
+            raise HTTPException(status_code=404, detail="Robot not found")
+        robot = robot_from_state(robot_state)
+        start_position = (robot.position.x, robot.position.y)
+
+        command_processor = CommandProcessor(db)
+        if len(commands) == 1:
+            command_results = [
+                await command_processor.process_commands(
+                    commands[0],
+                    start_position,
+                    robot.direction,
+                    robot_id=robot_id,
+                    trajectory=trajectory,
                 )
-                db.add(robot_state)
-            else:
-                robot_state.position_x = x_position
-                robot_state.position_y = y_position
-                robot_state.direction = direction
+            ]
+        else:
+            command_results = await command_processor.process_batch(
+                commands, start_position, robot.direction, robot_id=robot_id
+            )
 
+        try:
+            check_position_range(command_results)
+        except PositionRangeError as e:
+            raise HTTPException(status_code=422, detail=str(e)) from e
+
+        rows = [
+            history_row(command, command_result, robot_id)
+            for command, command_result in zip(commands, command_results, strict=True)
+        ]
+        previous = occupancy_index.position_of(robot_id)
+        reserved = _reserve_cell(robot_id, command_results[-1])
+        try:
+            # With write-behind, rows are queued once the state has committed
+            if not settings.HISTORY_WRITE_BEHIND:
+                await _insert_history(db, rows)
+            apply_result(db, robot_state, command_results[-1], robot_id)
             await db.commit()
+        except StaleDataError:
+            await db.rollback()
+            _release_cell(robot_id, previous)
+            logger.warning(
+                f"Robot state changed concurrently, retrying (attempt {attempt})"
+            )
+            continue
         except Exception as e:
             await db.rollback()
+            _release_cell(robot_id, previous)
             logger.error(f"Error saving command history: {e}")
             raise HTTPException(
                 status_code=500, detail="Failed to save command history"
             ) from e
 
-        response_data = {
-            "position": {"x": x_position, "y": y_position},
-            "direction": direction,
-            "obstacle_detected": obstacle_detected,
-        }
-        return CommandResponse(**response_data)
+        occupancy_index.settle(robot_id, reserved)
+        status_cache.put(robot_id, RobotStatus.from_result(command_results[-1]))
+        if settings.HISTORY_WRITE_BEHIND:
+            await history_writer.add(rows)
+        return robot, command_results
+
+    raise HTTPException(
+        status_code=409, detail="Robot state was updated concurrently, retry later"
+    )
+
+
+async def _dispatch(
+    commands: list[str], robot_id: int | None, trajectory: Trajectory | None = None
+) -> tuple[Robot, list[dict[str, Any]]]:
+    """Execute through the per-robot command queue instead of the request session"""
+    try:
+        return await command_dispatcher.execute(commands, robot_id, trajectory)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail="Robot not found") from e
+    except CellOccupiedError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except PositionRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+
+async def _run_commands(
+    request: CommandRequest, db: AsyncSession, stream: bool, robot_id: int | None
+) -> CommandResponse | Response:
+    try:
+        _check_commands([request.command])
+
+        # Streaming replays the steps of the execution that was persisted
+        trajectory = Trajectory() if stream else None
+        if settings.COMMAND_QUEUE_ENABLED:
+            _, command_results = await _dispatch(
+                [request.command], robot_id, trajectory
+            )
+        else:
+            _, command_results = await _execute_and_save(
+                db, [request.command], robot_id, trajectory
+            )
+
+        if trajectory is not None:
+            return StreamingResponse(
+                _ndjson(trajectory.steps()), media_type="application/x-ndjson"
+            )
+
+        return CommandResponse(**command_results[0])
 
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -104,3 +241,84 @@ async def execute_commands(request: CommandRequest, db: DBSession) -> CommandRes
     except Exception as e:
         logger.error(f"Error executing commands: {e}")
         raise HTTPException(status_code=500, detail="Internal server error") from e
+
+
+async def _run_command_batch(
+    request: BatchCommandRequest, db: AsyncSession, robot_id: int | None
+) -> BatchCommandResponse:
+    try:
+        if len(request.commands) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail="Too many command strings")
+        _check_commands(request.commands)
+
+        if not request.commands:
+            if robot_id is not None and not await load_robot_state(db, robot_id):
+                raise HTTPException(status_code=404, detail="Robot not found")
+            return BatchCommandResponse(results=[])
+
+        if settings.COMMAND_QUEUE_ENABLED:
+            _, command_results = await _dispatch(request.commands, robot_id)
+        else:
+            _, command_results = await _execute_and_save(db, request.commands, robot_id)
+
+        return BatchCommandResponse(
+            results=[CommandResponse(**result) for result in command_results]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error executing command batch: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error") from e
+
+
+@router.post("/commands", response_model=CommandResponse)
+async def execute_commands(
+    request: CommandRequest, db: DBSession, stream: bool = False
+) -> CommandResponse | Response:
+    """
+    Execute a string of commands and return the final position.
+    With ``stream=true`` the final state is persisted first and the
+    trajectory is then streamed as NDJSON, one line per command.
+    """
+    return await _run_commands(request, db, stream, robot_id=None)
+
+
+@router.post("/commands/batch", response_model=BatchCommandResponse)
+async def execute_command_batch(
+    request: BatchCommandRequest, db: DBSession
+) -> BatchCommandResponse:
+    """
+    Execute several command strings in sequence and return the position
+    after each one. History is inserted in bulk and committed once.
+    """
+    return await _run_command_batch(request, db, robot_id=None)
+
+
+@router.post("/robots/{robot_id}/commands", response_model=CommandResponse)
+async def execute_robot_commands(
+    robot_id: int, request: CommandRequest, db: DBSession, stream: bool = False
+) -> CommandResponse | Response:
+    """
+    Execute a string of commands on a fleet robot and return its final position.
+    """
+    return await _run_commands(request, db, stream, robot_id=robot_id)
+
+
+@router.post("/robots/{robot_id}/commands/batch", response_model=BatchCommandResponse)
+async def execute_robot_command_batch(
+    robot_id: int, request: BatchCommandRequest, db: DBSession
+) -> BatchCommandResponse:
+    """
+    Execute several command strings in sequence on a fleet robot.
+    """
+    return await _run_command_batch(request, db, robot_id=robot_id)
+
+
+@router.get("/commands/cache", response_model=ExecutionCacheResponse)
+async def get_execution_cache_metrics() -> ExecutionCacheResponse:
+    """
+    Returns hit, miss and eviction counts of this worker's cache of
+    command string results.
+    """
+    return ExecutionCacheResponse(**execution_cache.metrics())
@@ -0,0 +1,206 @@
+import base64
+import binascii
+import json
+import logging
+from datetime import UTC, datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.models.command_history import CommandHistory
+from src.models.robot_record import RobotRecord
+from src.services.database import get_db
+from src.services.state_snapshots import pose_at
+
+logger = logging.getLogger(__name__)
+
+DBSession = Annotated[AsyncSession, Depends(get_db)]
+
+router = APIRouter()
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class HistoryEntry(BaseModel):
+    id: int
+    command: str
+    position: dict[str, int | None]
+    direction: str | None
+    obstacle_detected: bool
+    executed_at: datetime
+
+
+class HistoryPage(BaseModel):
+    items: list[HistoryEntry]
+    next_cursor: str | None = None
+
+
+class PoseResponse(BaseModel):
+    position: dict[str, int]
+    direction: str
+    at: datetime
+
+
+def encode_cursor(executed_at: datetime, entry_id: int) -> str:
+    payload = json.dumps([executed_at.isoformat(), entry_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        executed_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(executed_at), int(entry_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def _as_utc(value: datetime) -> datetime:
+    """executed_at is stored as naive UTC"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+async def _read_history(
+    db: AsyncSession,
+    robot_id: int | None,
+    limit: int,
+    cursor: str | None,
+    since: datetime | None,
+    until: datetime | None,
+    obstacle_detected: bool | None,
+) -> HistoryPage:
+    """
+    Read one page of a robot's history, newest first. Pages are keyed on
+    (executed_at, id) rather than an OFFSET, so every page is an index range
+    scan no matter how deep the client has paged.
+    """
+    stmt = select(CommandHistory)
+    if robot_id is None:
+        stmt = stmt.where(CommandHistory.robot_id.is_(None))
+    else:
+        stmt = stmt.where(CommandHistory.robot_id == robot_id)
+    if obstacle_detected is not None:
+        stmt = stmt.where(CommandHistory.obstacle_detected == obstacle_detected)
+    if since is not None:
+        stmt = stmt.where(CommandHistory.executed_at >= _as_utc(since))
+    if until is not None:
+        stmt = stmt.where(CommandHistory.executed_at < _as_utc(until))
+    if cursor is not None:
+        stmt = stmt.where(
+            tuple_(CommandHistory.executed_at, CommandHistory.id)
+            < tuple_(*decode_cursor(cursor))
+        )
+    stmt = stmt.order_by(
+        CommandHistory.executed_at.desc(), CommandHistory.id.desc()
+    ).limit(limit + 1)
+
+    try:
+        if robot_id is not None and not await db.get(RobotRecord, robot_id):
+            raise HTTPException(status_code=404, detail="Robot not found")
+        result = await db.execute(stmt)
+        entries = list(result.scalars().all())
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while reading command history: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1].executed_at, entries[-1].id)
+
+    return HistoryPage(
+        items=[
+            HistoryEntry(
+                id=entry.id,
+                command=entry.command,
+                position={"x": entry.position_x, "y": entry.position_y},
+                direction=entry.direction,
+                obstacle_detected=entry.obstacle_detected,
+                executed_at=entry.executed_at,
+            )
+            for entry in entries
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+async def _read_pose(
+    db: AsyncSession, robot_id: int | None, at: datetime
+) -> PoseResponse:
+    at = _as_utc(at)
+    try:
+        if robot_id is not None:
+            robot_record = await db.get(RobotRecord, robot_id)
+            if not robot_record or robot_record.created_at > at:
+                raise HTTPException(status_code=404, detail="Robot not found")
+        robot = await pose_at(db, robot_id, at)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while replaying command history: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    return PoseResponse(
+        position={"x": robot.position.x, "y": robot.position.y},
+        direction=robot.direction.value,
+        at=at,
+    )
+
+
+PageSize = Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)]
+
+
+@router.get("/history", response_model=HistoryPage)
+async def get_history(
+    db: DBSession,
+    limit: PageSize = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    obstacle_detected: bool | None = None,
+) -> HistoryPage:
+    """
+    Returns the robot's command history, newest first. Pass ``next_cursor``
+    from a response as ``cursor`` to fetch the following page.
+    """
+    return await _read_history(db, None, limit, cursor, since, until, obstacle_detected)
+
+
+@router.get("/robots/{robot_id}/history", response_model=HistoryPage)
+async def get_robot_history(
+    robot_id: int,
+    db: DBSession,
+    limit: PageSize = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    obstacle_detected: bool | None = None,
+) -> HistoryPage:
+    """
+    Returns a fleet robot's command history, newest first.
+    """
+    return await _read_history(
+        db, robot_id, limit, cursor, since, until, obstacle_detected
+    )
+
+
+@router.get("/history/pose", response_model=PoseResponse)
+async def get_pose_at(at: datetime, db: DBSession) -> PoseResponse:
+    """
+    Returns the robot's position and direction at the given time, replayed
+    from the nearest state snapshot.
+    """
+    return await _read_pose(db, None, at)
+
+
+@router.get("/robots/{robot_id}/history/pose", response_model=PoseResponse)
+async def get_robot_pose_at(robot_id: int, at: datetime, db: DBSession) -> PoseResponse:
+    """
+    Returns a fleet robot's position and direction at the given time.
+    """
+    return await _read_pose(db, robot_id, at)
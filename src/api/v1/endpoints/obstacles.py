@@ -0,0 +1,177 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.models.obstacle import Obstacle
+from src.models.robot import Position
+from src.services.database import get_db
+from src.services.obstacle_index import (
+    current_map_version,
+    obstacle_index,
+    record_obstacle_change,
+)
+from src.services.obstacle_ingest import (
+    IngestError,
+    IngestFormat,
+    ingest_obstacles,
+    read_obstacles,
+)
+from src.services.occupancy_index import occupancy_index
+
+logger = logging.getLogger(__name__)
+
+DBSession = Annotated[AsyncSession, Depends(get_db)]
+
+router = APIRouter()
+
+CONTENT_TYPES: dict[str, IngestFormat] = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/octet-stream": "grid",
+}
+
+
+MAX_REGION_OBSTACLES = 10_000
+
+
+class ObstacleRequest(BaseModel):
+    x: int
+    y: int
+
+
+class ObstacleResponse(BaseModel):
+    x: int
+    y: int
+    version: int
+
+
+class RegionResponse(BaseModel):
+    obstacles: list[dict[str, int]]
+    version: int
+
+
+class BulkObstacleResponse(BaseModel):
+    received: int
+    inserted: int
+    occupied: int
+
+
+@router.post("/obstacles/bulk", response_model=BulkObstacleResponse)
+async def bulk_load_obstacles(
+    request: Request, db: DBSession, format: IngestFormat | None = None
+) -> BulkObstacleResponse:
+    """
+    Load obstacles in bulk from a CSV (``x,y`` per line), NDJSON
+    (``{"x": 1, "y": 2}`` per line) or binary grid request body. The format
+    is taken from ``format`` or the Content-Type header. Cells that already
+    hold an obstacle are skipped, and so are cells occupied by a robot.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    ingest_format = format or CONTENT_TYPES.get(content_type)
+    if ingest_format is None:
+        raise HTTPException(status_code=415, detail="Unsupported obstacle format")
+
+    try:
+        result = await ingest_obstacles(
+            db, read_obstacles(request.stream(), ingest_format)
+        )
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while loading obstacles: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    return BulkObstacleResponse(
+        received=result.received, inserted=result.inserted, occupied=result.occupied
+    )
+
+
+@router.get("/obstacles", response_model=RegionResponse)
+async def get_obstacles_in_region(
+    min_x: int, min_y: int, max_x: int, max_y: int, db: DBSession
+) -> RegionResponse:
+    """
+    List the obstacles inside an inclusive rectangle, together with the map
+    version they were read at.
+    """
+    if min_x > max_x or min_y > max_y:
+        raise HTTPException(status_code=400, detail="Empty region")
+    try:
+        version = await current_map_version(db)
+        result = await db.execute(
+            select(Obstacle.position_x, Obstacle.position_y)
+            .where(
+                Obstacle.position_x.between(min_x, max_x),
+                Obstacle.position_y.between(min_y, max_y),
+            )
+            .order_by(Obstacle.position_x, Obstacle.position_y)
+            .limit(MAX_REGION_OBSTACLES + 1)
+        )
+        rows = result.all()
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while querying obstacles: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    if len(rows) > MAX_REGION_OBSTACLES:
+        raise HTTPException(
+            status_code=400, detail="Region holds too many obstacles, narrow it"
+        )
+    return RegionResponse(
+        obstacles=[{"x": x, "y": y} for x, y in rows], version=version
+    )
+
+
+@router.post("/obstacles", response_model=ObstacleResponse, status_code=201)
+async def create_obstacle(request: ObstacleRequest, db: DBSession) -> ObstacleResponse:
+    """
+    Place an obstacle on a free cell.
+    """
+    position = Position(request.x, request.y)
+    occupancy = await occupancy_index.refresh(db)
+    if occupancy.is_occupied(position):
+        raise HTTPException(status_code=409, detail="Cell is occupied by a robot")
+    try:
+        db.add(Obstacle(position_x=position.x, position_y=position.y))
+        await db.flush()
+        change = await record_obstacle_change(db, "add", position)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Obstacle already exists") from e
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error while creating obstacle: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    obstacle_index.add(position, change.id)
+    return ObstacleResponse(x=position.x, y=position.y, version=change.id)
+
+
+@router.delete("/obstacles/{x}/{y}", response_model=ObstacleResponse)
+async def delete_obstacle(x: int, y: int, db: DBSession) -> ObstacleResponse:
+    """
+    Remove the obstacle at a cell.
+    """
+    position = Position(x, y)
+    try:
+        result = await db.execute(
+            select(Obstacle).where(Obstacle.position_x == x, Obstacle.position_y == y)
+        )
+        obstacle = result.scalars().first()
+        if obstacle is None:
+            raise HTTPException(status_code=404, detail="Obstacle not found")
+        await db.delete(obstacle)
+        change = await record_obstacle_change(db, "remove", position)
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error while deleting obstacle: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    obstacle_index.discard(position, change.id)
+    return ObstacleResponse(x=x, y=y, version=change.id)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.command_processor import CommandProcessor
+from src.services.command_program import MAX_COMMAND_LENGTH, compress
+from src.services.database import get_db
+from src.services.path_planner import PlanningError, plan_path, search_bounds
+from src.services.robot_state_service import load_robot_state, robot_from_state
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DBSession = Annotated[AsyncSession, Depends(get_db)]
+
+router = APIRouter()
+
+
+class PlanResponse(BaseModel):
+    commands: str
+    cost: int
+    start: dict[str, int]
+    direction: str
+    target: dict[str, int]
+    nodes_expanded: int
+
+
+async def _plan(db: AsyncSession, robot_id: int | None, x: int, y: int) -> PlanResponse:
+    try:
+        robot_state = await load_robot_state(db, robot_id)
+        if robot_id is not None and not robot_state:
+            raise HTTPException(status_code=404, detail="Robot not found")
+        robot = robot_from_state(robot_state)
+        start = (robot.position.x, robot.position.y)
+
+        bounds = search_bounds(start, (x, y), settings.PLAN_SEARCH_MARGIN)
+        command_processor = CommandProcessor(db)
+        obstacles = await command_processor.get_obstacles(bounds)
+        # The search runs in a thread: don't hand it the live robot positions
+        blocked = await command_processor.get_blocked(
+            obstacles, robot_id, snapshot=True
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while planning a path: {e}")
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    try:
+        # The search is CPU-bound; keep the event loop serving other requests
+        plan = await asyncio.to_thread(
+            plan_path, start, robot.direction, (x, y), blocked
+        )
+    except PlanningError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+    # Run-length output keeps long straight legs within the command limit
+    commands = compress(plan.commands)
+    if len(commands) > MAX_COMMAND_LENGTH:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Plan needs more than {MAX_COMMAND_LENGTH} command characters",
+        )
+
+    return PlanResponse(
+        commands=commands,
+        cost=plan.cost,
+        start={"x": start[0], "y": start[1]},
+        direction=robot.direction.value,
+        target={"x": x, "y": y},
+        nodes_expanded=plan.nodes_expanded,
+    )
+
+
+@router.get("/plan", response_model=PlanResponse)
+async def plan_route(x: int, y: int, db: DBSession) -> PlanResponse:
+    """
+    Plan the cheapest command string that takes the robot from its current
+    pose to (x, y) around obstacles and other robots.
+    """
+    return await _plan(db, robot_id=None, x=x, y=y)
+
+
+@router.get("/robots/{robot_id}/plan", response_model=PlanResponse)
+async def plan_robot_route(
+    robot_id: int, x: int, y: int, db: DBSession
+) -> PlanResponse:
+    """
+    Plan the cheapest command string that takes a fleet robot to (x, y).
+    """
+    return await _plan(db, robot_id=robot_id, x=x, y=y)
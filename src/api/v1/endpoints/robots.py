@@ -0,0 +1,119 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.models.robot import Direction
+from src.models.robot_record import RobotRecord
+from src.models.robot_snapshot import RobotSnapshot
+from src.models.robot_state import RobotState
+from src.services.database import get_db
+from src.services.occupancy_index import occupancy_index
+from src.services.status_cache import RobotStatus, status_cache
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DBSession = Annotated[AsyncSession, Depends(get_db)]
+
+router = APIRouter()
+
+
+class RobotCreateRequest(BaseModel):
+    name: str
+    position: dict[str, int] | None = None
+    direction: Direction | None = None
+
+
+class RobotResponse(BaseModel):
+    id: int
+    name: str
+    position: dict[str, int]
+    direction: str
+
+
+@router.post("/robots", response_model=RobotResponse, status_code=201)
+async def register_robot(request: RobotCreateRequest, db: DBSession) -> RobotResponse:
+    """
+    Register a fleet robot together with its initial state.
+    """
+    x_position, y_position = settings.start_position
+    if request.position is not None:
+        x_position, y_position = request.position["x"], request.position["y"]
+    direction = (request.direction or Direction[settings.start_direction]).value
+
+    robot = RobotRecord(name=request.name)
+    robot_id: int | None = None
+    try:
+        db.add(robot)
+        await db.flush()
+        if not occupancy_index.try_move(robot.id, (x_position, y_position)):
+            raise HTTPException(status_code=409, detail="Cell is occupied by a robot")
+        robot_id = robot.id
+        db.add(
+            RobotState(
+                robot_id=robot_id,
+                position_x=x_position,
+                position_y=y_position,
+                direction=direction,
+            )
+        )
+        # Starting point for replaying the robot's history
+        db.add(
+            RobotSnapshot(
+                robot_id=robot_id,
+                position_x=x_position,
+                position_y=y_position,
+                direction=direction,
+                taken_at=robot.created_at,
+            )
+        )
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        if robot_id is not None:
+            occupancy_index.remove(robot_id)
+        raise HTTPException(status_code=409, detail="Robot already exists") from e
+    except Exception as e:
+        await db.rollback()
+        if robot_id is not None:
+            occupancy_index.remove(robot_id)
+        logger.error(f"Error registering robot: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error") from e
+
+    occupancy_index.settle(robot.id, (x_position, y_position))
+    status_cache.put(robot.id, RobotStatus(x_position, y_position, direction))
+    return RobotResponse(
+        id=robot.id,
+        name=robot.name,
+        position={"x": x_position, "y": y_position},
+        direction=direction,
+    )
+
+
+@router.get("/robots", response_model=list[RobotResponse])
+async def list_robots(db: DBSession) -> list[RobotResponse]:
+    """
+    List the registered fleet robots with their current state.
+    """
+    result = await db.execute(
+        select(RobotRecord, RobotState)
+        .join(RobotState, RobotState.robot_id == RobotRecord.id)
+        .order_by(RobotRecord.id)
+    )
+    return [
+        RobotResponse(
+            id=robot.id,
+            name=robot.name,
+            position={"x": state.position_x, "y": state.position_y},
+            direction=state.direction,
+        )
+        for robot, state in result.all()
+    ]
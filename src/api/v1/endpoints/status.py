@@ -1,50 +1,88 @@
 import logging
-from typing import Annotated, Any
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
+from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from src.models.robot_state import RobotState
-from src.services.database import get_db
+from src.services.database import AsyncSessionLocal
+from src.services.robot_state_service import load_robot_state
+from src.services.status_cache import RobotStatus, status_cache
 from src.settings import settings
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-DBSession = Annotated[AsyncSession, Depends(get_db)]
+IfNoneMatch = Annotated[str | None, Header()]
 
 router = APIRouter()
 
 
-@router.get("/status")
-async def get_status(db: DBSession) -> dict[str, Any]:
-    """
-    Returns the current position and direction of the robot.
-    """
+class StatusResponse(BaseModel):
+    position: dict[str, int]
+    direction: str
+
+
+async def _load_status(robot_id: int | None) -> RobotStatus | None:
+    # Concurrent misses share this load, so it must not borrow the session
+    # of the request that started it: that request may go away first
+    async with AsyncSessionLocal() as session:
+        robot_state = await load_robot_state(session, robot_id)
+    if not robot_state:
+        if robot_id is not None:
+            return None
+        x, y = settings.start_position
+        return RobotStatus(x, y, settings.start_direction)
+    return RobotStatus(
+        robot_state.position_x, robot_state.position_y, robot_state.direction
+    )
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def _read_status(
+    robot_id: int | None,
+    response: Response,
+    if_none_match: str | None,
+) -> StatusResponse | Response:
     try:
-        result = await db.execute(
-            select(RobotState).order_by(RobotState.updated_at.desc()).limit(1)
-        )
-        robot_state = result.scalars().first()
-
-        if not robot_state:
-            return {
-                "position": {
-                    "x": settings.start_position[0],
-                    "y": settings.start_position[1],
-                },
-                "direction": settings.start_direction,
-            }
-
-        return {
-            "position": {"x": robot_state.position_x, "y": robot_state.position_y},
-            "direction": robot_state.direction,
-        }
+        status = await status_cache.get(robot_id, lambda: _load_status(robot_id))
     except SQLAlchemyError as e:
         logger.error(f"Database error while fetching robot status: {e}")
         raise HTTPException(status_code=500, detail="Database error") from e
     except Exception as e:
         logger.error(f"Unexpected error while fetching robot status: {e}")
         raise HTTPException(status_code=500, detail="Internal server error") from e
+
+    if status is None:
+        raise HTTPException(status_code=404, detail="Robot not found")
+    if _matches(if_none_match, status.etag):
+        return Response(status_code=304, headers={"ETag": status.etag})
+    response.headers["ETag"] = status.etag
+    return StatusResponse(**status.as_dict())
+
+
+@router.get("/status", response_model=StatusResponse)
+async def get_status(
+    response: Response, if_none_match: IfNoneMatch = None
+) -> StatusResponse | Response:
+    """
+    Returns the current position and direction of the robot.
+    Responds with 304 when ``If-None-Match`` carries the current ETag.
+    """
+    return await _read_status(None, response, if_none_match)
+
+
+@router.get("/robots/{robot_id}/status", response_model=StatusResponse)
+async def get_robot_status(
+    robot_id: int, response: Response, if_none_match: IfNoneMatch = None
+) -> StatusResponse | Response:
+    """
+    Returns the current position and direction of a fleet robot.
+    """
+    return await _read_status(robot_id, response, if_none_match)
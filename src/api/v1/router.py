@@ -1,9 +1,22 @@
 from fastapi import APIRouter
 
-from src.api.v1.endpoints import commands, status
+from src.api.v1.endpoints import (
+    analysis,
+    commands,
+    history,
+    obstacles,
+    plan,
+    robots,
+    status,
+)
 
 API_V1_STR = "/api/v1"
 
 api_router = APIRouter()
 api_router.include_router(status.router, tags=["status"])
 api_router.include_router(commands.router, tags=["commands"])
+api_router.include_router(robots.router, tags=["robots"])
+api_router.include_router(history.router, tags=["history"])
+api_router.include_router(obstacles.router, tags=["obstacles"])
+api_router.include_router(plan.router, tags=["plan"])
+api_router.include_router(analysis.router, tags=["analysis"])
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -5,8 +7,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from src.api.v1.router import api_router
-from src.services.database import engine
+from src.services.command_dispatcher import command_dispatcher
+from src.services.database import AsyncSessionLocal, engine
+from src.services.history_writer import history_writer
 from src.services.init_db import init_db as initialize_database
+from src.services.obstacle_index import obstacle_index
+from src.services.occupancy_index import occupancy_index
+from src.services.state_snapshots import run_snapshots
 from src.settings import settings
 
 logging.basicConfig(
@@ -20,9 +27,18 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Handle application startup and shutdown events"""
     logger.info("Starting Moon Robot API")
+    snapshot_task = None
     try:
         await initialize_database()
         logger.info("Database initialization complete")
+        async with AsyncSessionLocal() as session:
+            if settings.OBSTACLE_CACHE_ENABLED:
+                await obstacle_index.load(session)
+            await occupancy_index.load(session)
+        if settings.HISTORY_WRITE_BEHIND:
+            history_writer.start()
+        if settings.SNAPSHOT_INTERVAL > 0:
+            snapshot_task = asyncio.create_task(run_snapshots(AsyncSessionLocal))
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
@@ -30,6 +46,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     yield
 
     logger.info("Shutting down Moon Robot API")
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await snapshot_task
+    await command_dispatcher.stop()
+    await history_writer.stop()
+    logger.info("Command history buffer flushed")
     await engine.dispose()
     logger.info("Database engine disposed")
 
@@ -1,6 +1,19 @@
 from .command_history import CommandHistory
 from .obstacle import Obstacle
+from .obstacle_change import ObstacleChange
 from .robot import Direction, Position, Robot
+from .robot_record import RobotRecord
+from .robot_snapshot import RobotSnapshot
 from .robot_state import RobotState
 
-__all__ = ["CommandHistory", "Direction", "Obstacle", "Position", "Robot", "RobotState"]
+__all__ = [
+    "CommandHistory",
+    "Direction",
+    "Obstacle",
+    "ObstacleChange",
+    "Position",
+    "Robot",
+    "RobotRecord",
+    "RobotSnapshot",
+    "RobotState",
+]
@@ -1,17 +1,38 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models.base import Base
 
 
 class CommandHistory(Base):
-    """Tracks all commands sent to the robot"""
+    """
+    Tracks all commands sent to the robot.
+
+    On PostgreSQL the table is range-partitioned by month on executed_at,
+    with (id, executed_at) as its primary key; see
+    src/services/history_partitions.py for partition maintenance.
+    """
 
     __tablename__ = "command_history"
+    # Keyset pagination walks (executed_at, id) within one robot's history;
+    # the robot_id prefix also serves the foreign key
+    __table_args__ = (
+        Index("ix_command_history_robot_executed_at", "robot_id", "executed_at", "id"),
+        Index(
+            "ix_command_history_robot_obstacle_executed_at",
+            "robot_id",
+            "obstacle_detected",
+            "executed_at",
+            "id",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    robot_id: Mapped[int | None] = mapped_column(
+        ForeignKey("robots.id", ondelete="CASCADE")
+    )
     command: Mapped[str] = mapped_column(Text, nullable=False)
     position_x: Mapped[int | None] = mapped_column(Integer)
     position_y: Mapped[int | None] = mapped_column(Integer)
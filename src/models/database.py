@@ -4,6 +4,17 @@
 from src.models.base import Base
 from src.models.command_history import CommandHistory
 from src.models.obstacle import Obstacle
+from src.models.obstacle_change import ObstacleChange
+from src.models.robot_record import RobotRecord
+from src.models.robot_snapshot import RobotSnapshot
 from src.models.robot_state import RobotState
 
-__all__ = ["Base", "CommandHistory", "Obstacle", "RobotState"]
+__all__ = [
+    "Base",
+    "CommandHistory",
+    "Obstacle",
+    "ObstacleChange",
+    "RobotRecord",
+    "RobotSnapshot",
+    "RobotState",
+]
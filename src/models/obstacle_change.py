@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class ObstacleChange(Base):
+    """
+    Change feed of the obstacle map, polled by every API worker.
+    The id of the latest change is the map version.
+    """
+
+    __tablename__ = "obstacle_changes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # "add" or "remove" for one cell; "reload" after a bulk change
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)
+    position_x: Mapped[int | None] = mapped_column(Integer)
+    position_y: Mapped[int | None] = mapped_column(Integer)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
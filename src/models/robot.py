@@ -14,71 +14,69 @@ class Position(NamedTuple):
     y: int
 
 
+# Headings are numbered clockwise so that a right turn adds one and a left
+# turn adds three (mod 4)
+HEADINGS = (Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST)
+HEADING_INDEX = {direction: index for index, direction in enumerate(HEADINGS)}
+DX = (0, 1, 0, -1)
+DY = (1, 0, -1, 0)
+
+# Command -> (distance moved along the heading, heading change)
+COMMAND_STEPS = {"F": (1, 0), "B": (-1, 0), "L": (0, 3), "R": (0, 1)}
+
+
 class Robot:
+    __slots__ = ("_heading", "_x", "_y", "obstacle_detected")
+
     def __init__(self, position: tuple[int, int], direction: Direction) -> None:
-        self.position = Position(*position)
-        self.direction = direction
+        self._x, self._y = position
+        self._heading = HEADING_INDEX[direction]
         self.obstacle_detected = False
 
-    def move_forward(self) -> None:
-        x, y = self.position
+    @property
+    def position(self) -> Position:
+        return Position(self._x, self._y)
 
-        if self.direction == Direction.NORTH:
-            y += 1
-        elif self.direction == Direction.SOUTH:
-            y -= 1
-        elif self.direction == Direction.EAST:
-            x += 1
-        elif self.direction == Direction.WEST:
-            x -= 1
+    @position.setter
+    def position(self, position: tuple[int, int]) -> None:
+        self._x, self._y = position
 
-        self.position = Position(x, y)
+    @property
+    def direction(self) -> Direction:
+        return HEADINGS[self._heading]
 
-    def move_backward(self) -> None:
-        x, y = self.position
+    @direction.setter
+    def direction(self, direction: Direction) -> None:
+        self._heading = HEADING_INDEX[direction]
 
-        if self.direction == Direction.NORTH:
-            y -= 1
-        elif self.direction == Direction.SOUTH:
-            y += 1
-        elif self.direction == Direction.EAST:
-            x -= 1
-        elif self.direction == Direction.WEST:
-            x += 1
+    @property
+    def heading(self) -> int:
+        return self._heading
 
-        self.position = Position(x, y)
+    def move_forward(self) -> None:
+        self._x += DX[self._heading]
+        self._y += DY[self._heading]
+
+    def move_backward(self) -> None:
+        self._x -= DX[self._heading]
+        self._y -= DY[self._heading]
 
     def rotate_left(self) -> None:
-        if self.direction == Direction.NORTH:
-            self.direction = Direction.WEST
-        elif self.direction == Direction.WEST:
-            self.direction = Direction.SOUTH
-        elif self.direction == Direction.SOUTH:
-            self.direction = Direction.EAST
-        elif self.direction == Direction.EAST:
-            self.direction = Direction.NORTH
+        self._heading = (self._heading + 3) & 3
 
     def rotate_right(self) -> None:
-        if self.direction == Direction.NORTH:
-            self.direction = Direction.EAST
-        elif self.direction == Direction.EAST:
-            self.direction = Direction.SOUTH
-        elif self.direction == Direction.SOUTH:
-            self.direction = Direction.WEST
-        elif self.direction == Direction.WEST:
-            self.direction = Direction.NORTH
+        self._heading = (self._heading + 1) & 3
 
     def process_command(self, command: str) -> bool:
-        if command == "F":
-            self.move_forward()
-            return True
-        if command == "B":
-            self.move_backward()
-            return True
-        if command == "L":
-            self.rotate_left()
-            return False
-        if command == "R":
-            self.rotate_right()
+        step = COMMAND_STEPS.get(command)
+        if step is None:
             return False
+
+        distance, turn = step
+        if distance:
+            self._x += distance * DX[self._heading]
+            self._y += distance * DY[self._heading]
+            return True
+
+        self._heading = (self._heading + turn) & 3
         return False
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class RobotSnapshot(Base):
+    """A robot's pose at a known point of its command history"""
+
+    __tablename__ = "robot_snapshots"
+    __table_args__ = (
+        Index("ix_robot_snapshots_robot_taken_at", "robot_id", "taken_at"),
+        # Every worker runs the snapshot task; only one may record each point
+        Index(
+            "uq_robot_snapshots_robot_history",
+            "robot_id",
+            "history_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    robot_id: Mapped[int | None] = mapped_column(
+        ForeignKey("robots.id", ondelete="CASCADE")
+    )
+    # Last command_history row reflected in the pose; NULL for the pose a
+    # robot was registered with
+    history_id: Mapped[int | None] = mapped_column(Integer)
+    position_x: Mapped[int] = mapped_column(Integer, nullable=False)
+    position_y: Mapped[int] = mapped_column(Integer, nullable=False)
+    direction: Mapped[str] = mapped_column(String(10), nullable=False)
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
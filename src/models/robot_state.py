@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models.base import Base
@@ -13,6 +13,10 @@ class RobotState(Base):
     __tablename__ = "robot_state"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # NULL for the legacy single robot served by /status and /commands
+    robot_id: Mapped[int | None] = mapped_column(
+        ForeignKey("robots.id", ondelete="CASCADE"), unique=True
+    )
     position_x: Mapped[int] = mapped_column(Integer, default=0)
     position_y: Mapped[int] = mapped_column(Integer, default=0)
     direction: Mapped[str] = mapped_column(String(10), default=settings.start_direction)
@@ -20,3 +24,7 @@ class RobotState(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    # Bumped on every UPDATE; a stale version makes the UPDATE match no rows
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}  # noqa: RUF012
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.models.command_history import CommandHistory
+from src.models.robot import Direction, Robot
+from src.models.robot_state import RobotState
+from src.services.command_processor import CommandProcessor
+from src.services.database import AsyncSessionLocal
+from src.services.history_writer import history_writer
+from src.services.occupancy_index import CellOccupiedError, RobotKey, occupancy_index
+from src.services.robot_service import Trajectory
+from src.services.robot_state_service import (
+    apply_result,
+    check_position_range,
+    history_row,
+    load_robot_state,
+    robot_from_state,
+)
+from src.services.status_cache import RobotStatus, status_cache
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CommandOutcome = tuple[Robot, list[dict[str, Any]]]
+
+WRITE_BACK_ATTEMPTS = 2
+
+
+@dataclass
+class _Job:
+    commands: list[str]
+    future: "asyncio.Future[CommandOutcome]"
+    trajectory: Trajectory | None = None
+
+
+class _RobotWorker:
+    """Executes one robot's commands in submission order"""
+
+    def __init__(
+        self, robot_id: RobotKey, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        self.robot_id = robot_id
+        self.session_factory = session_factory
+        self.queue: asyncio.Queue[_Job] = asyncio.Queue()
+        self.robot: Robot | None = None
+        self.robot_state: RobotState | None = None
+        self.state_stale = False
+        self.closed = False
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        async with self.session_factory() as session:
+            while not self.closed:
+                job = await self.queue.get()
+                try:
+                    await self._handle(session, job)
+                except Exception as e:
+                    logger.error(f"Command worker for robot {self.robot_id}: {e}")
+                finally:
+                    self.queue.task_done()
+
+    def _close(self, error: Exception) -> None:
+        """Stop the worker, failing the jobs still queued behind the current one"""
+        self.closed = True
+        while not self.queue.empty():
+            job = self.queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(error)
+            self.queue.task_done()
+
+    async def _handle(self, session: AsyncSession, job: _Job) -> None:
+        try:
+            robot = self.robot or await self._load(session)
+            start = Robot(robot.position, robot.direction)
+
+            processor = CommandProcessor(session)
+            if job.trajectory is not None:
+                command_results = [
+                    await processor.process_commands(
+                        job.commands[0],
+                        start.position,
+                        start.direction,
+                        robot_id=self.robot_id,
+                        trajectory=job.trajectory,
+                    )
+                ]
+            else:
+                command_results = await processor.process_batch(
+                    job.commands,
+                    start.position,
+                    start.direction,
+                    robot_id=self.robot_id,
+                )
+            check_position_range(command_results)
+            final = command_results[-1]
+            position = (final["position"]["x"], final["position"]["y"])
+            if not occupancy_index.try_move(self.robot_id, position):
+                raise CellOccupiedError("Target cell is occupied by another robot")
+        except Exception as e:
+            # Release the connection; the worker's session lives on between jobs
+            await session.rollback()
+            self.state_stale = True
+            if isinstance(e, LookupError):
+                # The robot does not exist: don't hold on to a session for it
+                self._close(e)
+            if not job.future.done():
+                job.future.set_exception(e)
+            return
+
+        executed_at = datetime.utcnow()
+        self.robot = Robot(position, Direction(final["direction"]))
+        # The worker's pose is authoritative even before it is written back
+        status_cache.put(self.robot_id, RobotStatus.from_result(final))
+        if not job.future.done():
+            job.future.set_result((start, command_results))
+
+        await self._write_back(session, job.commands, command_results, executed_at)
+
+    async def _load(self, session: AsyncSession) -> Robot:
+        self.robot_state = await load_robot_state(session, self.robot_id)
+        if self.robot_id is not None and not self.robot_state:
+            raise LookupError("Robot not found")
+        self.robot = robot_from_state(self.robot_state)
+        return self.robot
+
+    async def _write_back(
+        self,
+        session: AsyncSession,
+        commands: list[str],
+        command_results: list[dict[str, Any]],
+        executed_at: datetime,
+    ) -> None:
+        rows = [
+            history_row(command, command_result, self.robot_id, executed_at)
+            for command, command_result in zip(commands, command_results, strict=True)
+        ]
+        for attempt in range(1, WRITE_BACK_ATTEMPTS + 1):
+            try:
+                if self.state_stale:
+                    self.robot_state = await load_robot_state(session, self.robot_id)
+                    self.state_stale = False
+                if not settings.HISTORY_WRITE_BEHIND:
+                    await session.execute(insert(CommandHistory), rows)
+                self.robot_state = apply_result(
+                    session, self.robot_state, command_results[-1], self.robot_id
+                )
+                await session.commit()
+                final = command_results[-1]["position"]
+                occupancy_index.settle(self.robot_id, (final["x"], final["y"]))
+                if settings.HISTORY_WRITE_BEHIND:
+                    await history_writer.add(rows)
+                return
+            except StaleDataError:
+                # Another process wrote the row; the worker's pose still wins
+                await session.rollback()
+                self.state_stale = True
+                logger.warning(
+                    f"Robot {self.robot_id} state changed outside the dispatcher "
+                    f"(attempt {attempt}/{WRITE_BACK_ATTEMPTS})"
+                )
+            except Exception as e:
+                await session.rollback()
+                self.state_stale = True
+                logger.error(f"Error writing back robot {self.robot_id} state: {e}")
+                break
+
+        # The next job writes the worker's pose again, but nothing would
+        # write these rows: queue them on their own
+        logger.error(
+            f"Gave up writing back robot {self.robot_id} state, "
+            f"queueing {len(rows)} history rows separately"
+        )
+        await history_writer.add(rows)
+
+
+class CommandDispatcher:
+    """
+    Serializes commands per robot through an asyncio.Queue worker.
+
+    Each worker keeps the authoritative Robot in memory, so requests skip
+    the RobotState read, and is the only writer of its robot's state. The
+    result is returned as soon as it is computed; history and state are
+    written back afterwards by the worker.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self.session_factory = session_factory
+        self._workers: dict[RobotKey, _RobotWorker] = {}
+
+    async def execute(
+        self,
+        commands: list[str],
+        robot_id: RobotKey = None,
+        trajectory: Trajectory | None = None,
+    ) -> CommandOutcome:
+        """
+        Queue command strings for a robot and wait for their results.
+        Returns the robot at its starting pose and the result after each
+        command string. A single command string can record its steps into
+        ``trajectory``.
+        """
+        worker = self._workers.get(robot_id)
+        if worker is None or worker.closed:
+            worker = _RobotWorker(robot_id, self.session_factory)
+            self._workers[robot_id] = worker
+
+        future: asyncio.Future[CommandOutcome] = (
+            asyncio.get_running_loop().create_future()
+        )
+        await worker.queue.put(_Job(commands, future, trajectory))
+        try:
+            return await future
+        finally:
+            if worker.closed and self._workers.get(robot_id) is worker:
+                del self._workers[robot_id]
+
+    async def drain(self) -> None:
+        """Wait until every queued command has executed and been written back"""
+        for worker in list(self._workers.values()):
+            await worker.queue.join()
+
+    async def stop(self) -> None:
+        await self.drain()
+        for worker in self._workers.values():
+            worker.task.cancel()
+        await asyncio.gather(
+            *(worker.task for worker in self._workers.values()),
+            return_exceptions=True,
+        )
+        self._workers.clear()
+
+
+command_dispatcher = CommandDispatcher(AsyncSessionLocal)
@@ -1,12 +1,26 @@
 import logging
+from collections.abc import Container
+from collections.abc import Set as AbstractSet
 from typing import Any
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from src.models.obstacle import Obstacle
 from src.models.robot import Direction, Position, Robot
-from src.services.robot_service import RobotCommandExecutor
+from src.services.execution_cache import CachedExecutor, execution_cache
+from src.services.obstacle_index import ObstacleIndex, obstacle_index
+from src.services.occupancy_index import OccupancyIndex, occupancy_index
+from src.services.robot_service import (
+    CommandExecutor,
+    Trajectory,
+    create_executor,
+    move_count,
+    path_bounds,
+    reach_bounds,
+)
+from src.settings import settings
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -15,23 +29,32 @@ logger = logging.getLogger(__name__)
 class CommandProcessor:
     """Service for processing robot commands with obstacle detection"""
 
-    def __init__(self, db_session: AsyncSession):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        obstacles: ObstacleIndex | None = None,
+        occupancy: OccupancyIndex | None = None,
+    ):
         self.db_session = db_session
-        self.executor = RobotCommandExecutor()
+        self.obstacle_index = obstacles if obstacles is not None else obstacle_index
+        self.occupancy = occupancy if occupancy is not None else occupancy_index
+        self.executor: CommandExecutor = create_executor(settings.EXECUTION_ENGINE)
+        if settings.EXECUTION_CACHE_SIZE > 0:
+            self.executor = CachedExecutor(self.executor, execution_cache)
 
-    async def get_obstacles(self) -> set[Position]:
+    async def get_obstacles(
+        self, bounds: tuple[Position, Position] | None = None
+    ) -> AbstractSet[Position]:
         """
-        Get obstacles from database with proper error handling
+        Get obstacles from the in-memory index, loading it from the database
+        only when it has not been loaded yet or was invalidated, and applying
+        changes from the obstacle change feed otherwise.
+        With the index disabled, only obstacles inside ``bounds`` are fetched.
         """
-        from src.models.obstacle import Obstacle
-
         try:
-            result = await self.db_session.execute(select(Obstacle))
-            obstacles = result.scalars().all()
-            return {
-                Position(obstacle.position_x, obstacle.position_y)
-                for obstacle in obstacles
-            }
+            if settings.OBSTACLE_CACHE_ENABLED:
+                return await self.obstacle_index.refresh(self.db_session)
+            return await self.get_obstacles_in_bounds(bounds)
         except SQLAlchemyError as e:
             logger.error(f"Database error while fetching obstacles: {e}")
             raise
@@ -39,15 +62,54 @@ class CommandProcessor:
             logger.error(f"Unexpected error while fetching obstacles: {e}")
             raise
 
+    async def get_blocked(
+        self,
+        obstacles: AbstractSet[Position],
+        robot_id: int | None,
+        snapshot: bool = False,
+    ) -> Container[Position]:
+        """
+        Combine obstacles with the cells held by other robots, reloading the
+        robot positions first when they are older than the poll interval.
+        With ``snapshot``, the robot positions are copied so the result can
+        be read from another thread while the event loop moves robots.
+        """
+        occupancy = await self.occupancy.refresh(self.db_session)
+        if snapshot:
+            occupancy = occupancy.snapshot()
+        return occupancy.blocking(obstacles, robot_id)
+
+    async def get_obstacles_in_bounds(
+        self, bounds: tuple[Position, Position] | None
+    ) -> set[Position]:
+        """
+        Query obstacles inside an inclusive bounding box, or all of them when
+        no box is given. The range scan is served by the composite unique
+        index backing ``uq_obstacle_position``.
+        """
+        stmt = select(Obstacle.position_x, Obstacle.position_y)
+        if bounds is not None:
+            low, high = bounds
+            stmt = stmt.where(
+                Obstacle.position_x.between(low.x, high.x),
+                Obstacle.position_y.between(low.y, high.y),
+            )
+        result = await self.db_session.execute(stmt)
+        return {Position(x, y) for x, y in result.all()}
+
     async def process_commands(
         self,
         command_string: str,
         start_position: tuple[int, int],
         start_direction: Direction,
+        robot_id: int | None = None,
+        trajectory: Trajectory | None = None,
     ) -> dict[str, Any]:
         """
         Process a command string and return the final robot state.
-        Handles obstacle detection as specified in Part II.
+        Handles obstacle detection as specified in Part II; cells held by
+        other robots count as obstacles. With a ``trajectory``, the commands
+        are executed step by step and every state is recorded into it.
         """
         try:
             # Validate command string
@@ -55,8 +117,43 @@ class CommandProcessor:
                 raise ValueError("Command string must be a string")
 
             robot = Robot(position=start_position, direction=start_direction)
-            obstacles = await self.get_obstacles()
-            return self.executor.execute_commands(robot, command_string, obstacles)
+            bounds = path_bounds(start_position, start_direction, command_string)
+            obstacles = await self.get_obstacles(bounds)
+            blocked = await self.get_blocked(obstacles, robot_id)
+            if trajectory is not None:
+                return trajectory.record(robot, command_string, blocked)
+            return self.executor.execute_commands(robot, command_string, blocked)
         except Exception as e:
             logger.error(f"Error processing commands '{command_string}': {e}")
             raise
+
+    async def process_batch(
+        self,
+        command_strings: list[str],
+        start_position: tuple[int, int],
+        start_direction: Direction,
+        robot_id: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Process several command strings in sequence against one obstacle
+        snapshot, each starting from the pose the previous one ended in.
+        Returns the resulting state after every command string.
+        """
+        try:
+            # An obstacle stop discards the rest of a string, so later strings
+            # can leave the concatenated path; bound by total moves instead.
+            distance = sum(move_count(c) for c in command_strings)
+            obstacles = await self.get_obstacles(reach_bounds(start_position, distance))
+            blocked = await self.get_blocked(obstacles, robot_id)
+
+            robot = Robot(position=start_position, direction=start_direction)
+            results = []
+            for command_string in command_strings:
+                robot.obstacle_detected = False
+                results.append(
+                    self.executor.execute_commands(robot, command_string, blocked)
+                )
+            return results
+        except Exception as e:
+            logger.error(f"Error processing command batch: {e}")
+            raise
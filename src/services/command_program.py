@@ -0,0 +1,490 @@
+"""
+Compressed command strings.
+
+Besides the plain F/B/L/R characters, a command string may use run-length
+and repeat syntax: a count after a command or a parenthesised group repeats
+it, optionally written with a ``*``, so ``F100``, ``F*100`` and
+``(FRFL)*50`` are all valid. Characters other than commands are ignored, as
+in plain strings.
+
+A parsed string is a tree of nodes, each carrying a Segment: the pose
+transform it applies and the box its path sweeps, both relative to a robot
+at the origin facing north. Executing a node whose swept box holds no
+obstacle is a single transform, so long repetitive paths run in time
+proportional to their structure rather than their expanded length; only
+nodes whose box does hold obstacles are split up and, at the leaves,
+executed step by step.
+"""
+
+from collections.abc import Container, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import groupby
+from math import gcd
+
+from src.models.robot import COMMAND_STEPS, DX, DY, HEADINGS, Position, Robot
+from src.services.obstacle_grid import ObstacleGrid
+from src.services.obstacle_index import ObstacleIndex
+from src.services.occupancy_index import BlockedCells
+
+# Length of a command string accepted by the API, before expansion
+MAX_COMMAND_LENGTH = 1000
+
+# Expanded length a command string may reach. Paths that keep meeting
+# obstacles are stepped through one command at a time, so this bounds the
+# work a single request can do
+MAX_EXPANDED_LENGTH = 1_000_000
+
+# Deepest nesting of parentheses; execution recurses once per level
+MAX_NESTING_DEPTH = 64
+
+# Box checks an execution may spend before falling back to stepping: a
+# fixed allowance plus one per STEPS_PER_BOX_CHECK commands, which keeps
+# the checks from ever costing much more than stepping through the path
+MIN_BOX_CHECKS = 64
+STEPS_PER_BOX_CHECK = 256
+
+_DIGITS = "0123456789"
+_SYNTAX = frozenset(_DIGITS + "()*")
+
+
+class CommandSyntaxError(ValueError):
+    """Raised when a compressed command string cannot be parsed"""
+
+
+def _rotate(x: int, y: int, heading: int) -> tuple[int, int]:
+    """Rotate a north-relative offset clockwise by ``heading`` quarter turns"""
+    for _ in range(heading):
+        x, y = y, -x
+    return x, y
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    Effect of a command sequence on a robot at the origin facing north:
+    the final offset and turn, the inclusive box of every cell visited,
+    and the number of moves and of commands it expands to
+    """
+
+    dx: int = 0
+    dy: int = 0
+    turn: int = 0
+    min_x: int = 0
+    min_y: int = 0
+    max_x: int = 0
+    max_y: int = 0
+    moves: int = 0
+    length: int = 0
+
+    def then(self, other: "Segment") -> "Segment":
+        """This segment followed by ``other``"""
+        corners = [
+            _rotate(x, y, self.turn)
+            for x in (other.min_x, other.max_x)
+            for y in (other.min_y, other.max_y)
+        ]
+        dx, dy = _rotate(other.dx, other.dy, self.turn)
+        return Segment(
+            dx=self.dx + dx,
+            dy=self.dy + dy,
+            turn=(self.turn + other.turn) & 3,
+            min_x=min(self.min_x, self.dx + min(x for x, _ in corners)),
+            min_y=min(self.min_y, self.dy + min(y for _, y in corners)),
+            max_x=max(self.max_x, self.dx + max(x for x, _ in corners)),
+            max_y=max(self.max_y, self.dy + max(y for _, y in corners)),
+            moves=self.moves + other.moves,
+            length=self.length + other.length,
+        )
+
+    def repeat(self, count: int) -> "Segment":
+        """This segment repeated ``count`` times, in constant time"""
+        if count == 0:
+            return IDENTITY
+        if self.turn == 0:
+            # Each pass is shifted by (dx, dy); the extremes are reached on
+            # the first and the last one
+            shift_x, shift_y = (count - 1) * self.dx, (count - 1) * self.dy
+            return Segment(
+                dx=count * self.dx,
+                dy=count * self.dy,
+                min_x=min(self.min_x, self.min_x + shift_x),
+                min_y=min(self.min_y, self.min_y + shift_y),
+                max_x=max(self.max_x, self.max_x + shift_x),
+                max_y=max(self.max_y, self.max_y + shift_y),
+                moves=count * self.moves,
+                length=count * self.length,
+            )
+
+        # A turning segment returns to its starting pose after ``period``
+        # passes, so later passes retrace the cells of the first ones
+        period = 4 // gcd(self.turn, 4)
+        swept = IDENTITY
+        for _ in range(min(count, period)):
+            swept = swept.then(self)
+        pose = IDENTITY
+        for _ in range(count % period):
+            pose = pose.then(self)
+        return Segment(
+            dx=pose.dx,
+            dy=pose.dy,
+            turn=pose.turn,
+            min_x=swept.min_x,
+            min_y=swept.min_y,
+            max_x=swept.max_x,
+            max_y=swept.max_y,
+            moves=count * self.moves,
+            length=count * self.length,
+        )
+
+    def box(self, heading: int) -> tuple[int, int, int, int]:
+        """
+        The (min dx, min dy, max dx, max dy) offsets of the swept box for a
+        robot starting with ``heading``
+        """
+        xs, ys = zip(
+            *(
+                _rotate(x, y, heading)
+                for x in (self.min_x, self.max_x)
+                for y in (self.min_y, self.max_y)
+            ),
+            strict=True,
+        )
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def bounds(self, robot: Robot) -> tuple[Position, Position]:
+        """The (min, max) corners of the box swept from the robot's pose"""
+        x, y = robot.position
+        min_dx, min_dy, max_dx, max_dy = self.box(robot.heading)
+        return Position(x + min_dx, y + min_dy), Position(x + max_dx, y + max_dy)
+
+    def apply(self, robot: Robot) -> None:
+        x, y = robot.position
+        dx, dy = _rotate(self.dx, self.dy, robot.heading)
+        robot.position = (x + dx, y + dy)
+        robot.direction = HEADINGS[(robot.heading + self.turn) & 3]
+
+
+IDENTITY = Segment()
+_STEPS = {
+    "F": Segment(dy=1, max_y=1, moves=1, length=1),
+    "B": Segment(dy=-1, min_y=-1, moves=1, length=1),
+    "L": Segment(turn=3, length=1),
+    "R": Segment(turn=1, length=1),
+}
+
+
+@dataclass(frozen=True)
+class Command:
+    """A single command character"""
+
+    char: str
+
+    @property
+    def segment(self) -> Segment:
+        return _STEPS[self.char]
+
+
+@dataclass(frozen=True)
+class Repeat:
+    body: "Node"
+    count: int
+    segment: Segment
+
+
+@dataclass(frozen=True)
+class Sequence:
+    items: tuple["Node", ...]
+    segment: Segment
+
+
+Node = Command | Repeat | Sequence
+
+
+def is_compressed(commands: str) -> bool:
+    """Whether a command string uses run-length or repeat syntax"""
+    return not _SYNTAX.isdisjoint(commands)
+
+
+def _sequence(items: list[Node]) -> Node:
+    if len(items) == 1:
+        return items[0]
+    segment = IDENTITY
+    for item in items:
+        segment = segment.then(item.segment)
+    return Sequence(tuple(items), segment)
+
+
+@lru_cache(maxsize=1024)
+def parse_commands(commands: str) -> Node:
+    """
+    Parse a command string into a tree of nodes. Raises CommandSyntaxError
+    for unbalanced or too deeply nested parentheses, a count that repeats
+    nothing, or a string expanding to more than MAX_EXPANDED_LENGTH commands.
+    """
+    stack: list[list[Node]] = [[]]
+    position = 0
+    while position < len(commands):
+        char = commands[position]
+        position += 1
+        if char == "(":
+            if len(stack) > MAX_NESTING_DEPTH:
+                raise CommandSyntaxError(
+                    f"Parentheses nested deeper than {MAX_NESTING_DEPTH} levels"
+                )
+            stack.append([])
+        elif char == ")":
+            if len(stack) == 1:
+                raise CommandSyntaxError(f"Unmatched ')' at position {position}")
+            group = _sequence(stack.pop())
+            stack[-1].append(group)
+        elif char == "*" or char in _DIGITS:
+            start = position if char == "*" else position - 1
+            end = start
+            while end < len(commands) and commands[end] in _DIGITS:
+                end += 1
+            if end == start:
+                raise CommandSyntaxError(f"Missing count at position {position}")
+            if not stack[-1]:
+                raise CommandSyntaxError(
+                    f"Count at position {position} does not follow a command"
+                )
+            body = stack[-1].pop()
+            count = int(commands[start:end])
+            stack[-1].append(Repeat(body, count, body.segment.repeat(count)))
+            position = end
+        elif char in _STEPS:
+            stack[-1].append(Command(char))
+        # Any other character is ignored, as in plain command strings
+
+    if len(stack) > 1:
+        raise CommandSyntaxError("Unmatched '('")
+    program = _sequence(stack[0])
+    if program.segment.length > MAX_EXPANDED_LENGTH:
+        raise CommandSyntaxError(
+            f"Command string expands to more than {MAX_EXPANDED_LENGTH} commands"
+        )
+    return program
+
+
+def _trace(commands: str) -> Segment:
+    """Segment of a plain command string, traced in one pass"""
+    x = y = heading = min_x = min_y = max_x = max_y = moves = length = 0
+    for command in commands:
+        step = COMMAND_STEPS.get(command)
+        if step is None:
+            continue
+        distance, turn = step
+        length += 1
+        if distance:
+            x += distance * DX[heading]
+            y += distance * DY[heading]
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+            moves += 1
+        else:
+            heading = (heading + turn) & 3
+    return Segment(x, y, heading, min_x, min_y, max_x, max_y, moves, length)
+
+
+@dataclass(frozen=True)
+class CompiledCommands:
+    """
+    Obstacle-free effect of a command string for each start heading:
+    ``poses[h]`` is the (dx, dy, final heading) of a robot starting with
+    heading ``h``, and ``boxes[h]`` the offsets of the box its path sweeps.
+    Both are independent of the start position.
+    """
+
+    poses: tuple[tuple[int, int, int], ...]
+    boxes: tuple[tuple[int, int, int, int], ...]
+    moves: int
+
+    def bounds(self, position: Position, heading: int) -> tuple[Position, Position]:
+        x, y = position
+        min_dx, min_dy, max_dx, max_dy = self.boxes[heading]
+        return Position(x + min_dx, y + min_dy), Position(x + max_dx, y + max_dy)
+
+    def apply(self, robot: Robot) -> None:
+        x, y = robot.position
+        dx, dy, heading = self.poses[robot.heading]
+        robot.position = (x + dx, y + dy)
+        robot.direction = HEADINGS[heading]
+
+
+@lru_cache(maxsize=4096)
+def compile_commands(commands: str) -> CompiledCommands:
+    """Compile a plain or compressed command string; see CompiledCommands"""
+    segment = (
+        parse_commands(commands).segment
+        if is_compressed(commands)
+        else _trace(commands)
+    )
+    poses = tuple(
+        (*_rotate(segment.dx, segment.dy, heading), (heading + segment.turn) & 3)
+        for heading in range(len(HEADINGS))
+    )
+    boxes = tuple(segment.box(heading) for heading in range(len(HEADINGS)))
+    return CompiledCommands(poses, boxes, segment.moves)
+
+
+def expand(node: Node) -> Iterator[str]:
+    """Yield the plain commands a node stands for, lazily"""
+    if isinstance(node, Command):
+        yield node.char
+    elif isinstance(node, Repeat):
+        for _ in range(node.count):
+            yield from expand(node.body)
+    else:
+        for item in node.items:
+            yield from expand(item)
+
+
+def compress(commands: str) -> str:
+    """Write runs of three or more identical commands with a count, as ``F37``"""
+    parts = []
+    for char, run in groupby(commands):
+        count = sum(1 for _ in run)
+        parts.append(f"{char}{count}" if count > 2 else char * count)
+    return "".join(parts)
+
+
+def any_blocked(obstacles: Container[Position], low: Position, high: Position) -> bool:
+    """
+    Whether any blocked cell lies inside the inclusive box. Containers that
+    cannot answer box queries are assumed to block, which only costs speed.
+    """
+    if isinstance(obstacles, BlockedCells):
+        return obstacles.robots_in(low, high) or any_blocked(
+            obstacles.obstacles, low, high
+        )
+    if isinstance(obstacles, ObstacleIndex | ObstacleGrid):
+        return obstacles.any_in(low.x, low.y, high.x, high.y)
+    if isinstance(obstacles, set | frozenset):
+        return any(low.x <= x <= high.x and low.y <= y <= high.y for x, y in obstacles)
+    return True
+
+
+class _Budget:
+    """
+    Box checks an execution may still spend. A check costs far more than
+    a step, so once a path has needed many checks without skipping much,
+    the rest of it is executed step by step instead.
+    """
+
+    def __init__(self, length: int) -> None:
+        self.checks = MIN_BOX_CHECKS + length // STEPS_PER_BOX_CHECK
+
+    def spend(self) -> bool:
+        self.checks -= 1
+        return self.checks >= 0
+
+
+def _period(segment: Segment) -> int | None:
+    """
+    Passes after which a repeated segment is back at its starting pose, so
+    that later passes retrace the cells of the earlier ones; None when
+    every pass moves on
+    """
+    if segment.turn:
+        return 4 // gcd(segment.turn, 4)
+    if segment.dx == segment.dy == 0:
+        return 1
+    return None
+
+
+def _step(node: Node, robot: Robot, obstacles: Container[Position]) -> bool:
+    """Execute a node one command at a time, without box checks"""
+    if isinstance(node, Command):
+        previous = robot.position
+        if robot.process_command(node.char) and robot.position in obstacles:
+            robot.position = previous
+            robot.obstacle_detected = True
+            return True
+        return False
+    if isinstance(node, Sequence):
+        return any(_step(item, robot, obstacles) for item in node.items)
+
+    period = _period(node.body.segment)
+    passes = node.count if period is None else min(node.count, period)
+    for _ in range(passes):
+        if _step(node.body, robot, obstacles):
+            return True
+    node.body.segment.repeat(node.count - passes).apply(robot)
+    return False
+
+
+def run(
+    node: Node, robot: Robot, obstacles: Container[Position], budget: _Budget
+) -> bool:
+    """
+    Execute a node on a robot, stopping in front of the first obstacle.
+    Returns True when an obstacle was detected.
+    """
+    segment = node.segment
+    if not segment.moves:
+        segment.apply(robot)
+        return False
+    if isinstance(node, Command) or not budget.spend():
+        return _step(node, robot, obstacles)
+    if not any_blocked(obstacles, *segment.bounds(robot)):
+        segment.apply(robot)
+        return False
+
+    if isinstance(node, Sequence):
+        return any(run(item, robot, obstacles, budget) for item in node.items)
+    return _run_repeat(node.body, node.count, robot, obstacles, budget)
+
+
+def _run_repeat(
+    body: Node,
+    count: int,
+    robot: Robot,
+    obstacles: Container[Position],
+    budget: _Budget,
+) -> bool:
+    period = _period(body.segment)
+    if period is not None:
+        # Only the first period of passes can hit anything
+        for _ in range(min(count, period)):
+            if run(body, robot, obstacles, budget):
+                return True
+        body.segment.repeat(max(count - period, 0)).apply(robot)
+        return False
+
+    if count == 1:
+        return run(body, robot, obstacles, budget)
+    if not budget.spend():
+        return _step(Repeat(body, count, IDENTITY), robot, obstacles)
+    segment = body.segment.repeat(count)
+    if not any_blocked(obstacles, *segment.bounds(robot)):
+        segment.apply(robot)
+        return False
+    half = count // 2
+    return _run_repeat(body, half, robot, obstacles, budget) or _run_repeat(
+        body, count - half, robot, obstacles, budget
+    )
+
+
+def apply_if_clear(robot: Robot, commands: str, obstacles: Container[Position]) -> bool:
+    """
+    Apply a command string as a single precompiled move when no blocked
+    cell lies inside the box its path sweeps. Returns False, leaving the
+    robot untouched, when the path has to be checked step by step.
+    """
+    compiled = compile_commands(commands)
+    if compiled.moves and any_blocked(
+        obstacles, *compiled.bounds(robot.position, robot.heading)
+    ):
+        return False
+    compiled.apply(robot)
+    return True
+
+
+def execute(robot: Robot, commands: str, obstacles: Container[Position]) -> bool:
+    """Parse and execute a command string; True when an obstacle was detected"""
+    node = parse_commands(commands)
+    if isinstance(obstacles, set | frozenset) and len(obstacles) > MIN_BOX_CHECKS:
+        # Box checks against a set scan all of it; a grid answers them by tile
+        obstacles = ObstacleGrid(obstacles)
+    return run(node, robot, obstacles, _Budget(node.segment.length))
@@ -0,0 +1,169 @@
+import time
+from collections import OrderedDict
+from collections.abc import Container
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from src.models.robot import Direction, Position, Robot
+from src.services.command_program import compile_commands
+from src.services.obstacle_index import ObstacleIndex
+from src.services.occupancy_index import BlockedCells
+from src.services.robot_service import CommandExecutor
+from src.settings import settings
+
+# Command string, start position and start direction
+ExecutionKey = tuple[str, Position, Direction]
+
+
+@dataclass(frozen=True)
+class ExecutionResult:
+    position: Position
+    direction: Direction
+    obstacle_detected: bool
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class ExecutionCache:
+    """
+    Least recently used cache of command string results, with entries
+    expiring ``ttl`` seconds after they were stored (0 keeps them until
+    evicted).
+
+    Results are only valid for one state of the obstacle map. The cache
+    remembers which index and version its entries were computed against
+    and drops all of them as soon as it is asked about another one, so an
+    obstacle write never serves a stale result.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.EXECUTION_CACHE_SIZE,
+        ttl: float = settings.EXECUTION_CACHE_TTL,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: OrderedDict[ExecutionKey, tuple[float, ExecutionResult]] = (
+            OrderedDict()
+        )
+        self._map: tuple[int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync(self, obstacles: ObstacleIndex) -> None:
+        current = (id(obstacles), obstacles.version)
+        if current != self._map:
+            if self._entries:
+                self.stats.invalidations += 1
+                self._entries.clear()
+            self._map = current
+
+    def get(
+        self, obstacles: ObstacleIndex, key: ExecutionKey
+    ) -> ExecutionResult | None:
+        self._sync(obstacles)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        stored_at, result = entry
+        if self.ttl and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return result
+
+    def miss(self) -> None:
+        """Count a lookup that could not be served from the cache at all"""
+        self.stats.misses += 1
+
+    def put(
+        self, obstacles: ObstacleIndex, key: ExecutionKey, result: ExecutionResult
+    ) -> None:
+        self._sync(obstacles)
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def metrics(self) -> dict[str, Any]:
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            **asdict(self.stats),
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_ratio": self.stats.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._map = None
+        self.stats = CacheStats()
+
+
+class CachedExecutor:
+    """
+    Command executor that serves repeated command strings from an
+    ExecutionCache instead of simulating them again.
+
+    Results are keyed against the static obstacle index. When other robots
+    block cells, a result is only served or stored if no other robot lies
+    inside the box the command string's path sweeps, where it could not
+    have changed the outcome. Runs against obstacles fetched per request
+    are always computed and counted as misses.
+    """
+
+    def __init__(self, executor: CommandExecutor, cache: ExecutionCache) -> None:
+        self.executor = executor
+        self.cache = cache
+
+    def execute_commands(
+        self, robot: Robot, commands: str, obstacles: Container[Position] | None = None
+    ) -> dict[str, Any]:
+        index = obstacles
+        if isinstance(obstacles, BlockedCells):
+            index = obstacles.obstacles
+            path = compile_commands(commands).bounds(robot.position, robot.heading)
+            if obstacles.robots_in(*path):
+                index = None
+        if not isinstance(index, ObstacleIndex):
+            self.cache.miss()
+            return self.executor.execute_commands(robot, commands, obstacles)
+
+        key = (commands, robot.position, robot.direction)
+        result = self.cache.get(index, key)
+        if result is None:
+            detected = robot.obstacle_detected
+            robot.obstacle_detected = False
+            self.executor.execute_commands(robot, commands, obstacles)
+            result = ExecutionResult(
+                robot.position, robot.direction, robot.obstacle_detected
+            )
+            self.cache.put(index, key, result)
+            robot.obstacle_detected = detected
+        else:
+            robot.position = result.position
+            robot.direction = result.direction
+
+        robot.obstacle_detected = robot.obstacle_detected or result.obstacle_detected
+        return {
+            "position": {"x": robot.position.x, "y": robot.position.y},
+            "direction": robot.direction.value,
+            "obstacle_detected": robot.obstacle_detected,
+        }
+
+
+execution_cache = ExecutionCache()
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.pool import NullPool
+
+from src.models.command_history import CommandHistory
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["parquet", "arrow"]
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+COLUMNS = (
+    CommandHistory.id,
+    CommandHistory.robot_id,
+    CommandHistory.command,
+    CommandHistory.position_x,
+    CommandHistory.position_y,
+    CommandHistory.direction,
+    CommandHistory.obstacle_detected,
+    CommandHistory.executed_at,
+)
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError(
+            "Exporting command history requires pyarrow, install the "
+            "'export' extra: pip install 'moon-robot[export]'"
+        ) from e
+    return pa
+
+
+def _schema(pa: Any) -> Any:
+    return pa.schema([
+        ("id", pa.int64()),
+        ("robot_id", pa.int64()),
+        ("command", pa.string()),
+        ("position_x", pa.int32()),
+        ("position_y", pa.int32()),
+        ("direction", pa.string()),
+        ("obstacle_detected", pa.bool_()),
+        ("executed_at", pa.timestamp("us")),
+    ])
+
+
+def _open_writer(pa: Any, path: Path, export_format: ExportFormat, schema: Any) -> Any:
+    if export_format == "parquet":
+        return pa.parquet.ParquetWriter(path, schema, compression="zstd")
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    return pa.ipc.new_file(path, schema, options=options)
+
+
+def format_for(path: Path) -> ExportFormat:
+    """Pick the format from the file extension, defaulting to Parquet"""
+    if path.suffix in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "parquet"
+
+
+async def export_history(
+    path: Path,
+    export_format: ExportFormat | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db_engine: AsyncEngine | None = None,
+) -> int:
+    """
+    Stream command_history into a Parquet or Arrow IPC file and return the
+    number of rows written.
+
+    Rows are fetched through a server-side cursor ``chunk_size`` at a time,
+    and each chunk is written out as its own row group or record batch
+    before the next one is fetched, so memory use depends on the chunk size
+    and not on the size of the table. Rows are written in storage order.
+    """
+    pa = _import_pyarrow()
+    schema = _schema(pa)
+    export_format = export_format or format_for(path)
+
+    stmt = select(*COLUMNS)
+    if since is not None:
+        stmt = stmt.where(CommandHistory.executed_at >= since)
+    if until is not None:
+        stmt = stmt.where(CommandHistory.executed_at < until)
+
+    # A dedicated connection outside the application's pool, so a long export
+    # never holds one of the API's connections
+    own_engine = db_engine is None
+    db_engine = db_engine or create_async_engine(
+        settings.database_url, poolclass=NullPool
+    )
+    partial = path.with_name(path.name + ".partial")
+    rows_written = 0
+    try:
+        async with db_engine.connect() as conn:
+            result = await conn.stream(stmt.execution_options(yield_per=chunk_size))
+            with _open_writer(pa, partial, export_format, schema) as writer:
+                async for rows in result.partitions(chunk_size):
+                    columns = zip(*rows, strict=True)
+                    batch = pa.RecordBatch.from_arrays(
+                        [
+                            pa.array(column, type=field.type)
+                            for column, field in zip(columns, schema, strict=True)
+                        ],
+                        schema=schema,
+                    )
+                    writer.write_batch(batch)
+                    rows_written += len(rows)
+                    logger.info(f"Exported {rows_written} command history rows")
+        partial.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+        if own_engine:
+            await db_engine.dispose()
+
+    return rows_written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export command history to a Parquet or Arrow IPC file"
+    )
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--format", choices=["parquet", "arrow"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        export_history(
+            args.output,
+            export_format=args.format,
+            chunk_size=args.chunk_size,
+            since=args.since,
+            until=args.until,
+        )
+    )
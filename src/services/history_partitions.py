@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import gzip
+import logging
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.services.database import engine
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "command_history"
+DEFAULT_PARTITION = "command_history_default"
+_PARTITION_NAME = re.compile(r"^command_history_(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """The month a partition covers, or None for tables that are not monthly"""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+@dataclass
+class PartitionPlan:
+    create: list[date] = field(default_factory=list)
+    expire: list[date] = field(default_factory=list)
+
+
+def plan_partitions(
+    existing: Iterable[date],
+    today: date,
+    premake: int,
+    retention_months: int | None,
+) -> PartitionPlan:
+    """
+    Work out which monthly partitions to create and which have expired.
+    The current month and ``premake`` months after it must exist; with a
+    retention of N months, partitions older than N months before the current
+    one expire.
+    """
+    existing = set(existing)
+    current = today.replace(day=1)
+    upcoming = (add_months(current, offset) for offset in range(premake + 1))
+    plan = PartitionPlan(create=[month for month in upcoming if month not in existing])
+    if retention_months is not None:
+        cutoff = add_months(current, -retention_months)
+        plan.expire = sorted(month for month in existing if month < cutoff)
+    return plan
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+        ),
+        {"table": TABLE},
+    )
+    return result.first() is not None
+
+
+async def list_partitions(conn: AsyncConnection) -> list[date]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": TABLE},
+    )
+    months = (partition_month(name) for name in result.scalars())
+    return sorted(month for month in months if month is not None)
+
+
+async def list_detached(conn: AsyncConnection) -> list[date]:
+    """Monthly tables left detached by an earlier run"""
+    result = await conn.execute(
+        text(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind = 'r' AND NOT relispartition "
+            "AND relnamespace = current_schema()::regnamespace "
+            "AND relname LIKE :prefix"
+        ),
+        {"prefix": f"{TABLE}\\_%"},
+    )
+    months = (partition_month(name) for name in result.scalars())
+    return sorted(month for month in months if month is not None)
+
+
+async def create_partition(conn: AsyncConnection, month: date) -> int:
+    """
+    Create the partition for ``month`` and return how many rows it took
+    over from the default partition. ``PARTITION OF`` fails when the default
+    partition already holds rows in range, so the table is built standalone,
+    filled from the default partition and then attached.
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    await conn.execute(
+        text(
+            f'CREATE TABLE "{name}" '
+            f"(LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    moved = await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE executed_at >= :start AND executed_at < :end RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        bounds,
+    )
+    await conn.execute(
+        text(
+            f'ALTER TABLE {TABLE} ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+    )
+    return moved.rowcount
+
+
+async def detach_partition(conn: AsyncConnection, month: date) -> None:
+    await conn.execute(
+        text(f'ALTER TABLE {TABLE} DETACH PARTITION "{partition_name(month)}"')
+    )
+
+
+async def export_table(conn: AsyncConnection, month: date, archive_dir: Path) -> Path:
+    """
+    Stream a detached monthly table into a gzip-compressed CSV file through
+    COPY, one chunk at a time. The file only appears under its final name
+    once the export has completed.
+    """
+    name = partition_name(month)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    partial = archive_dir / f"{name}.csv.gz.partial"
+
+    raw_connection = await conn.get_raw_connection()
+    # COPY goes through asyncpg directly, which SQLAlchemy does not wrap
+    driver_connection = raw_connection.driver_connection
+    assert driver_connection is not None
+    with gzip.open(partial, "wb") as archive:
+
+        async def write(chunk: bytes) -> None:
+            archive.write(chunk)
+
+        await driver_connection.copy_from_table(
+            name, output=write, format="csv", header=True
+        )
+    partial.replace(path)
+    return path
+
+
+async def maintain_partitions(
+    db_engine: AsyncEngine | None = None,
+    today: date | None = None,
+    premake: int = settings.HISTORY_PARTITION_PREMAKE,
+    retention_months: int | None = settings.HISTORY_RETENTION_MONTHS,
+    action: str = settings.HISTORY_RETENTION_ACTION,
+    archive_dir: str = settings.HISTORY_ARCHIVE_DIR,
+    dry_run: bool = False,
+) -> PartitionPlan:
+    """
+    Create upcoming command_history partitions and expire old ones.
+    Expired partitions are detached; with the "archive" action they are then
+    exported to ``archive_dir`` and dropped. Each step commits on its own, so
+    an interrupted run is picked up by the next one.
+    """
+    db_engine = db_engine or engine
+    if db_engine.dialect.name != "postgresql":
+        logger.info("command_history is only partitioned on PostgreSQL, skipping")
+        return PartitionPlan()
+
+    today = today or datetime.now(UTC).date()
+    async with db_engine.connect() as conn:
+        if not await is_partitioned(conn):
+            raise RuntimeError(
+                "command_history is not partitioned, run `alembic upgrade head`"
+            )
+        plan = plan_partitions(
+            await list_partitions(conn), today, premake, retention_months
+        )
+        leftovers = await list_detached(conn) if action == "archive" else []
+
+    logger.info(
+        f"Partitions to create: {[partition_name(m) for m in plan.create]}, "
+        f"to expire: {[partition_name(m) for m in plan.expire]}"
+    )
+    if dry_run:
+        return plan
+
+    for month in plan.create:
+        async with db_engine.begin() as conn:
+            moved = await create_partition(conn, month)
+        logger.info(
+            f"Created partition {partition_name(month)} "
+            f"({moved} rows moved from the default partition)"
+        )
+
+    for month in plan.expire:
+        async with db_engine.begin() as conn:
+            await detach_partition(conn, month)
+        logger.info(f"Detached partition {partition_name(month)}")
+
+    if action == "archive":
+        for month in sorted({*plan.expire, *leftovers}):
+            async with db_engine.connect() as conn:
+                path = await export_table(conn, month, Path(archive_dir))
+            async with db_engine.begin() as conn:
+                await conn.execute(text(f'DROP TABLE "{partition_name(month)}"'))
+            logger.info(f"Archived {partition_name(month)} to {path}")
+
+    return plan
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        await maintain_partitions(
+            premake=args.premake,
+            retention_months=args.retention_months,
+            action=args.action,
+            archive_dir=args.archive_dir,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Create upcoming command_history partitions and expire old ones"
+    )
+    parser.add_argument(
+        "--premake", type=int, default=settings.HISTORY_PARTITION_PREMAKE
+    )
+    parser.add_argument(
+        "--retention-months", type=int, default=settings.HISTORY_RETENTION_MONTHS
+    )
+    parser.add_argument(
+        "--action",
+        choices=["detach", "archive"],
+        default=settings.HISTORY_RETENTION_ACTION,
+    )
+    parser.add_argument("--archive-dir", default=settings.HISTORY_ARCHIVE_DIR)
+    parser.add_argument("--dry-run", action="store_true")
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
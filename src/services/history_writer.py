@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models.command_history import CommandHistory
+from src.services.database import AsyncSessionLocal
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ATTEMPTS = 3
+
+
+class HistoryWriter:
+    """
+    Write-behind buffer for CommandHistory inserts.
+
+    Rows are queued in a bounded in-memory buffer and inserted in bulk by a
+    background task once ``flush_size`` rows are waiting or
+    ``flush_interval`` seconds have passed since the first one. When the
+    buffer is full, ``add`` waits for the writer to catch up.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_size: int = settings.HISTORY_BUFFER_SIZE,
+        flush_size: int = settings.HISTORY_FLUSH_SIZE,
+        flush_interval: float = settings.HISTORY_FLUSH_INTERVAL,
+    ) -> None:
+        self.session_factory = session_factory
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_size)
+        self._task: asyncio.Task[None] | None = None
+        self._in_flight: asyncio.Future[None] | None = None
+        self._batch: list[dict[str, Any]] = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._batch)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def add(self, rows: list[dict[str, Any]]) -> None:
+        """Queue history rows, waiting while the buffer is full"""
+        self.start()
+        for row in rows:
+            await self._queue.put(row)
+
+    async def flush(self) -> None:
+        """Write every buffered row now; the writer restarts on the next add"""
+        await self.stop()
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._in_flight is not None:
+            await asyncio.gather(self._in_flight, return_exceptions=True)
+            self._in_flight = None
+
+        rows, self._batch = self._batch, []
+        while not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        if rows:
+            await self._write(rows)
+
+    async def _run(self) -> None:
+        while True:
+            self._batch.append(await self._queue.get())
+            # asyncio.timeout rather than wait_for, which can swallow a
+            # cancellation that races with a completed get on Python 3.11
+            try:
+                async with asyncio.timeout(self.flush_interval):
+                    while len(self._batch) < self.flush_size:
+                        self._batch.append(await self._queue.get())
+            except TimeoutError:
+                pass
+
+            rows, self._batch = self._batch, []
+            # Shielded so that stopping the writer never abandons a bulk insert
+            self._in_flight = asyncio.ensure_future(self._write(rows))
+            await asyncio.shield(self._in_flight)
+            self._in_flight = None
+
+    async def _write(self, rows: list[dict[str, Any]]) -> None:
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(insert(CommandHistory), rows)
+                    await session.commit()
+                return
+            except SQLAlchemyError as e:
+                logger.error(
+                    f"Failed to write {len(rows)} history rows "
+                    f"(attempt {attempt}/{FLUSH_ATTEMPTS}): {e}"
+                )
+                await asyncio.sleep(self.flush_interval * attempt)
+        logger.error(f"Dropped {len(rows)} history rows after repeated failures")
+
+
+history_writer = HistoryWriter(AsyncSessionLocal)
@@ -7,6 +7,7 @@ from sqlalchemy.future import select
 from src.models.base import Base
 from src.models.obstacle import Obstacle
 from src.services.database import engine
+from src.services.obstacle_index import obstacle_index, record_obstacle_change
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,9 @@ async def init_db(custom_engine: AsyncEngine | None = None) -> None:
                             Obstacle(position_x=7, position_y=4),
                         ]
                         session.add_all(default_obstacles)
+                        await record_obstacle_change(session, "reload")
                         await session.commit()
+                        obstacle_index.invalidate()
                         logger.info(
                             f"Added {len(default_obstacles)} default obstacles "
                             + "to the database"
@@ -0,0 +1,540 @@
+from collections.abc import Iterable, Iterator, MutableSet
+from typing import Protocol
+
+import numpy as np
+import numpy.typing as npt
+
+from src.models.robot import Position
+
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+# Tiles are TILE_SIZE x TILE_SIZE cells stored as one bit per cell, row by
+# row, least significant bit first: 64 x 64 cells take 512 bytes
+TILE_SHIFT = 6
+TILE_SIZE = 1 << TILE_SHIFT
+TILE_MASK = TILE_SIZE - 1
+TILE_BYTES = TILE_SIZE * TILE_SIZE // 8
+
+# A tile holding at most SPARSE_LIMIT obstacles is stored as the sorted
+# uint16 offsets of its cells instead, at two bytes per obstacle
+SPARSE_LIMIT = TILE_BYTES // 2
+
+# Bitmap tiles allocated by single adds before they are packed into the
+# sparse tiles, at least; the allowance grows with the sparse tiles
+COMPACT_TILES = 1024
+
+# Multipliers hashing a tile into the filter of the sparse tiles
+_HASH_X = 0x9E3779B1
+_HASH_Y = 0x85EBCA77
+
+# (x, y) offsets within a tile of each of its TILE_SIZE * TILE_SIZE bits
+_CELL_X = np.tile(np.arange(TILE_SIZE, dtype=np.int64), TILE_SIZE)
+_CELL_Y = np.repeat(np.arange(TILE_SIZE, dtype=np.int64), TILE_SIZE)
+
+
+def _encode(tx: IntArray, ty: IntArray) -> IntArray:
+    """Pack tile coordinates into single int64 keys"""
+    return np.asarray((tx << 32) | (ty & 0xFFFFFFFF), dtype=np.int64)
+
+
+def _decode(keys: IntArray) -> tuple[IntArray, IntArray]:
+    tx = keys >> 32
+    ty = ((keys & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+    return tx, ty
+
+
+def _by_tile(
+    xs: npt.ArrayLike, ys: npt.ArrayLike
+) -> Iterator[tuple[tuple[int, int], IntArray, IntArray]]:
+    """
+    Group cells by tile, yielding each tile key with the indices of its
+    cells in the input and their bit offsets within the tile
+    """
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    if not xs.size:
+        return
+    keys = _encode(xs >> TILE_SHIFT, ys >> TILE_SHIFT)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    offsets = (ys[order] & TILE_MASK) * TILE_SIZE + (xs[order] & TILE_MASK)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], keys.size]
+    tile_xs, tile_ys = _decode(keys[starts])
+    for tx, ty, start, end in zip(
+        tile_xs.tolist(),
+        tile_ys.tolist(),
+        starts.tolist(),
+        ends.tolist(),
+        strict=True,
+    ):
+        yield (tx, ty), order[start:end], offsets[start:end]
+
+
+class _SparseTiles:
+    """
+    Tiles holding few obstacles, packed into flat arrays: the sorted keys
+    of the tiles, the end of each tile's run in ``cells``, and the sorted
+    cell offsets of all tiles back to back. A filter of about one byte per
+    tile answers most lookups of absent tiles without a search.
+    """
+
+    def __init__(
+        self, keys: IntArray, counts: IntArray, cells: npt.NDArray[np.uint16]
+    ) -> None:
+        self.keys = keys
+        self.ends = np.cumsum(counts).astype(np.uint32)
+        self.cells = cells
+        # Tiles copied into bitmaps by a write; the bitmap takes precedence
+        self.shadowed = np.zeros(keys.size, dtype=np.bool_)
+        size = 64 if keys.size else 0
+        while size < 8 * keys.size:
+            size <<= 1
+        self._mask = size - 1
+        bits = np.zeros(size // 8, dtype=np.uint8)
+        if keys.size:
+            tx, ty = _decode(keys)
+            hashes = (tx * _HASH_X + ty * _HASH_Y) & self._mask
+            np.bitwise_or.at(bits, hashes >> 3, (1 << (hashes & 7)).astype(np.uint8))
+        self._filter = bits.tobytes()
+
+    @classmethod
+    def build(
+        cls, keys: IntArray, offsets: IntArray
+    ) -> tuple["_SparseTiles", dict[tuple[int, int], bytearray]]:
+        """
+        Pack (tile key, cell offset) pairs, returning the tiles holding more
+        than SPARSE_LIMIT cells separately as bitmaps
+        """
+        dense: dict[tuple[int, int], bytearray] = {}
+        if not keys.size:
+            return cls.empty(), dense
+        order = np.lexsort((offsets, keys))
+        keys, offsets = keys[order], offsets[order]
+        distinct = np.r_[True, (keys[1:] != keys[:-1]) | (offsets[1:] != offsets[:-1])]
+        keys, offsets = keys[distinct], offsets[distinct]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[starts, keys.size])
+        sparse = counts <= SPARSE_LIMIT
+
+        tile_xs, tile_ys = _decode(keys[starts])
+        for index in np.flatnonzero(~sparse).tolist():
+            run = offsets[starts[index] : starts[index] + counts[index]]
+            key = (int(tile_xs[index]), int(tile_ys[index]))
+            dense[key] = _bitmap(run)
+        cells = offsets[np.repeat(sparse, counts)].astype(np.uint16)
+        return cls(keys[starts][sparse], counts[sparse], cells), dense
+
+    @classmethod
+    def empty(cls) -> "_SparseTiles":
+        return cls(
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.uint16),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.keys, self.ends, self.cells, self.shadowed)
+        return sum(array.nbytes for array in arrays) + len(self._filter)
+
+    def find(self, tx: int, ty: int) -> int:
+        """Index of a tile, or -1 when it is not stored here"""
+        if not self.keys.size:
+            return -1
+        bit = (tx * _HASH_X + ty * _HASH_Y) & self._mask
+        if not self._filter[bit >> 3] >> (bit & 7) & 1:
+            return -1
+        key = (tx << 32) | (ty & 0xFFFFFFFF)
+        index = int(np.searchsorted(self.keys, key))
+        if index < self.keys.size and self.keys[index] == key:
+            return index
+        return -1
+
+    def run(self, index: int) -> npt.NDArray[np.uint16]:
+        """Cell offsets of a tile"""
+        start = int(self.ends[index - 1]) if index else 0
+        return self.cells[start : int(self.ends[index])]
+
+    def pairs(self) -> tuple[IntArray, IntArray]:
+        """Tile key and offset of every cell of the tiles not shadowed"""
+        ends = self.ends.astype(np.int64)
+        counts = ends - np.r_[0, ends[:-1]]
+        live = ~self.shadowed
+        keys = np.repeat(self.keys[live], counts[live])
+        return keys, self.cells[np.repeat(live, counts)].astype(np.int64)
+
+    def live_cells(self) -> tuple[IntArray, IntArray]:
+        """Coordinates of every cell of the tiles not shadowed"""
+        keys, offsets = self.pairs()
+        tx, ty = _decode(keys)
+        xs = (tx << TILE_SHIFT) + (offsets & TILE_MASK)
+        ys = (ty << TILE_SHIFT) + (offsets >> TILE_SHIFT)
+        return xs, ys
+
+    def any_in(self, min_x: int, min_y: int, max_x: int, max_y: int) -> bool:
+        """Whether a cell of a tile not shadowed lies inside the rectangle"""
+        if not self.keys.size:
+            return False
+        # Keys sort by tile column first, so the columns are one slice
+        low = int(np.searchsorted(self.keys, (min_x >> TILE_SHIFT) << 32))
+        high = int(np.searchsorted(self.keys, ((max_x >> TILE_SHIFT) + 1) << 32))
+        if low >= high:
+            return False
+        _, tile_ys = _decode(self.keys[low:high])
+        selected = low + np.flatnonzero(
+            (tile_ys >= min_y >> TILE_SHIFT)
+            & (tile_ys <= max_y >> TILE_SHIFT)
+            & ~self.shadowed[low:high]
+        )
+        if not selected.size:
+            return False
+
+        ends = self.ends.astype(np.int64)
+        stops = ends[selected]
+        starts = np.where(selected > 0, ends[selected - 1], 0)
+        counts = stops - starts
+        first = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        offsets = self.cells[first + np.arange(first.size)].astype(np.int64)
+        tx, ty = _decode(np.repeat(self.keys[selected], counts))
+        xs = (tx << TILE_SHIFT) + (offsets & TILE_MASK)
+        ys = (ty << TILE_SHIFT) + (offsets >> TILE_SHIFT)
+        return bool(
+            ((xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y)).any()
+        )
+
+
+def _bitmap(offsets: npt.ArrayLike) -> bytearray:
+    cells = np.asarray(offsets, dtype=np.int64)
+    bits = np.zeros(TILE_BYTES, dtype=np.uint8)
+    np.bitwise_or.at(bits, cells >> 3, (1 << (cells & 7)).astype(np.uint8))
+    return bytearray(bits.tobytes())
+
+
+class TileSource(Protocol):
+    """Read-only tiles an ObstacleGrid can be layered on, e.g. a mapped file"""
+
+    @property
+    def count(self) -> int: ...
+
+    def tile(self, key: tuple[int, int]) -> memoryview | None: ...
+
+    def tile_keys(self) -> Iterator[tuple[int, int]]: ...
+
+
+class ObstacleGrid(MutableSet[Position]):
+    """
+    Compact set of obstacle cells: the plane is cut into fixed-size square
+    tiles and only tiles holding at least one obstacle are stored. A tile
+    with more than SPARSE_LIMIT obstacles is a bitmap of one bit per cell;
+    the others are packed together as sorted two-byte cell offsets.
+
+    A dense map costs one bit per cell, a clustered one about two bytes per
+    obstacle, and a map of isolated points about 17 bytes per obstacle, for
+    the tile key, the run end and the filter. A set of Positions costs some
+    170 bytes per obstacle.
+
+    Membership is a dict lookup for bitmap tiles and, for packed tiles, a
+    filter probe and a binary search over the tile keys. Bulk updates and
+    lookups over coordinate arrays are vectorized. Single adds write
+    bitmaps, which are packed again once enough of them have accumulated.
+
+    A grid can be layered on a read-only ``base`` of tiles: the first write
+    to a tile copies it into the grid, and the copy shadows the base tile
+    from then on.
+    """
+
+    def __init__(
+        self, positions: Iterable[Position] = (), base: TileSource | None = None
+    ) -> None:
+        self._tiles: dict[tuple[int, int], bytearray] = {}
+        self._sparse = _SparseTiles.empty()
+        self._fresh = 0
+        self._base = base
+        self._count = base.count if base is not None else 0
+        cells = np.array(list(positions), dtype=np.int64).reshape(-1, 2)
+        if cells.size:
+            self.add_many(cells[:, 0], cells[:, 1])
+
+    def __contains__(self, position: object) -> bool:
+        try:
+            x: int
+            y: int
+            x, y = position  # type: ignore[misc]
+            tx, ty = x >> TILE_SHIFT, y >> TILE_SHIFT
+            tile: bytearray | memoryview | None = self._tiles.get((tx, ty))
+        except (TypeError, ValueError):
+            return False
+        offset = (y & TILE_MASK) * TILE_SIZE + (x & TILE_MASK)
+        if tile is None:
+            # Bind the packed tiles once: a repack may swap them meanwhile
+            sparse = self._sparse
+            index = sparse.find(tx, ty)
+            if index >= 0:
+                return offset in sparse.run(index)
+            if self._base is None:
+                return False
+            tile = self._base.tile((tx, ty))
+            if tile is None:
+                return False
+        return bool(tile[offset >> 3] >> (offset & 7) & 1)
+
+    def __iter__(self) -> Iterator[Position]:
+        xs, ys = self._sparse.live_cells()
+        for x, y in zip(xs.tolist(), ys.tolist(), strict=True):
+            yield Position(x, y)
+        for (tx, ty), tile in self._bitmap_tiles():
+            bits = np.unpackbits(np.frombuffer(tile, dtype=np.uint8), bitorder="little")
+            cells = np.flatnonzero(bits)
+            xs = (tx << TILE_SHIFT) + _CELL_X[cells]
+            ys = (ty << TILE_SHIFT) + _CELL_Y[cells]
+            for x, y in zip(xs.tolist(), ys.tolist(), strict=True):
+                yield Position(x, y)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def tile_count(self) -> int:
+        return len(self._tiles) + int(np.count_nonzero(~self._sparse.shadowed))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the grid's own tiles, excluding its base"""
+        return len(self._tiles) * TILE_BYTES + self._sparse.nbytes
+
+    def _tile(self, key: tuple[int, int]) -> bytearray | memoryview | None:
+        tile = self._tiles.get(key)
+        if tile is not None:
+            return tile
+        sparse = self._sparse
+        index = sparse.find(*key)
+        if index >= 0:
+            return _bitmap(sparse.run(index))
+        if self._base is not None:
+            return self._base.tile(key)
+        return None
+
+    def _bitmap_tile(self, key: tuple[int, int]) -> bytearray | memoryview | None:
+        tile = self._tiles.get(key)
+        if tile is None and self._base is not None:
+            return self._base.tile(key)
+        return tile
+
+    def _writable_tile(self, key: tuple[int, int]) -> bytearray:
+        tile = self._tiles.get(key)
+        if tile is None:
+            index = self._sparse.find(*key)
+            if index >= 0:
+                tile = _bitmap(self._sparse.run(index))
+                self._sparse.shadowed[index] = True
+            else:
+                base_tile = self._base.tile(key) if self._base is not None else None
+                tile = bytearray(base_tile if base_tile is not None else TILE_BYTES)
+                self._fresh += base_tile is None
+            self._tiles[key] = tile
+        return tile
+
+    def _bitmap_tiles(self) -> Iterator[tuple[tuple[int, int], bytearray | memoryview]]:
+        keys = list(self._tiles)
+        if self._base is not None:
+            keys.extend(key for key in self._base.tile_keys() if key not in self._tiles)
+        for key in keys:
+            tile = self._bitmap_tile(key)
+            if tile is not None and any(tile):
+                yield key, tile
+
+    def tiles(self) -> Iterator[tuple[tuple[int, int], bytearray | memoryview]]:
+        """Yield the key and bitmap of every tile holding an obstacle"""
+        yield from self._bitmap_tiles()
+        live = np.flatnonzero(~self._sparse.shadowed)
+        tile_xs, tile_ys = _decode(self._sparse.keys[live])
+        for index, tx, ty in zip(
+            live.tolist(), tile_xs.tolist(), tile_ys.tolist(), strict=True
+        ):
+            yield (tx, ty), _bitmap(self._sparse.run(index))
+
+    def add(self, position: Position) -> None:
+        if position in self:
+            return
+        x, y = position
+        offset = (y & TILE_MASK) * TILE_SIZE + (x & TILE_MASK)
+        tile = self._writable_tile((x >> TILE_SHIFT, y >> TILE_SHIFT))
+        tile[offset >> 3] |= 1 << (offset & 7)
+        self._count += 1
+        if self._fresh > max(COMPACT_TILES, self._sparse.keys.size // 4):
+            self.compact()
+
+    def discard(self, position: Position) -> None:
+        if position not in self:
+            return
+        x, y = position
+        key = (x >> TILE_SHIFT, y >> TILE_SHIFT)
+        offset = (y & TILE_MASK) * TILE_SIZE + (x & TILE_MASK)
+        writable = self._writable_tile(key)
+        writable[offset >> 3] &= ~(1 << (offset & 7))
+        self._count -= 1
+        # An empty copy still has to shadow the packed or base tile
+        shadows = self._sparse.find(*key) >= 0 or (
+            self._base is not None and self._base.tile(key) is not None
+        )
+        if not shadows and not any(writable):
+            del self._tiles[key]
+
+    def clear(self) -> None:
+        self._tiles.clear()
+        self._sparse = _SparseTiles.empty()
+        self._fresh = 0
+        self._base = None
+        self._count = 0
+
+    def _owned_by_base(self, key: tuple[int, int]) -> bool:
+        return self._base is not None and self._base.tile(key) is not None
+
+    def compact(self) -> None:
+        """Pack the bitmap tiles holding few obstacles into the sparse tiles"""
+        moved, keys, offsets = [], [], []
+        for key, tile in list(self._tiles.items()):
+            if self._owned_by_base(key):
+                continue
+            bits = np.unpackbits(np.frombuffer(tile, dtype=np.uint8), bitorder="little")
+            cells = np.flatnonzero(bits)
+            if cells.size > SPARSE_LIMIT:
+                continue
+            moved.append(key)
+            packed = (key[0] << 32) | (key[1] & 0xFFFFFFFF)
+            keys.append(np.full(cells.size, packed, dtype=np.int64))
+            offsets.append(cells.astype(np.int64))
+        self._repack(keys, offsets)
+        # Drop the bitmaps only once the packed copies are in place, so that
+        # readers in other threads see every cell throughout
+        for key in moved:
+            del self._tiles[key]
+        self._fresh = 0
+
+    def _repack(self, keys: list[IntArray], offsets: list[IntArray]) -> int:
+        """
+        Rebuild the sparse tiles with extra (tile key, offset) pairs for
+        tiles without a bitmap. Returns the number of cells gained.
+        """
+        live_keys, live_offsets = self._sparse.pairs()
+        sparse, dense = _SparseTiles.build(
+            np.concatenate([live_keys, *keys]), np.concatenate([live_offsets, *offsets])
+        )
+        # Bitmaps first: until the swap, tiles that outgrew the packed form
+        # are still found in the old packed tiles
+        self._tiles.update(dense)
+        self._sparse = sparse
+        after = int(sparse.ends[-1]) if sparse.ends.size else 0
+        after += sum(
+            int(np.bitwise_count(np.frombuffer(t, np.uint8)).sum())
+            for t in dense.values()
+        )
+        return after - live_keys.size
+
+    def add_many(self, xs: npt.ArrayLike, ys: npt.ArrayLike) -> None:
+        """
+        Add every (xs[i], ys[i]) cell: one vectorized write per bitmap tile,
+        and a single repacking of the sparse tiles for the others
+        """
+        keys, offsets = [], []
+        for key, _, cells in _by_tile(xs, ys):
+            if key in self._tiles or self._owned_by_base(key):
+                bits = np.frombuffer(self._writable_tile(key), dtype=np.uint8)
+                before = int(np.bitwise_count(bits).sum())
+                np.bitwise_or.at(bits, cells >> 3, (1 << (cells & 7)).astype(np.uint8))
+                self._count += int(np.bitwise_count(bits).sum()) - before
+            else:
+                packed = (key[0] << 32) | (key[1] & 0xFFFFFFFF)
+                keys.append(np.full(cells.size, packed, dtype=np.int64))
+                offsets.append(cells)
+        if keys:
+            self._count += self._repack(keys, offsets)
+
+    def contains_many(self, xs: npt.ArrayLike, ys: npt.ArrayLike) -> BoolArray:
+        """Return a mask of the (xs[i], ys[i]) cells holding an obstacle"""
+        found = np.zeros(np.shape(xs), dtype=np.bool_)
+        if not self._count:
+            return found
+        for key, indices, cells in _by_tile(xs, ys):
+            tile = self._tile(key)
+            if tile is not None:
+                bits = np.frombuffer(tile, dtype=np.uint8)
+                found[indices] = (bits[cells >> 3] >> (cells & 7)) & 1 != 0
+        return found
+
+    def window(self, min_x: int, min_y: int, width: int, height: int) -> BoolArray:
+        """
+        Return a (height, width) mask of the obstacles in the rectangle
+        starting at (min_x, min_y), indexed [y - min_y, x - min_x]
+        """
+        mask = np.zeros((height, width), dtype=np.bool_)
+        if not self._count or width <= 0 or height <= 0:
+            return mask
+        max_x, max_y = min_x + width, min_y + height
+        for ty in range(min_y >> TILE_SHIFT, ((max_y - 1) >> TILE_SHIFT) + 1):
+            for tx in range(min_x >> TILE_SHIFT, ((max_x - 1) >> TILE_SHIFT) + 1):
+                tile = self._tile((tx, ty))
+                if tile is None:
+                    continue
+                cells = np.unpackbits(
+                    np.frombuffer(tile, dtype=np.uint8), bitorder="little"
+                ).reshape(TILE_SIZE, TILE_SIZE)
+                origin_x, origin_y = tx << TILE_SHIFT, ty << TILE_SHIFT
+                x0, x1 = max(min_x, origin_x), min(max_x, origin_x + TILE_SIZE)
+                y0, y1 = max(min_y, origin_y), min(max_y, origin_y + TILE_SIZE)
+                mask[y0 - min_y : y1 - min_y, x0 - min_x : x1 - min_x] = cells[
+                    y0 - origin_y : y1 - origin_y, x0 - origin_x : x1 - origin_x
+                ]
+        return mask
+
+    def any_in(self, min_x: int, min_y: int, max_x: int, max_y: int) -> bool:
+        """Whether any obstacle lies inside the inclusive rectangle"""
+        if not self._count or min_x > max_x or min_y > max_y:
+            return False
+        if self._sparse.any_in(min_x, min_y, max_x, max_y):
+            return True
+        if not self._tiles and self._base is None:
+            return False
+
+        min_tx, max_tx = min_x >> TILE_SHIFT, max_x >> TILE_SHIFT
+        min_ty, max_ty = min_y >> TILE_SHIFT, max_y >> TILE_SHIFT
+        spanned = (max_tx - min_tx + 1) * (max_ty - min_ty + 1)
+        # There are never more bitmap tiles than obstacles plus shadows
+        if spanned <= self._count + len(self._tiles):
+            keys: Iterable[tuple[int, int]] = (
+                (tx, ty)
+                for ty in range(min_ty, max_ty + 1)
+                for tx in range(min_tx, max_tx + 1)
+            )
+        else:
+            # A huge rectangle: visit the allocated tiles instead
+            keys = (
+                (tx, ty)
+                for (tx, ty), _ in self._bitmap_tiles()
+                if min_tx <= tx <= max_tx and min_ty <= ty <= max_ty
+            )
+
+        for tx, ty in keys:
+            tile = self._bitmap_tile((tx, ty))
+            if tile is None or not any(tile):
+                continue
+            origin_x, origin_y = tx << TILE_SHIFT, ty << TILE_SHIFT
+            if (
+                min_x <= origin_x
+                and origin_x + TILE_MASK <= max_x
+                and min_y <= origin_y
+                and origin_y + TILE_MASK <= max_y
+            ):
+                return True
+            cells = np.unpackbits(
+                np.frombuffer(tile, dtype=np.uint8), bitorder="little"
+            ).reshape(TILE_SIZE, TILE_SIZE)
+            rows = slice(max(min_y - origin_y, 0), min(max_y - origin_y, TILE_MASK) + 1)
+            columns = slice(
+                max(min_x - origin_x, 0), min(max_x - origin_x, TILE_MASK) + 1
+            )
+            if cells[rows, columns].any():
+                return True
+        return False
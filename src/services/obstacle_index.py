@@ -0,0 +1,315 @@
+import asyncio
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from collections.abc import Set as AbstractSet
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import func, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.models.obstacle import Obstacle
+from src.models.obstacle_change import ObstacleChange
+from src.models.robot import Position
+from src.services.obstacle_grid import BoolArray, ObstacleGrid
+from src.services.obstacle_map_file import (
+    FileIdentity,
+    MapFileError,
+    ObstacleMapFile,
+    file_identity,
+    write_map_file,
+)
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Obstacle rows fetched per round trip while loading the index
+LOAD_CHUNK_SIZE = 100_000
+
+
+class ObstacleIndex(AbstractSet[Position]):
+    """
+    Process-wide, in-memory view of the obstacle map.
+
+    The index is loaded once (at startup or lazily on first use) and then
+    served from memory. Every write bumps ``version`` so callers can detect
+    that the map changed; ``invalidate`` forces a reload on next access.
+
+    Changes made by other workers reach the index through the
+    obstacle_changes feed: ``refresh`` applies the changes newer than
+    ``map_version`` instead of reloading the whole map.
+
+    Obstacles are held in an ObstacleGrid, a sparse tile bitmap of one bit
+    per cell, rather than a set of Position tuples. With ``map_file`` set,
+    the grid is layered on a memory-mapped map file shared by every worker,
+    and only the changes made since the file was built are held privately.
+    """
+
+    def __init__(self, map_file: str | None = settings.OBSTACLE_MAP_FILE) -> None:
+        self._positions = ObstacleGrid()
+        self._map_path = Path(map_file) if map_file else None
+        self._map_identity: FileIdentity | None = None
+        self._version = 0
+        self._map_version = 0
+        self._polled_at = 0.0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, position: object) -> bool:
+        return position in self._positions
+
+    def __iter__(self) -> Iterator[Position]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def map_version(self) -> int:
+        """Id of the last change feed entry reflected in the index"""
+        return self._map_version
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        Replace the index contents with the obstacle map file, when one is
+        configured and up to date, or else with the obstacles stored in the
+        database
+        """
+        try:
+            if self._map_path is None or not await self._load_map_file(session):
+                await self._load_database(session)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while loading obstacle index: {e}")
+            raise
+
+    async def _load_database(self, session: AsyncSession) -> None:
+        # Read the feed position first: changes committed while the
+        # obstacles are read are applied again later, which is harmless
+        map_version = await current_map_version(session)
+        result = await session.stream(
+            select(Obstacle.position_x, Obstacle.position_y).execution_options(
+                yield_per=LOAD_CHUNK_SIZE
+            )
+        )
+        chunks = [np.zeros((0, 2), dtype=np.int64)]
+        async for rows in result.partitions():
+            chunks.append(np.array(rows, dtype=np.int64).reshape(-1, 2))
+        # One bulk add, so the packed tiles are built once
+        coords = np.concatenate(chunks)
+        positions = ObstacleGrid()
+        positions.add_many(coords[:, 0], coords[:, 1])
+        self._set_positions(positions, map_version)
+        logger.info(f"Loaded {len(self._positions)} obstacles into the index")
+
+    async def _load_map_file(self, session: AsyncSession) -> bool:
+        """
+        Map the obstacle map file and catch up with the changes made since
+        it was built. Returns False when the file is missing, unreadable or
+        older than the last bulk load, leaving the index unchanged.
+        """
+        assert self._map_path is not None
+        self._map_identity = file_identity(self._map_path)
+        try:
+            map_file = ObstacleMapFile(self._map_path)
+        except (OSError, MapFileError) as e:
+            logger.warning(f"Cannot map obstacle map file, using the database: {e}")
+            return False
+        self._map_identity = map_file.identity
+
+        if map_file.map_version < await last_reload_version(session):
+            logger.warning(
+                f"Obstacle map file {self._map_path} predates the last bulk load, "
+                "using the database"
+            )
+            return False
+
+        self._set_positions(ObstacleGrid(base=map_file), map_file.map_version)
+        await self._apply_changes(session)
+        logger.info(
+            f"Mapped {map_file.count} obstacles from {self._map_path} "
+            f"(map version {map_file.map_version})"
+        )
+        return True
+
+    def _set_positions(self, positions: ObstacleGrid, map_version: int) -> None:
+        self._positions = positions
+        self._loaded = True
+        self._version += 1
+        self._map_version = map_version
+        self._polled_at = time.monotonic()
+
+    async def ensure_loaded(self, session: AsyncSession) -> "ObstacleIndex":
+        """Load the index if needed and return it"""
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    await self.load(session)
+        return self
+
+    async def refresh(
+        self,
+        session: AsyncSession,
+        max_age: float = settings.OBSTACLE_FEED_POLL_INTERVAL,
+    ) -> "ObstacleIndex":
+        """
+        Bring the index up to date with the change feed, polling at most once
+        every ``max_age`` seconds, and return it. A map file swapped in since
+        the last poll is mapped in place of the current one.
+        """
+        if not self._loaded:
+            return await self.ensure_loaded(session)
+        if time.monotonic() - self._polled_at < max_age:
+            return self
+
+        async with self._lock:
+            self._polled_at = time.monotonic()
+            if (
+                self._map_path is not None
+                and file_identity(self._map_path) != self._map_identity
+            ):
+                await self.load(session)
+            else:
+                await self._apply_changes(session)
+        return self
+
+    async def _apply_changes(self, session: AsyncSession) -> None:
+        """Apply the change feed entries newer than ``map_version``"""
+        try:
+            result = await session.execute(
+                select(
+                    ObstacleChange.id,
+                    ObstacleChange.kind,
+                    ObstacleChange.position_x,
+                    ObstacleChange.position_y,
+                )
+                .where(ObstacleChange.id > self._map_version)
+                .order_by(ObstacleChange.id)
+            )
+            changes = result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while polling obstacle changes: {e}")
+            raise
+
+        for change_id, kind, x, y in changes:
+            if kind == "reload":
+                await self.load(session)
+                return
+            if x is not None and y is not None:
+                if kind == "add":
+                    self._positions.add(Position(x, y))
+                else:
+                    self._positions.discard(Position(x, y))
+            self._map_version = change_id
+        if changes:
+            self._version += 1
+
+    def contains_many(self, xs: npt.ArrayLike, ys: npt.ArrayLike) -> BoolArray:
+        """Return a mask of the (xs[i], ys[i]) cells holding an obstacle"""
+        return self._positions.contains_many(xs, ys)
+
+    def window(self, min_x: int, min_y: int, width: int, height: int) -> BoolArray:
+        """Return a (height, width) obstacle mask of a rectangle"""
+        return self._positions.window(min_x, min_y, width, height)
+
+    def any_in(self, min_x: int, min_y: int, max_x: int, max_y: int) -> bool:
+        """Whether any obstacle lies inside the inclusive rectangle"""
+        return self._positions.any_in(min_x, min_y, max_x, max_y)
+
+    def replace(self, positions: Iterable[Position]) -> None:
+        self._positions = ObstacleGrid(positions)
+        self._loaded = True
+        self._version += 1
+
+    def add(self, position: Position, change_id: int | None = None) -> None:
+        self._positions.add(position)
+        self._advance(change_id)
+
+    def discard(self, position: Position, change_id: int | None = None) -> None:
+        self._positions.discard(position)
+        self._advance(change_id)
+
+    def _advance(self, change_id: int | None) -> None:
+        self._version += 1
+        # A local write that directly follows the feed position needs no
+        # replay; otherwise the next poll applies it again, harmlessly
+        if change_id is not None and change_id == self._map_version + 1:
+            self._map_version = change_id
+
+    def save(self, path: Path) -> None:
+        """Write the index to an obstacle map file at ``path``"""
+        write_map_file(
+            path, self._positions.tiles(), len(self._positions), self._map_version
+        )
+
+    def invalidate(self) -> None:
+        """Mark the index stale so the next access reloads it"""
+        self._loaded = False
+        self._version += 1
+
+
+# Arbitrary key of the advisory lock serializing writers of the change feed
+_FEED_LOCK_KEY = 0x0B57AC1E
+
+
+async def current_map_version(session: AsyncSession) -> int:
+    result = await session.execute(select(func.max(ObstacleChange.id)))
+    return result.scalar() or 0
+
+
+async def last_reload_version(session: AsyncSession) -> int:
+    """Id of the latest "reload" change, recorded by bulk loads"""
+    result = await session.execute(
+        select(func.max(ObstacleChange.id)).where(ObstacleChange.kind == "reload")
+    )
+    return result.scalar() or 0
+
+
+async def build_map_file(session: AsyncSession, path: Path) -> int:
+    """
+    Build the obstacle map file from the database and return the number of
+    obstacles written. Workers pick the new file up on their next poll.
+    """
+    index = ObstacleIndex(map_file=None)
+    await index.load(session)
+    index.save(path)
+    logger.info(
+        f"Wrote {len(index)} obstacles to {path} (map version {index.map_version})"
+    )
+    return len(index)
+
+
+async def record_obstacle_change(
+    session: AsyncSession, kind: str, position: Position | None = None
+) -> ObstacleChange:
+    """
+    Append a change to the feed in the caller's transaction. On PostgreSQL,
+    writers take a transaction-level advisory lock so that feed ids commit
+    in order and a poller never skips an id that commits late.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _FEED_LOCK_KEY}
+        )
+    change = ObstacleChange(
+        kind=kind,
+        position_x=position.x if position else None,
+        position_y=position.y if position else None,
+    )
+    session.add(change)
+    await session.flush()
+    return change
+
+
+obstacle_index = ObstacleIndex()
@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import logging
+import struct
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.obstacle import Obstacle
+from src.models.robot import Position
+from src.services.database import AsyncSessionLocal, engine
+from src.services.obstacle_index import (
+    build_map_file,
+    obstacle_index,
+    record_obstacle_change,
+)
+from src.services.occupancy_index import occupancy_index
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+IngestFormat = Literal["csv", "ndjson", "grid"]
+
+# Rows per COPY call or multi-row INSERT; three bind parameters per row stay
+# below the SQLite and asyncpg parameter limits
+CHUNK_SIZE = 5000
+
+# Binary grid: magic, origin x, origin y, width, height (little-endian), then
+# width * height bytes in row-major order starting at the origin; any
+# non-zero byte marks an obstacle
+GRID_HEADER = struct.Struct("<4siiII")
+GRID_MAGIC = b"OGRD"
+
+Coordinates = list[tuple[int, int]]
+
+
+class IngestError(ValueError):
+    """Raised when uploaded obstacle data cannot be parsed"""
+
+
+@dataclass
+class IngestResult:
+    received: int = 0
+    inserted: int = 0
+    # Cells skipped because a robot stands on them
+    occupied: int = 0
+
+
+def format_for(path: Path) -> IngestFormat:
+    if path.suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if path.suffix in (".grid", ".bin"):
+        return "grid"
+    return "csv"
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    number = 0
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, line
+    if buffer:
+        yield number + 1, buffer
+
+
+def _parse_line(
+    number: int, line: bytes, ingest_format: IngestFormat
+) -> tuple[int, int] | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if ingest_format == "ndjson":
+            record = json.loads(line)
+            return int(record["x"]), int(record["y"])
+        x, y = line.split(b",")
+        return int(x), int(y)
+    except (KeyError, TypeError, ValueError) as e:
+        # A CSV header row is allowed
+        if ingest_format == "csv" and number == 1:
+            return None
+        raise IngestError(f"Invalid obstacle on line {number}: {line[:80]!r}") from e
+
+
+def parse_grid(data: bytes) -> np.ndarray:
+    """Return the (x, y) coordinates of every obstacle cell of a binary grid"""
+    if len(data) < GRID_HEADER.size:
+        raise IngestError("Grid is shorter than its header")
+    magic, origin_x, origin_y, width, height = GRID_HEADER.unpack_from(data)
+    if magic != GRID_MAGIC:
+        raise IngestError("Not an obstacle grid")
+    if len(data) - GRID_HEADER.size != width * height:
+        raise IngestError(f"Grid body does not hold {width}x{height} cells")
+
+    cells = np.frombuffer(data, dtype=np.uint8, offset=GRID_HEADER.size)
+    rows, columns = np.nonzero(cells.reshape(height, width))
+    return np.column_stack((columns + origin_x, rows + origin_y))
+
+
+async def read_obstacles(
+    chunks: AsyncIterable[bytes],
+    ingest_format: IngestFormat,
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[Coordinates]:
+    """
+    Parse an uploaded byte stream into batches of at most ``chunk_size``
+    coordinates. CSV and NDJSON are parsed line by line as the data
+    arrives; a grid is parsed once complete, at one byte per cell.
+    """
+    if ingest_format == "grid":
+        data = b"".join([chunk async for chunk in chunks])
+        coordinates = parse_grid(data)
+        for start in range(0, len(coordinates), chunk_size):
+            chunk = coordinates[start : start + chunk_size]
+            yield [(x, y) for x, y in chunk.tolist()]
+        return
+
+    batch: Coordinates = []
+    async for number, line in _lines(chunks):
+        position = _parse_line(number, line, ingest_format)
+        if position is None:
+            continue
+        batch.append(position)
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _unoccupied(
+    batches: AsyncIterable[Coordinates],
+    robot_cells: frozenset[Position],
+    result: IngestResult,
+) -> AsyncIterator[Coordinates]:
+    """Drop the cells robots stand on, which POST /obstacles refuses too"""
+    async for batch in batches:
+        if robot_cells:
+            kept = [cell for cell in batch if cell not in robot_cells]
+            # Dropped cells are received here; the upserts count the rest
+            result.occupied += len(batch) - len(kept)
+            result.received += len(batch) - len(kept)
+            batch = kept
+        if batch:
+            yield batch
+
+
+async def _copy_upsert(
+    session: AsyncSession, batches: AsyncIterable[Coordinates], result: IngestResult
+) -> None:
+    """Stream through COPY into a temporary table, then upsert in one statement"""
+    connection = await session.connection()
+    await connection.execute(
+        text(
+            "CREATE TEMPORARY TABLE obstacle_import "
+            "(position_x integer, position_y integer) ON COMMIT DROP"
+        )
+    )
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    assert driver_connection is not None
+    async for batch in batches:
+        await driver_connection.copy_records_to_table(
+            "obstacle_import", records=batch, columns=["position_x", "position_y"]
+        )
+        result.received += len(batch)
+
+    inserted = await connection.execute(
+        text(
+            "INSERT INTO obstacles (position_x, position_y, created_at) "
+            "SELECT position_x, position_y, now() AT TIME ZONE 'utc' "
+            "FROM obstacle_import "
+            "ON CONFLICT ON CONSTRAINT uq_obstacle_position DO NOTHING"
+        )
+    )
+    result.inserted = inserted.rowcount
+
+
+async def _chunked_upsert(
+    session: AsyncSession, batches: AsyncIterable[Coordinates], result: IngestResult
+) -> None:
+    """One multi-row INSERT ... ON CONFLICT DO NOTHING per batch"""
+    connection = await session.connection()
+    dialect = connection.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    async for batch in batches:
+        stmt = (
+            insert(Obstacle)
+            .values([{"position_x": x, "position_y": y} for x, y in batch])
+            .on_conflict_do_nothing(index_elements=["position_x", "position_y"])
+        )
+        inserted = await connection.execute(stmt)
+        result.received += len(batch)
+        result.inserted += inserted.rowcount
+
+
+async def ingest_obstacles(
+    session: AsyncSession, batches: AsyncIterable[Coordinates]
+) -> IngestResult:
+    """
+    Insert batches of obstacle coordinates, skipping cells that already hold
+    an obstacle or a robot, in a single transaction. PostgreSQL loads through COPY;
+    other databases use chunked multi-row upserts. The obstacle index is
+    invalidated once the new obstacles are committed, and a "reload" change
+    tells the other workers to do the same.
+    """
+    result = IngestResult()
+    try:
+        occupancy = await occupancy_index.refresh(session)
+        batches = _unoccupied(batches, occupancy.occupied_cells(), result)
+        if session.get_bind().dialect.name == "postgresql":
+            await _copy_upsert(session, batches, result)
+        else:
+            await _chunked_upsert(session, batches, result)
+        if result.inserted:
+            # Too many cells for the change feed; workers reload the map
+            await record_obstacle_change(session, "reload")
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+    if result.inserted:
+        obstacle_index.invalidate()
+    logger.info(
+        f"Ingested {result.received} obstacles, {result.inserted} of them new, "
+        f"{result.occupied} skipped under robots"
+    )
+    return result
+
+
+async def _read_file(path: Path, block_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while block := file.read(block_size):
+            yield block
+
+
+async def _main(path: Path, ingest_format: IngestFormat) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            await ingest_obstacles(
+                session, read_obstacles(_read_file(path), ingest_format)
+            )
+            # Workers map the rebuilt file instead of reloading from the database
+            if settings.OBSTACLE_MAP_FILE:
+                await build_map_file(session, Path(settings.OBSTACLE_MAP_FILE))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bulk load obstacles from a CSV, NDJSON or binary grid file"
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson", "grid"], default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.path, args.format or format_for(args.path)))
@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+from src.services.database import AsyncSessionLocal, engine
+from src.services.obstacle_grid import TILE_BYTES, TILE_SHIFT
+
+logger = logging.getLogger(__name__)
+
+# Header: magic, format version, tile shift, map version (the change feed id
+# the file reflects), first tile x and y, directory width and height in
+# tiles, tile count and obstacle count, all little-endian. The header is
+# followed by the directory, one int32 per tile of the bounding box holding
+# the tile's number or -1, and then by the tile bitmaps in that order.
+MAP_HEADER = struct.Struct("<4sHHQiiIIIQ")
+MAP_MAGIC = b"OMAP"
+MAP_FORMAT_VERSION = 1
+
+# The directory covers the bounding box of the map's tiles; beyond this many
+# entries (256 MiB) the map is too spread out for a file
+MAX_DIRECTORY_ENTRIES = 1 << 26
+
+TileKey = tuple[int, int]
+FileIdentity = tuple[int, int, int]
+
+
+class MapFileError(ValueError):
+    """Raised when an obstacle map file is missing, truncated or incompatible"""
+
+
+def _identity(stat: os.stat_result) -> FileIdentity:
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+
+def file_identity(path: Path) -> FileIdentity | None:
+    """Identify the file currently at ``path``; swapping it changes the result"""
+    try:
+        return _identity(path.stat())
+    except FileNotFoundError:
+        return None
+
+
+class ObstacleMapFile:
+    """
+    Read-only, memory-mapped obstacle map. Tiles are served as views into
+    the mapping, so every worker mapping the same file shares its pages and
+    nothing is copied into the process. Finding a tile is one directory
+    lookup.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as file:
+            self.identity = _identity(os.fstat(file.fileno()))
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise MapFileError(f"Obstacle map file {path} is empty") from e
+
+        view = memoryview(self._mmap)
+        if len(view) < MAP_HEADER.size:
+            raise MapFileError(f"Obstacle map file {path} is truncated")
+        (
+            magic,
+            format_version,
+            tile_shift,
+            self.map_version,
+            self._min_tx,
+            self._min_ty,
+            self._width,
+            self._height,
+            tile_count,
+            self.count,
+        ) = MAP_HEADER.unpack_from(view)
+        if magic != MAP_MAGIC or format_version != MAP_FORMAT_VERSION:
+            raise MapFileError(f"{path} is not a version {MAP_FORMAT_VERSION} map")
+        if tile_shift != TILE_SHIFT:
+            raise MapFileError(f"{path} was written with another tile size")
+
+        directory_end = MAP_HEADER.size + 4 * self._width * self._height
+        if len(view) != directory_end + tile_count * TILE_BYTES:
+            raise MapFileError(f"Obstacle map file {path} is truncated")
+        self._directory = view[MAP_HEADER.size : directory_end].cast("i")
+        self._tiles = view[directory_end:]
+
+    def tile(self, key: TileKey) -> memoryview | None:
+        tx = key[0] - self._min_tx
+        ty = key[1] - self._min_ty
+        if not (0 <= tx < self._width and 0 <= ty < self._height):
+            return None
+        number = self._directory[ty * self._width + tx]
+        if number < 0:
+            return None
+        start = number * TILE_BYTES
+        return self._tiles[start : start + TILE_BYTES]
+
+    def tile_keys(self) -> Iterator[TileKey]:
+        directory = np.frombuffer(self._directory, dtype=np.int32)
+        cells = np.flatnonzero(directory >= 0)
+        tys, txs = np.divmod(cells, max(self._width, 1))
+        for tx, ty in zip(txs.tolist(), tys.tolist(), strict=True):
+            yield tx + self._min_tx, ty + self._min_ty
+
+
+def write_map_file(
+    path: Path,
+    tiles: Iterable[tuple[TileKey, bytes | bytearray | memoryview]],
+    count: int,
+    map_version: int,
+) -> None:
+    """
+    Write tiles to an obstacle map file. The file is written under a
+    temporary name and renamed over ``path``, so workers mapping the old
+    file keep reading it unchanged and new readers see the whole new one.
+    """
+    tiles = sorted(tiles, key=lambda item: (item[0][1], item[0][0]))
+    if tiles:
+        txs = [tx for (tx, _), _ in tiles]
+        tys = [ty for (_, ty), _ in tiles]
+        min_tx, min_ty = min(txs), min(tys)
+        width, height = max(txs) - min_tx + 1, max(tys) - min_ty + 1
+    else:
+        min_tx = min_ty = width = height = 0
+    if width * height > MAX_DIRECTORY_ENTRIES:
+        raise MapFileError(f"Obstacle map spans {width}x{height} tiles")
+
+    directory = np.full(width * height, -1, dtype="<i4")
+    for number, ((tx, ty), _) in enumerate(tiles):
+        directory[(ty - min_ty) * width + tx - min_tx] = number
+
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    try:
+        with partial.open("wb") as file:
+            file.write(
+                MAP_HEADER.pack(
+                    MAP_MAGIC,
+                    MAP_FORMAT_VERSION,
+                    TILE_SHIFT,
+                    map_version,
+                    min_tx,
+                    min_ty,
+                    width,
+                    height,
+                    len(tiles),
+                    count,
+                )
+            )
+            file.write(directory.tobytes())
+            for _, tile in tiles:
+                file.write(tile)
+            file.flush()
+            os.fsync(file.fileno())
+        partial.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+async def _main(path: Path) -> None:
+    # Imported here: the obstacle index itself reads map files
+    from src.services.obstacle_index import build_map_file
+
+    try:
+        async with AsyncSessionLocal() as session:
+            await build_map_file(session, path)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the memory-mapped obstacle map file from the database"
+    )
+    parser.add_argument("path", type=Path)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.path))
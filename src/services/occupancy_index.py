@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from collections.abc import Container, Set
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.models.robot import Position
+from src.models.robot_state import RobotState
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Fleet robots are keyed by robot_id; the legacy single robot by None
+RobotKey = int | None
+
+
+class CellOccupiedError(Exception):
+    """Raised when a robot would end on a cell held by another robot"""
+
+
+class BlockedCells(Container[Position]):
+    """Static obstacles plus the cells occupied by every other robot"""
+
+    def __init__(
+        self,
+        obstacles: Container[Position],
+        occupancy: "OccupancyIndex",
+        robot_key: RobotKey,
+    ) -> None:
+        self._obstacles = obstacles
+        self._occupancy = occupancy
+        self._robot_key = robot_key
+
+    def __contains__(self, position: object) -> bool:
+        return position in self._obstacles or self._occupancy.is_blocked_for(
+            position, self._robot_key
+        )
+
+    @property
+    def obstacles(self) -> Container[Position]:
+        return self._obstacles
+
+    def robots_in(self, low: Position, high: Position) -> bool:
+        """Whether another robot occupies a cell inside the inclusive box"""
+        return self._occupancy.any_robot_in(low, high, self._robot_key)
+
+
+class OccupancyIndex:
+    """
+    Live, in-memory map of the cell each robot currently occupies.
+
+    The index is loaded from the robot state rows at startup and then kept
+    current by the write path, which reserves a robot's new cell before
+    committing its state. Robots moved by other workers are picked up by
+    ``refresh``, which reloads the rows at most once per poll interval.
+    A reservation stays pending until ``settle`` is called for it after the
+    state write; reloads keep pending cells over the rows they read.
+    Lookups are O(1) in both directions. All mutations are synchronous, so
+    a check followed by a move in ``try_move`` cannot interleave with
+    another coroutine on the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._cells: dict[Position, RobotKey] = {}
+        self._robots: dict[RobotKey, Position] = {}
+        self._pending: dict[RobotKey, Position] = {}
+        self._version = 0
+        self._polled_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._robots)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def position_of(self, robot_key: RobotKey) -> Position | None:
+        return self._robots.get(robot_key)
+
+    def is_occupied(self, position: tuple[int, int]) -> bool:
+        return Position(*position) in self._cells
+
+    def occupied_cells(self) -> frozenset[Position]:
+        return frozenset(self._cells)
+
+    def is_blocked_for(self, position: object, robot_key: RobotKey) -> bool:
+        """Whether ``position`` is occupied by a robot other than ``robot_key``"""
+        # A single lookup, so a concurrent move cannot fall between two
+        holder: RobotKey = self._cells.get(position, robot_key)  # type: ignore[call-overload]
+        return holder != robot_key
+
+    def any_robot_in(
+        self, low: Position, high: Position, robot_key: RobotKey = None
+    ) -> bool:
+        """Whether a robot other than ``robot_key`` occupies a cell in the box"""
+        return any(
+            low.x <= x <= high.x and low.y <= y <= high.y
+            for key, (x, y) in self._robots.items()
+            if key != robot_key
+        )
+
+    def blocking(
+        self, obstacles: Set[Position], robot_key: RobotKey
+    ) -> Container[Position]:
+        """Return the cells a robot must not enter, avoiding a wrapper when alone"""
+        others = len(self._robots) - (robot_key in self._robots)
+        if not others:
+            return obstacles
+        return BlockedCells(obstacles, self, robot_key)
+
+    def try_move(self, robot_key: RobotKey, position: tuple[int, int]) -> bool:
+        """
+        Atomically reserve ``position`` for a robot and release its previous
+        cell. Returns False, leaving the index unchanged, if another robot
+        already holds the cell.
+        """
+        target = Position(*position)
+        if self.is_blocked_for(target, robot_key):
+            return False
+
+        previous = self._robots.get(robot_key)
+        if previous != target:
+            if previous is not None:
+                del self._cells[previous]
+            self._cells[target] = robot_key
+            self._robots[robot_key] = target
+            self._version += 1
+        self._pending[robot_key] = target
+        return True
+
+    def settle(self, robot_key: RobotKey, position: tuple[int, int]) -> None:
+        """
+        Mark a reservation as written to the database, or rolled back to a
+        position that is. A later reservation of the robot stays pending.
+        """
+        if self._pending.get(robot_key) == Position(*position):
+            del self._pending[robot_key]
+
+    def remove(self, robot_key: RobotKey) -> None:
+        self._pending.pop(robot_key, None)
+        previous = self._robots.pop(robot_key, None)
+        if previous is not None:
+            del self._cells[previous]
+            self._version += 1
+
+    async def load(self, session: AsyncSession) -> None:
+        """Rebuild the index from the robot state rows in the database"""
+        try:
+            result = await session.execute(
+                select(
+                    RobotState.robot_id, RobotState.position_x, RobotState.position_y
+                )
+            )
+            rows = result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while loading occupancy index: {e}")
+            raise
+
+        # Reservations not yet committed are newer than the rows just read
+        cells = {position: key for key, position in self._pending.items()}
+        robots = dict(self._pending)
+        for robot_id, x, y in rows:
+            position = Position(x, y)
+            if robot_id in robots or position in cells:
+                continue
+            cells[position] = robot_id
+            robots[robot_id] = position
+        self._cells = cells
+        self._robots = robots
+        self._version += 1
+        self._polled_at = time.monotonic()
+        logger.debug(f"Loaded {len(rows)} robot positions into the occupancy index")
+
+    async def refresh(
+        self,
+        session: AsyncSession,
+        max_age: float = settings.OCCUPANCY_POLL_INTERVAL,
+    ) -> "OccupancyIndex":
+        """
+        Reload the robot positions if they were last loaded more than
+        ``max_age`` seconds ago, and return the index.
+        """
+        if time.monotonic() - self._polled_at < max_age:
+            return self
+
+        async with self._lock:
+            if time.monotonic() - self._polled_at >= max_age:
+                await self.load(session)
+        return self
+
+    def snapshot(self) -> "OccupancyIndex":
+        """
+        A copy of the robot positions that later moves do not change, for
+        readers running outside the event loop
+        """
+        copy = OccupancyIndex()
+        copy._cells = dict(self._cells)
+        copy._robots = dict(self._robots)
+        copy._version = self._version
+        return copy
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._robots.clear()
+        self._pending.clear()
+        self._version += 1
+        self._polled_at = 0.0
+
+
+occupancy_index = OccupancyIndex()
@@ -0,0 +1,140 @@
+import heapq
+import time
+from collections.abc import Container
+from dataclasses import dataclass
+
+from src.models.robot import DX, DY, HEADING_INDEX, Direction, Position
+from src.settings import settings
+
+# Move codes, in the order neighbours are generated
+_MOVES = "FBLR"
+
+# Largest search box, in (x, y, heading) states, the planner allocates a
+# visited bitmap for: 2**27 bits take 16 MiB
+MAX_SEARCH_STATES = 1 << 27
+
+
+class PlanningError(ValueError):
+    """Raised when no command string can be planned to the target"""
+
+
+@dataclass
+class Plan:
+    commands: str
+    cost: int
+    nodes_expanded: int
+
+
+def search_bounds(
+    start: tuple[int, int], target: tuple[int, int], margin: int
+) -> tuple[Position, Position]:
+    """The box spanned by start and target, grown by ``margin`` cells"""
+    return (
+        Position(min(start[0], target[0]) - margin, min(start[1], target[1]) - margin),
+        Position(max(start[0], target[0]) + margin, max(start[1], target[1]) + margin),
+    )
+
+
+def plan_path(
+    start: tuple[int, int],
+    direction: Direction,
+    target: tuple[int, int],
+    obstacles: Container[Position],
+    margin: int = settings.PLAN_SEARCH_MARGIN,
+    rotation_cost: int = settings.PLAN_ROTATION_COST,
+    max_nodes: int = settings.PLAN_MAX_NODES,
+    time_budget: float = settings.PLAN_TIME_BUDGET,
+) -> Plan:
+    """
+    Find the cheapest command string taking a robot from ``start`` to
+    ``target`` with A* over (x, y, heading) states. F and B cost one, L and R
+    cost ``rotation_cost``; the search stays within ``margin`` cells of the
+    box spanned by start and target.
+
+    States are numbered within that box, so the open list is a binary heap
+    of small ints and the closed set is a bitmap with one bit per state.
+    Raises PlanningError when the target is blocked or unreachable, or when
+    ``max_nodes`` expansions or ``time_budget`` seconds run out first.
+    """
+    target_x, target_y = target
+    if Position(target_x, target_y) in obstacles:
+        raise PlanningError("Target cell is blocked")
+
+    low, high = search_bounds(start, target, margin)
+    width = high.x - low.x + 1
+    states = width * (high.y - low.y + 1) * 4
+    if states > MAX_SEARCH_STATES:
+        raise PlanningError("Target is too far away to plan a path to")
+
+    def encode(x: int, y: int, heading: int) -> int:
+        return ((y - low.y) * width + x - low.x) << 2 | heading
+
+    def heuristic(x: int, y: int, heading: int) -> int:
+        # Every move changes x or y by one, and moving along an axis other
+        # than the current one needs at least one turn
+        dx, dy = target_x - x, target_y - y
+        turn = (dx and DX[heading] == 0) or (dy and DY[heading] == 0)
+        return abs(dx) + abs(dy) + (rotation_cost if turn else 0)
+
+    start_heading = HEADING_INDEX[direction]
+    start_state = encode(*start, start_heading)
+    closed = bytearray((states + 7) // 8)
+    best = {start_state: 0}
+    # state -> parent state << 2 | move code
+    parents: dict[int, int] = {}
+    # (f, h, state, x, y, heading); ties go to the entry closest to the target
+    heap = [(heuristic(*start, start_heading), 0, start_state, *start, start_heading)]
+    deadline = time.monotonic() + time_budget
+    expanded = 0
+
+    while heap:
+        _, _, state, x, y, heading = heapq.heappop(heap)
+        if closed[state >> 3] >> (state & 7) & 1:
+            continue
+        if x == target_x and y == target_y:
+            return Plan(_commands(parents, state), best[state], expanded)
+
+        closed[state >> 3] |= 1 << (state & 7)
+        expanded += 1
+        if expanded > max_nodes:
+            raise PlanningError(f"No path found within {max_nodes} nodes")
+        if not expanded & 0x3FF and time.monotonic() > deadline:
+            raise PlanningError(f"No path found within {time_budget} seconds")
+
+        cost = best[state]
+        for code, move in enumerate(_MOVES):
+            next_x, next_y, next_heading, step = x, y, heading, 1
+            if move == "F" or move == "B":
+                sign = 1 if move == "F" else -1
+                next_x, next_y = x + sign * DX[heading], y + sign * DY[heading]
+                if not (low.x <= next_x <= high.x and low.y <= next_y <= high.y):
+                    continue
+                if Position(next_x, next_y) in obstacles:
+                    continue
+            else:
+                next_heading = (heading + (3 if move == "L" else 1)) & 3
+                step = rotation_cost
+
+            next_state = encode(next_x, next_y, next_heading)
+            next_cost = cost + step
+            if closed[next_state >> 3] >> (next_state & 7) & 1:
+                continue
+            if next_cost >= best.get(next_state, next_cost + 1):
+                continue
+            best[next_state] = next_cost
+            parents[next_state] = state << 2 | code
+            h = heuristic(next_x, next_y, next_heading)
+            heapq.heappush(
+                heap, (next_cost + h, h, next_state, next_x, next_y, next_heading)
+            )
+
+    raise PlanningError("Target is unreachable")
+
+
+def _commands(parents: dict[int, int], state: int) -> str:
+    moves = []
+    while state in parents:
+        parent = parents[state]
+        moves.append(_MOVES[parent & 3])
+        state = parent >> 2
+    return "".join(reversed(moves))
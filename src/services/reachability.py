@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from collections.abc import Container, Hashable
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from src.models.robot import Position
+from src.services.obstacle_index import ObstacleIndex
+from src.settings import settings
+
+BoolArray = npt.NDArray[np.bool_]
+
+
+@dataclass(frozen=True)
+class Reachable:
+    """
+    Cells reachable from ``start`` as a bitmap of the (2r + 1)-wide square
+    centred on it, packed row by row, least significant bit first
+    """
+
+    start: Position
+    radius: int
+    count: int
+    bits: bytes
+
+    @property
+    def origin(self) -> Position:
+        return Position(self.start.x - self.radius, self.start.y - self.radius)
+
+    @property
+    def size(self) -> int:
+        return 2 * self.radius + 1
+
+    def mask(self) -> BoolArray:
+        cells = np.unpackbits(
+            np.frombuffer(self.bits, dtype=np.uint8),
+            count=self.size * self.size,
+            bitorder="little",
+        )
+        return cells.reshape(self.size, self.size).astype(np.bool_)
+
+    def runs(self) -> list[tuple[int, int, int]]:
+        """Encode the cells as (y, first x, length) runs along each row"""
+        mask = self.mask()
+        padded = np.zeros((self.size, self.size + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask
+        edges = np.diff(padded, axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        origin = self.origin
+        return list(
+            zip(
+                (rows + origin.y).tolist(),
+                (starts + origin.x).tolist(),
+                (ends - starts).tolist(),
+                strict=True,
+            )
+        )
+
+
+def blocked_window(
+    obstacles: Container[Position], origin: Position, size: int
+) -> BoolArray:
+    """Return a (size, size) obstacle mask of the square starting at ``origin``"""
+    if isinstance(obstacles, ObstacleIndex):
+        return obstacles.window(origin.x, origin.y, size, size)
+
+    mask = np.zeros((size, size), dtype=np.bool_)
+    if isinstance(obstacles, set | frozenset):
+        for x, y in obstacles:
+            if 0 <= x - origin.x < size and 0 <= y - origin.y < size:
+                mask[y - origin.y, x - origin.x] = True
+        return mask
+    for dy in range(size):
+        for dx in range(size):
+            mask[dy, dx] = Position(origin.x + dx, origin.y + dy) in obstacles
+    return mask
+
+
+def reachable_cells(
+    start: tuple[int, int], radius: int, obstacles: Container[Position]
+) -> Reachable:
+    """
+    Find every cell a robot at ``start`` can reach in at most ``radius``
+    moves without entering an obstacle. Turning is free here, so this is a
+    breadth-first search over the 4-connected grid.
+
+    The search runs over flat indices into the square of side 2r + 1 around
+    the start: each level expands the whole frontier with a few vectorized
+    array operations, so Python work grows with the radius, not the area.
+    """
+    start = Position(*start)
+    size = 2 * radius + 1
+    origin = Position(start.x - radius, start.y - radius)
+    free = ~blocked_window(obstacles, origin, size).ravel()
+
+    visited = np.zeros(size * size, dtype=np.bool_)
+    frontier = np.array([radius * size + radius], dtype=np.int64)
+    visited[frontier] = True
+    for _ in range(radius):
+        columns = frontier % size
+        candidates = np.concatenate((
+            frontier[columns > 0] - 1,
+            frontier[columns < size - 1] + 1,
+            frontier[frontier >= size] - size,
+            frontier[frontier < size * (size - 1)] + size,
+        ))
+        candidates = candidates[free[candidates] & ~visited[candidates]]
+        if not candidates.size:
+            break
+        frontier = np.unique(candidates)
+        visited[frontier] = True
+
+    bits = np.packbits(visited, bitorder="little").tobytes()
+    return Reachable(start, radius, int(visited.sum()), bits)
+
+
+class ReachabilityCache:
+    """
+    Least recently used cache of reachability results. Keys include the
+    version of the obstacle map, so a change to the map never serves a
+    stale result; old entries simply age out.
+    """
+
+    def __init__(self, max_size: int = settings.REACHABLE_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, Reachable] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Reachable | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, entry: Reachable) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+reachability_cache = ReachabilityCache()
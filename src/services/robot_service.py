@@ -1,12 +1,64 @@
-from typing import Any
+from array import array
+from collections.abc import Container, Iterator
+from typing import Any, Protocol
 
-from src.models.robot import Position, Robot
+from src.models.robot import HEADING_INDEX, HEADINGS, Direction, Position, Robot
+from src.services.command_program import (
+    apply_if_clear,
+    compile_commands,
+    execute,
+    expand,
+    is_compressed,
+    parse_commands,
+)
+
+
+def path_bounds(
+    start_position: tuple[int, int], start_direction: Direction, commands: str
+) -> tuple[Position, Position]:
+    """
+    Return the (min, max) corners of the box swept by a command string.
+    Obstacles can only cut the path short, so every cell the robot can
+    reach while executing the commands lies inside this box.
+    """
+    compiled = compile_commands(commands)
+    return compiled.bounds(Position(*start_position), HEADING_INDEX[start_direction])
+
+
+def reach_bounds(
+    start_position: tuple[int, int], distance: int
+) -> tuple[Position, Position]:
+    """Return the (min, max) corners of the box within ``distance`` moves"""
+    x, y = start_position
+    return Position(x - distance, y - distance), Position(x + distance, y + distance)
+
+
+def move_count(commands: str) -> int:
+    """Number of F and B moves a command string expands to"""
+    return compile_commands(commands).moves
+
+
+class CommandExecutor(Protocol):
+    def execute_commands(
+        self, robot: Robot, commands: str, obstacles: Container[Position] | None = None
+    ) -> dict[str, Any]: ...
+
+
+def create_executor(engine: str = "scalar") -> CommandExecutor:
+    """Return the command executor for the configured execution engine"""
+    if engine == "numpy":
+        from src.services.vectorized_executor import VectorizedCommandExecutor
+
+        return VectorizedCommandExecutor()
+    if engine == "scalar":
+        return RobotCommandExecutor()
+    raise ValueError(f"Unknown execution engine: {engine}")
 
 
 class RobotCommandExecutor:
     @staticmethod
     def execute_commands(
-        robot: Robot, commands: str, obstacles: set[Position] | None = None
+        robot: Robot, commands: str, obstacles: Container[Position] | None = None
     ) -> dict[str, Any]:
         """
         Execute a string of commands on a robot.
@@ -16,6 +68,12 @@ class RobotCommandExecutor:
         if obstacles is None:
             obstacles = set()
 
+        if apply_if_clear(robot, commands, obstacles):
+            commands = ""
+        elif is_compressed(commands):
+            execute(robot, commands, obstacles)
+            commands = ""
+
         for command in commands:
             prev_position = robot.position
 
@@ -35,3 +93,108 @@ class RobotCommandExecutor:
             "direction": robot.direction.value,
             "obstacle_detected": robot.obstacle_detected,
         }
+
+    @staticmethod
+    def iter_steps(
+        robot: Robot, commands: str, obstacles: Container[Position] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Execute a string of commands lazily, yielding the robot state after
+        each command. Stops after the step on which an obstacle is detected.
+        """
+        if obstacles is None:
+            obstacles = set()
+
+        for step, command in enumerate(_steps(commands)):
+            prev_position = robot.position
+
+            moved = robot.process_command(command)
+
+            if moved and robot.position in obstacles:
+                robot.position = prev_position
+                robot.obstacle_detected = True
+
+            yield {
+                "step": step,
+                "command": command,
+                "position": {"x": robot.position.x, "y": robot.position.y},
+                "direction": robot.direction.value,
+                "obstacle_detected": robot.obstacle_detected,
+            }
+
+            if robot.obstacle_detected:
+                return
+
+
+class Trajectory:
+    """
+    The robot state after every command of one execution, kept as packed
+    coordinate and heading arrays (17 bytes per step) so the trajectory
+    that was persisted can be streamed afterwards without executing the
+    commands again.
+    """
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self._commands = ""
+        self._xs = array("q")
+        self._ys = array("q")
+        self._headings = bytearray()
+        self._obstacle_detected = False
+
+    def __len__(self) -> int:
+        return len(self._headings)
+
+    def record(
+        self, robot: Robot, commands: str, obstacles: Container[Position]
+    ) -> dict[str, Any]:
+        """
+        Execute a string of commands step by step, replacing the recorded
+        steps, and return the final state like ``execute_commands``
+        """
+        self.clear()
+        self._commands = commands
+        for command in _steps(commands):
+            prev_position = robot.position
+
+            moved = robot.process_command(command)
+
+            if moved and robot.position in obstacles:
+                robot.position = prev_position
+                robot.obstacle_detected = True
+
+            self._xs.append(robot.position.x)
+            self._ys.append(robot.position.y)
+            self._headings.append(robot.heading)
+
+            if robot.obstacle_detected:
+                self._obstacle_detected = True
+                break
+
+        return {
+            "position": {"x": robot.position.x, "y": robot.position.y},
+            "direction": robot.direction.value,
+            "obstacle_detected": robot.obstacle_detected,
+        }
+
+    def steps(self) -> Iterator[dict[str, Any]]:
+        """Yield the recorded states in the format of ``iter_steps``"""
+        last = len(self) - 1
+        for step, command in zip(
+            range(len(self)), _steps(self._commands), strict=False
+        ):
+            yield {
+                "step": step,
+                "command": command,
+                "position": {"x": self._xs[step], "y": self._ys[step]},
+                "direction": HEADINGS[self._headings[step]].value,
+                "obstacle_detected": self._obstacle_detected and step == last,
+            }
+
+
+def _steps(commands: str) -> Iterator[str]:
+    return iter(
+        expand(parse_commands(commands)) if is_compressed(commands) else commands
+    )
@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.models.robot import Direction, Robot
+from src.models.robot_state import RobotState
+from src.settings import settings
+
+# Positions are stored in 32-bit integer columns
+MAX_COORDINATE = 2**31 - 1
+
+
+class PositionRangeError(ValueError):
+    """Raised when a command result leaves the range of the state columns"""
+
+
+async def load_robot_state(
+    db: AsyncSession, robot_id: int | None = None
+) -> RobotState | None:
+    """
+    Load the state row of a fleet robot, or of the legacy single robot
+    when ``robot_id`` is None
+    """
+    stmt = select(RobotState)
+    if robot_id is None:
+        stmt = stmt.where(RobotState.robot_id.is_(None))
+    else:
+        stmt = stmt.where(RobotState.robot_id == robot_id)
+    stmt = stmt.order_by(RobotState.updated_at.desc()).limit(1)
+    # Always refresh from the database so a retry sees the latest version
+    result = await db.execute(stmt.execution_options(populate_existing=True))
+    return result.scalars().first()
+
+
+def robot_from_state(robot_state: RobotState | None) -> Robot:
+    if not robot_state:
+        start_position = settings.start_position
+        start_direction = Direction[settings.start_direction]
+        return Robot(position=start_position, direction=start_direction)
+    return Robot(
+        position=(robot_state.position_x, robot_state.position_y),
+        direction=Direction[robot_state.direction],
+    )
+
+
+def history_row(
+    command: str,
+    command_result: dict[str, Any],
+    robot_id: int | None = None,
+    executed_at: datetime | None = None,
+) -> dict[str, Any]:
+    """
+    Build a command_history row. The execution time is stamped here rather
+    than left to the column default, which would record when a buffered
+    row was eventually inserted.
+    """
+    return {
+        "robot_id": robot_id,
+        "command": command,
+        "position_x": command_result["position"]["x"],
+        "position_y": command_result["position"]["y"],
+        "direction": command_result["direction"],
+        "obstacle_detected": command_result["obstacle_detected"],
+        "executed_at": executed_at or datetime.utcnow(),
+    }
+
+
+def check_position_range(command_results: list[dict[str, Any]]) -> None:
+    """Reject results whose positions could not be written to the database"""
+    for command_result in command_results:
+        position = command_result["position"]
+        if max(abs(position["x"]), abs(position["y"])) > MAX_COORDINATE:
+            raise PositionRangeError(
+                f"Position {position} is outside the supported coordinate range"
+            )
+
+
+def apply_result(
+    db: AsyncSession,
+    robot_state: RobotState | None,
+    command_result: dict[str, Any],
+    robot_id: int | None = None,
+) -> RobotState:
+    """Write a command result into the robot's state row, creating it if needed"""
+    x_position = command_result["position"]["x"]
+    y_position = command_result["position"]["y"]
+    direction = command_result["direction"]
+
+    if not robot_state:
+        robot_state = RobotState(
+            robot_id=robot_id,
+            position_x=x_position,
+            position_y=y_position,
+            direction=direction,
+        )
+        db.add(robot_state)
+    else:
+        robot_state.position_x = x_position
+        robot_state.position_y = y_position
+        robot_state.direction = direction
+    return robot_state
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from collections.abc import Container, Iterable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, Row, and_, or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.future import select
+
+from src.models.command_history import CommandHistory
+from src.models.robot import Direction, Position, Robot
+from src.models.robot_record import RobotRecord
+from src.models.robot_snapshot import RobotSnapshot
+from src.services.obstacle_index import obstacle_index
+from src.services.robot_service import RobotCommandExecutor
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _for_robot(column: Any, robot_id: int | None) -> ColumnElement[bool]:
+    if robot_id is None:
+        return column.is_(None)  # type: ignore[no-any-return]
+    return column == robot_id  # type: ignore[no-any-return]
+
+
+def robot_from_snapshot(snapshot: RobotSnapshot | None) -> Robot:
+    if snapshot is None:
+        return Robot(settings.start_position, Direction[settings.start_direction])
+    return Robot(
+        (snapshot.position_x, snapshot.position_y), Direction[snapshot.direction]
+    )
+
+
+def replay(
+    robot: Robot, rows: Iterable[CommandHistory], obstacles: Container[Position]
+) -> Robot:
+    """
+    Restore the pose after history rows, in order, on ``robot``. A row's
+    recorded pose takes precedence over re-executing it, since obstacles
+    and other robots may have moved since the command ran, so only rows
+    after the last fully recorded one are re-executed.
+    """
+    rows = list(rows)
+    first = 0
+    for index in range(len(rows) - 1, -1, -1):
+        x, y, direction = (
+            rows[index].position_x,
+            rows[index].position_y,
+            rows[index].direction,
+        )
+        if x is not None and y is not None and direction is not None:
+            robot.position = (x, y)
+            robot.direction = Direction(direction)
+            first = index + 1
+            break
+
+    for row in rows[first:]:
+        robot.obstacle_detected = False
+        RobotCommandExecutor.execute_commands(robot, row.command, obstacles)
+        if row.position_x is not None and row.position_y is not None:
+            robot.position = (row.position_x, row.position_y)
+        if row.direction is not None:
+            robot.direction = Direction(row.direction)
+    return robot
+
+
+async def latest_snapshot(
+    db: AsyncSession, robot_id: int | None, at: datetime | None = None
+) -> RobotSnapshot | None:
+    """The robot's most recent snapshot, or the most recent one taken by ``at``"""
+    stmt = select(RobotSnapshot).where(_for_robot(RobotSnapshot.robot_id, robot_id))
+    if at is not None:
+        stmt = stmt.where(RobotSnapshot.taken_at <= at)
+    stmt = stmt.order_by(RobotSnapshot.taken_at.desc(), RobotSnapshot.id.desc())
+    result = await db.execute(stmt.limit(1))
+    return result.scalars().first()
+
+
+async def last_recorded_pose(
+    db: AsyncSession, robot_id: int | None, at: datetime
+) -> Row[int, datetime, int | None, int | None, str | None] | None:
+    """
+    The id, execution time and recorded pose of the robot's last history row
+    executed by ``at`` that has one, read from the (robot_id, executed_at, id)
+    index
+    """
+    result = await db.execute(
+        select(
+            CommandHistory.id,
+            CommandHistory.executed_at,
+            CommandHistory.position_x,
+            CommandHistory.position_y,
+            CommandHistory.direction,
+        )
+        .where(
+            _for_robot(CommandHistory.robot_id, robot_id),
+            CommandHistory.executed_at <= at,
+            CommandHistory.position_x.is_not(None),
+            CommandHistory.position_y.is_not(None),
+            CommandHistory.direction.is_not(None),
+        )
+        .order_by(CommandHistory.executed_at.desc(), CommandHistory.id.desc())
+        .limit(1)
+    )
+    return result.first()
+
+
+async def pose_at(db: AsyncSession, robot_id: int | None, at: datetime) -> Robot:
+    """
+    Restore a robot's pose at ``at``. Every write path records the pose
+    after a command, so this is normally the pose of the last history row
+    executed by then. Rows without a recorded pose after it, or after a
+    newer snapshot, are replayed. History is ordered by (executed_at, id).
+    """
+    recorded = await last_recorded_pose(db, robot_id, at)
+    snapshot = await latest_snapshot(db, robot_id, at)
+    after: tuple[datetime, int] | None = None
+    if snapshot is not None:
+        after = (snapshot.taken_at, snapshot.history_id or 0)
+    if recorded is not None and (after is None or (recorded[1], recorded[0]) >= after):
+        history_id, executed_at, x, y, direction = recorded
+        assert x is not None and y is not None and direction is not None
+        robot = Robot((x, y), Direction(direction))
+        after = (executed_at, history_id)
+    else:
+        robot = robot_from_snapshot(snapshot)
+
+    stmt = select(CommandHistory).where(
+        _for_robot(CommandHistory.robot_id, robot_id),
+        CommandHistory.executed_at <= at,
+    )
+    if after is not None:
+        executed_at, history_id = after
+        stmt = stmt.where(
+            or_(
+                CommandHistory.executed_at > executed_at,
+                and_(
+                    CommandHistory.executed_at == executed_at,
+                    CommandHistory.id > history_id,
+                ),
+            )
+        )
+    result = await db.execute(
+        stmt.order_by(CommandHistory.executed_at, CommandHistory.id)
+    )
+    rows = list(result.scalars())
+    if not rows:
+        return robot
+
+    obstacles = await obstacle_index.ensure_loaded(db)
+    return replay(robot, rows, obstacles)
+
+
+async def take_snapshots(
+    db: AsyncSession, robot_id: int | None, every: int = settings.SNAPSHOT_EVERY
+) -> int:
+    """
+    Snapshot a robot after every ``every`` commands since its last snapshot
+    and return the number of snapshots taken. History is read ``every`` rows
+    at a time, so a robot with a long unsnapshotted history is backfilled
+    without loading it all at once.
+    """
+    snapshot = await latest_snapshot(db, robot_id)
+    robot = robot_from_snapshot(snapshot)
+    after = snapshot.history_id or 0 if snapshot is not None else 0
+    obstacles = await obstacle_index.ensure_loaded(db)
+
+    taken = 0
+    while True:
+        result = await db.execute(
+            select(CommandHistory)
+            .where(
+                _for_robot(CommandHistory.robot_id, robot_id),
+                CommandHistory.id > after,
+            )
+            .order_by(CommandHistory.id)
+            .limit(every)
+        )
+        rows = list(result.scalars())
+        if len(rows) < every:
+            break
+
+        replay(robot, rows, obstacles)
+        after = rows[-1].id
+        db.add(
+            RobotSnapshot(
+                robot_id=robot_id,
+                history_id=after,
+                position_x=robot.position.x,
+                position_y=robot.position.y,
+                direction=robot.direction.value,
+                taken_at=rows[-1].executed_at,
+            )
+        )
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Another worker recorded this snapshot first and is ahead
+            await db.rollback()
+            break
+        taken += 1
+    return taken
+
+
+async def snapshot_fleet(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    """Bring the snapshots of the legacy robot and every fleet robot up to date"""
+    async with session_factory() as session:
+        result = await session.execute(select(RobotRecord.id))
+        robot_ids: list[int | None] = [None, *result.scalars()]
+        taken = 0
+        for robot_id in robot_ids:
+            taken += await take_snapshots(session, robot_id)
+    return taken
+
+
+async def run_snapshots(
+    session_factory: async_sessionmaker[AsyncSession],
+    interval: float = settings.SNAPSHOT_INTERVAL,
+) -> None:
+    """Take snapshots every ``interval`` seconds until cancelled"""
+    while True:
+        try:
+            taken = await snapshot_fleet(session_factory)
+            if taken:
+                logger.info(f"Took {taken} robot state snapshots")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while taking state snapshots: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error while taking state snapshots: {e}")
+        await asyncio.sleep(interval)
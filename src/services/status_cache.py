@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from src.services.occupancy_index import RobotKey
+from src.settings import settings
+
+
+@dataclass(frozen=True)
+class RobotStatus:
+    x: int
+    y: int
+    direction: str
+
+    @property
+    def etag(self) -> str:
+        # Derived from the content, so every worker agrees on it
+        return f'"{self.x}.{self.y}.{self.direction}"'
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"position": {"x": self.x, "y": self.y}, "direction": self.direction}
+
+    @classmethod
+    def from_result(cls, command_result: dict[str, Any]) -> "RobotStatus":
+        position = command_result["position"]
+        return cls(position["x"], position["y"], command_result["direction"])
+
+
+StatusLoader = Callable[[], Awaitable[RobotStatus | None]]
+
+
+class StatusCache:
+    """
+    In-process cache of robot statuses, written through by the command path
+    so that status reads rarely touch the database.
+
+    Entries are trusted for ``ttl`` seconds (0 disables caching), which
+    bounds how long a status written by another worker can go unseen.
+    Concurrent misses for the same robot share a single load. A load that
+    started before a write never overwrites the status that write stored.
+    """
+
+    def __init__(self, ttl: float = settings.STATUS_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._entries: dict[RobotKey, tuple[float, RobotStatus]] = {}
+        self._loads: dict[RobotKey, asyncio.Task[RobotStatus | None]] = {}
+        self._writes: dict[RobotKey, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, robot_key: RobotKey) -> RobotStatus | None:
+        entry = self._entries.get(robot_key)
+        if entry is None:
+            return None
+        stored_at, status = entry
+        if time.monotonic() - stored_at > self.ttl:
+            return None
+        return status
+
+    async def get(self, robot_key: RobotKey, load: StatusLoader) -> RobotStatus | None:
+        """
+        Return the cached status of a robot, or load it with ``load``,
+        joining a load already in flight for the same robot. None (robot
+        not found) is returned but not cached.
+        """
+        status = self.peek(robot_key)
+        if status is not None:
+            return status
+
+        task = self._loads.get(robot_key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(robot_key, load))
+            self._loads[robot_key] = task
+            task.add_done_callback(lambda _: self._loads.pop(robot_key, None))
+        # A cancelled waiter must not cancel the load the others wait for
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, robot_key: RobotKey, load: StatusLoader
+    ) -> RobotStatus | None:
+        writes = self._writes.get(robot_key, 0)
+        status = await load()
+        if self._writes.get(robot_key, 0) != writes:
+            # A write landed while loading; what it stored is newer
+            entry = self._entries.get(robot_key)
+            return entry[1] if entry else status
+        if status is not None:
+            self._entries[robot_key] = (time.monotonic(), status)
+        return status
+
+    def put(self, robot_key: RobotKey, status: RobotStatus) -> None:
+        self._writes[robot_key] = self._writes.get(robot_key, 0) + 1
+        self._entries[robot_key] = (time.monotonic(), status)
+
+    def discard(self, robot_key: RobotKey) -> None:
+        self._writes[robot_key] = self._writes.get(robot_key, 0) + 1
+        self._entries.pop(robot_key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._writes.clear()
+
+
+status_cache = StatusCache()
@@ -0,0 +1,105 @@
+from collections.abc import Container
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from src.models.robot import DX, DY, HEADINGS, Position, Robot
+from src.services.command_program import apply_if_clear, is_compressed
+from src.services.obstacle_index import ObstacleIndex
+from src.services.robot_service import RobotCommandExecutor
+
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+_DX = np.array(DX, dtype=np.int64)
+_DY = np.array(DY, dtype=np.int64)
+
+# Per-byte lookup tables: rotation applied and distance moved by each command
+_TURN = np.zeros(256, dtype=np.int64)
+_TURN[ord("R")] = 1
+_TURN[ord("L")] = 3
+_STEP = np.zeros(256, dtype=np.int64)
+_STEP[ord("F")] = 1
+_STEP[ord("B")] = -1
+
+
+def _encode(xs: IntArray, ys: IntArray) -> IntArray:
+    """Pack (x, y) pairs into single int64 keys for vectorized membership"""
+    return np.asarray((xs << 32) | (ys & 0xFFFFFFFF), dtype=np.int64)
+
+
+def _collisions(
+    obstacles: Container[Position], xs: IntArray, ys: IntArray, moved: BoolArray
+) -> BoolArray:
+    """Return a mask of the moving steps that land on an obstacle"""
+    if isinstance(obstacles, ObstacleIndex):
+        return moved & obstacles.contains_many(xs, ys)
+    if isinstance(obstacles, set | frozenset):
+        if not obstacles:
+            return np.zeros(xs.shape, dtype=np.bool_)
+        coords = np.array(list(obstacles), dtype=np.int64).reshape(-1, 2)
+        keys = _encode(coords[:, 0], coords[:, 1])
+        # Obstacles fit in 32 bits; keys of cells beyond that would alias
+        inside: BoolArray = (xs == xs.astype(np.int32)) & (ys == ys.astype(np.int32))
+        return moved & inside & np.isin(_encode(xs, ys), keys)
+
+    return moved & np.fromiter(
+        (Position(int(x), int(y)) in obstacles for x, y in zip(xs, ys, strict=True)),
+        dtype=np.bool_,
+        count=xs.size,
+    )
+
+
+class VectorizedCommandExecutor:
+    """
+    Drop-in replacement for RobotCommandExecutor that simulates the whole
+    command string with NumPy array operations instead of a per-step loop.
+    """
+
+    @staticmethod
+    def execute_commands(
+        robot: Robot, commands: str, obstacles: Container[Position] | None = None
+    ) -> dict[str, Any]:
+        """
+        Execute a string of commands on a robot.
+        Returns a status dictionary with final position, direction,
+        and obstacle information.
+        """
+        if apply_if_clear(robot, commands, obstacles or set()):
+            commands = ""
+        elif is_compressed(commands):
+            # Expanding repeats would defeat the point; the segment executor
+            # skips whole repeated blocks that cannot collide
+            return RobotCommandExecutor.execute_commands(robot, commands, obstacles)
+
+        codes = np.frombuffer(commands.encode(), dtype=np.uint8)
+
+        if codes.size:
+            start_x, start_y = robot.position
+            headings = (robot.heading + np.cumsum(_TURN[codes])) % 4
+            steps = _STEP[codes]
+            xs = start_x + np.cumsum(steps * _DX[headings])
+            ys = start_y + np.cumsum(steps * _DY[headings])
+
+            hits = np.flatnonzero(_collisions(obstacles or set(), xs, ys, steps != 0))
+            if hits.size:
+                stop = int(hits[0])
+                if stop > 0:
+                    robot.position = Position(int(xs[stop - 1]), int(ys[stop - 1]))
+                robot.direction = HEADINGS[headings[stop]]
+                robot.obstacle_detected = True
+                return {
+                    "position": {"x": robot.position.x, "y": robot.position.y},
+                    "direction": robot.direction.value,
+                    "obstacle_detected": True,
+                }
+
+            robot.position = Position(int(xs[-1]), int(ys[-1]))
+            robot.direction = HEADINGS[headings[-1]]
+
+        return {
+            "position": {"x": robot.position.x, "y": robot.position.y},
+            "direction": robot.direction.value,
+            "obstacle_detected": robot.obstacle_detected,
+        }
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -12,6 +13,74 @@ class Settings(BaseSettings):
     START_POSITION: str = os.getenv("START_POSITION", "(0, 0)")
     START_DIRECTION: str = os.getenv("START_DIRECTION", "NORTH")
 
+    # Serve obstacles from the in-memory index; when disabled, only obstacles
+    # inside the reachable bounding box of each command string are queried.
+    OBSTACLE_CACHE_ENABLED: bool = True
+    # Seconds between two polls of the obstacle change feed by a worker
+    OBSTACLE_FEED_POLL_INTERVAL: float = 1.0
+    # Seconds between two reloads of the robot positions by a worker, so that
+    # robots moved by other workers block this one's paths
+    OCCUPANCY_POLL_INTERVAL: float = 1.0
+    # Binary obstacle map file that every worker memory-maps instead of loading
+    # the obstacles from the database; build it with
+    # `python -m src.services.obstacle_map_file PATH`
+    OBSTACLE_MAP_FILE: str | None = None
+
+    # "scalar" steps through commands one at a time; "numpy" simulates the
+    # whole command string with vectorized array operations.
+    EXECUTION_ENGINE: Literal["scalar", "numpy"] = "scalar"
+
+    # Results of recently executed command strings kept in memory, keyed by
+    # command string and start pose and dropped whenever the obstacle map
+    # changes; entries expire after EXECUTION_CACHE_TTL seconds (0 never)
+    EXECUTION_CACHE_SIZE: int = 1024
+    EXECUTION_CACHE_TTL: float = 300.0
+
+    # Path planning: search within PLAN_SEARCH_MARGIN cells of the box spanned
+    # by start and target, with turns costing PLAN_ROTATION_COST moves, and
+    # give up after PLAN_MAX_NODES expansions or PLAN_TIME_BUDGET seconds
+    PLAN_SEARCH_MARGIN: int = 32
+    PLAN_ROTATION_COST: int = 1
+    PLAN_MAX_NODES: int = 200_000
+    PLAN_TIME_BUDGET: float = 1.0
+
+    # Reachability results kept in memory, keyed by start cell, radius and
+    # obstacle map version
+    REACHABLE_CACHE_SIZE: int = 128
+
+    # Seconds a cached robot status is served without reading the database.
+    # Commands update the cache of the worker that ran them at once; this
+    # bounds how long a command run by another worker can go unseen
+    STATUS_CACHE_TTL: float = 1.0
+
+    # How many times a command is re-executed when the robot state row was
+    # updated concurrently (optimistic locking on RobotState.version)
+    STATE_UPDATE_RETRIES: int = 3
+
+    # Serialize commands per robot through an in-process queue worker that
+    # owns the robot's state, instead of reading and locking it per request
+    COMMAND_QUEUE_ENABLED: bool = False
+
+    # Buffer CommandHistory rows in memory and insert them in bulk from a
+    # background task instead of inside each command's transaction
+    HISTORY_WRITE_BEHIND: bool = False
+    HISTORY_BUFFER_SIZE: int = 10_000
+    HISTORY_FLUSH_SIZE: int = 500
+    HISTORY_FLUSH_INTERVAL: float = 1.0
+
+    # Monthly command_history partitions (PostgreSQL): how many future months
+    # to create ahead, how many past months to keep (None keeps everything),
+    # and whether expired partitions are only detached or exported and dropped
+    HISTORY_PARTITION_PREMAKE: int = 3
+    HISTORY_RETENTION_MONTHS: int | None = None
+    HISTORY_RETENTION_ACTION: Literal["detach", "archive"] = "archive"
+    HISTORY_ARCHIVE_DIR: str = "archive/command_history"
+
+    # Snapshot each robot's pose every SNAPSHOT_EVERY commands, checking for
+    # new history every SNAPSHOT_INTERVAL seconds (0 disables snapshots)
+    SNAPSHOT_EVERY: int = 1000
+    SNAPSHOT_INTERVAL: float = 60.0
+
     @property
     def start_position(self) -> tuple[int, int]:
         """Parse START_POSITION string into a tuple safely."""
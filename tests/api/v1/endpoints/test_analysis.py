@@ -0,0 +1,67 @@
+import base64
+
+import numpy as np
+import pytest
+
+from src.services import reachability
+
+
+@pytest.mark.asyncio
+async def test_reachable_run_length_encoded(client):
+    await client.post("/api/v1/obstacles", json={"x": 0, "y": 1})
+
+    response = await client.get("/api/v1/analysis/reachable", params={"radius": 1})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["start"] == {"x": 0, "y": 0}
+    assert body["count"] == 4
+    assert body["runs"] == [[-1, 0, 1], [0, -1, 3]]
+
+
+@pytest.mark.asyncio
+async def test_reachable_bitmap(client):
+    response = await client.get(
+        "/api/v1/analysis/reachable", params={"radius": 2, "encoding": "bitmap"}
+    )
+    body = response.json()
+    assert body["origin"] == {"x": -2, "y": -2}
+    bits = np.unpackbits(
+        np.frombuffer(base64.b64decode(body["bitmap"]), dtype=np.uint8),
+        count=body["size"] ** 2,
+        bitorder="little",
+    )
+    assert int(bits.sum()) == body["count"] == 13
+
+
+@pytest.mark.asyncio
+async def test_reachable_cached_until_map_changes(client, monkeypatch):
+    calls = []
+    search = reachability.reachable_cells
+
+    def counting(*args):
+        calls.append(args)
+        return search(*args)
+
+    monkeypatch.setattr("src.api.v1.endpoints.analysis.reachable_cells", counting)
+
+    first = await client.get("/api/v1/analysis/reachable", params={"radius": 3})
+    second = await client.get("/api/v1/analysis/reachable", params={"radius": 3})
+    assert first.json() == second.json()
+    assert len(calls) == 1
+
+    await client.post("/api/v1/obstacles", json={"x": 1, "y": 0})
+    third = await client.get("/api/v1/analysis/reachable", params={"radius": 3})
+    assert len(calls) == 2
+    # (1, 0) is blocked, and (2, 0) and (3, 0) now take more than three moves
+    assert third.json()["count"] == first.json()["count"] - 3
+    assert third.json()["map_version"] > first.json()["map_version"]
+
+
+@pytest.mark.asyncio
+async def test_reachable_errors(client):
+    response = await client.get("/api/v1/analysis/reachable", params={"radius": -1})
+    assert response.status_code == 422
+    response = await client.get(
+        "/api/v1/robots/999/analysis/reachable", params={"radius": 1}
+    )
+    assert response.status_code == 404
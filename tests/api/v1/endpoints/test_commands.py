@@ -1,7 +1,12 @@
+import json
+
 import pytest
 from sqlalchemy import select
 
 from src.models.command_history import CommandHistory
+from src.models.robot_state import RobotState
+from src.services.command_processor import CommandProcessor
+from src.settings import settings
 from tests.factories import ObstacleFactory
 
 
@@ -87,3 +92,239 @@ async def test_command_history_is_recorded(client, async_db_session):
     assert command_entry.position_x == 0
     assert command_entry.position_y == 2
     assert command_entry.direction == "EAST"
+
+
+@pytest.mark.asyncio
+async def test_execute_command_batch(client, async_db_session):
+    response = await client.post(
+        "/api/v1/commands/batch", json={"commands": ["FF", "R", "FXF"]}
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [r["position"] for r in results] == [
+        {"x": 0, "y": 2},
+        {"x": 0, "y": 2},
+        {"x": 2, "y": 2},
+    ]
+    assert [r["direction"] for r in results] == ["NORTH", "EAST", "EAST"]
+
+    history = await async_db_session.execute(
+        select(CommandHistory.command).order_by(CommandHistory.id)
+    )
+    assert history.scalars().all() == ["FF", "R", "FXF"]
+
+    status = await client.get("/api/v1/status")
+    assert status.json()["position"] == {"x": 2, "y": 2}
+
+
+@pytest.mark.asyncio
+async def test_execute_command_batch_continues_after_obstacle(client, async_db_session):
+    async_db_session.add(ObstacleFactory(position_x=0, position_y=2))
+    await async_db_session.commit()
+
+    response = await client.post(
+        "/api/v1/commands/batch", json={"commands": ["FFF", "RF"]}
+    )
+    results = response.json()["results"]
+
+    assert results[0]["position"] == {"x": 0, "y": 1}
+    assert results[0]["obstacle_detected"] is True
+    assert results[1]["position"] == {"x": 1, "y": 1}
+    assert results[1]["obstacle_detected"] is False
+
+
+@pytest.mark.asyncio
+async def test_execute_command_batch_rejects_long_commands(client):
+    response = await client.post(
+        "/api/v1/commands/batch", json={"commands": ["F", "F" * 1001]}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_execute_compressed_commands(client, async_db_session):
+    async_db_session.add(ObstacleFactory(position_x=3, position_y=5))
+    await async_db_session.commit()
+
+    response = await client.post("/api/v1/commands", json={"command": "(F3R)2F*9999"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["position"] == {"x": 3, "y": -9996}
+    assert data["direction"] == "SOUTH"
+    assert data["obstacle_detected"] is False
+
+    response = await client.post("/api/v1/commands", json={"command": "L2F20000"})
+    assert response.json()["position"] == {"x": 3, "y": 4}
+    assert response.json()["obstacle_detected"] is True
+
+
+@pytest.mark.asyncio
+async def test_positions_beyond_the_state_columns_are_rejected(
+    client, async_db_session
+):
+    top = 2**31 - 10
+    async_db_session.add(RobotState(position_x=0, position_y=top, direction="NORTH"))
+    await async_db_session.commit()
+
+    response = await client.post("/api/v1/commands", json={"command": "F20"})
+    assert response.status_code == 422
+
+    response = await client.get("/api/v1/status")
+    assert response.json()["position"] == {"x": 0, "y": top}
+
+
+@pytest.mark.asyncio
+async def test_execute_commands_rejects_malformed_repeats(client):
+    response = await client.post("/api/v1/commands", json={"command": "(FR2"})
+    assert response.status_code == 400
+
+    response = await client.post(
+        "/api/v1/commands/batch", json={"commands": ["F", "2F"]}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_repeated_commands_hit_execution_cache(client):
+    # FFRR goes back and forth between two poses
+    for _ in range(4):
+        await client.post("/api/v1/commands", json={"command": "FFRR"})
+
+    metrics = (await client.get("/api/v1/commands/cache")).json()
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 2
+
+    response = await client.post("/api/v1/obstacles", json={"x": 0, "y": 1})
+    assert response.status_code == 201
+    response = await client.post("/api/v1/commands", json={"command": "FFRR"})
+    assert response.json()["obstacle_detected"] is True
+
+
+@pytest.mark.asyncio
+async def test_execute_commands_stream(client, async_db_session):
+    async_db_session.add(ObstacleFactory(position_x=1, position_y=2))
+    await async_db_session.commit()
+
+    response = await client.post(
+        "/api/v1/commands?stream=true", json={"command": "FFRFF"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    steps = [json.loads(line) for line in response.text.splitlines()]
+    assert [s["position"] for s in steps] == [
+        {"x": 0, "y": 1},
+        {"x": 0, "y": 2},
+        {"x": 0, "y": 2},
+        {"x": 0, "y": 2},
+    ]
+    assert [s["command"] for s in steps] == ["F", "F", "R", "F"]
+    assert steps[-1]["direction"] == "EAST"
+    assert steps[-1]["obstacle_detected"] is True
+
+    status = await client.get("/api/v1/status")
+    assert status.json()["position"] == {"x": 0, "y": 2}
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_the_persisted_execution(
+    client, async_db_session, monkeypatch
+):
+    async_db_session.add(ObstacleFactory(position_x=1, position_y=3))
+    await async_db_session.commit()
+
+    original = CommandProcessor.get_blocked
+    calls = []
+
+    async def counting_get_blocked(self, *args, **kwargs):
+        calls.append(args)
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(CommandProcessor, "get_blocked", counting_get_blocked)
+
+    response = await client.post(
+        "/api/v1/commands?stream=true", json={"command": "F3RF2"}
+    )
+    steps = [json.loads(line) for line in response.text.splitlines()]
+    assert [s["command"] for s in steps] == ["F", "F", "F", "R", "F"]
+    assert steps[-1]["position"] == {"x": 0, "y": 3}
+    assert steps[-1]["obstacle_detected"] is True
+    assert len(calls) == 1
+
+    status = await client.get("/api/v1/status")
+    assert status.json()["position"] == steps[-1]["position"]
+
+
+@pytest.mark.asyncio
+async def test_execute_commands_retries_on_concurrent_update(
+    client, async_db_session, async_session_factory, monkeypatch
+):
+    await client.post("/api/v1/commands", json={"command": "F"})
+
+    original = CommandProcessor.process_commands
+    calls = []
+
+    async def process_with_concurrent_update(self, *args, **kwargs):
+        calls.append(args[1])
+        if len(calls) == 1:
+            # Another request moves the robot while this one is executing
+            async with async_session_factory() as other:
+                state = (await other.execute(select(RobotState))).scalar_one()
+                state.position_y = 10
+                await other.commit()
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        CommandProcessor, "process_commands", process_with_concurrent_update
+    )
+
+    response = await client.post("/api/v1/commands", json={"command": "F"})
+    assert response.status_code == 200
+    assert response.json()["position"] == {"x": 0, "y": 11}
+    assert calls == [(0, 1), (0, 10)]
+
+    state = (await async_db_session.execute(select(RobotState))).scalar_one()
+    assert state.version == 3
+
+
+@pytest.mark.asyncio
+async def test_execute_commands_through_queue(
+    client, async_session_factory, monkeypatch
+):
+    from src.api.v1.endpoints import commands
+    from src.services.command_dispatcher import CommandDispatcher
+
+    dispatcher = CommandDispatcher(async_session_factory)
+    monkeypatch.setattr(settings, "COMMAND_QUEUE_ENABLED", True)
+    monkeypatch.setattr(commands, "command_dispatcher", dispatcher)
+
+    response = await client.post("/api/v1/commands", json={"command": "FFR"})
+    assert response.json()["position"] == {"x": 0, "y": 2}
+    assert response.json()["direction"] == "EAST"
+
+    await dispatcher.stop()
+    status = await client.get("/api/v1/status")
+    assert status.json()["position"] == {"x": 0, "y": 2}
+
+
+@pytest.mark.asyncio
+async def test_stream_through_queue(client, async_session_factory, monkeypatch):
+    from src.api.v1.endpoints import commands
+    from src.services.command_dispatcher import CommandDispatcher
+
+    dispatcher = CommandDispatcher(async_session_factory)
+    monkeypatch.setattr(settings, "COMMAND_QUEUE_ENABLED", True)
+    monkeypatch.setattr(commands, "command_dispatcher", dispatcher)
+
+    response = await client.post(
+        "/api/v1/commands?stream=true", json={"command": "(FR)2"}
+    )
+    steps = [json.loads(line) for line in response.text.splitlines()]
+    assert [s["step"] for s in steps] == [0, 1, 2, 3]
+    assert steps[-1]["position"] == {"x": 1, "y": 1}
+    assert steps[-1]["direction"] == "SOUTH"
+
+    await dispatcher.stop()
+    status = await client.get("/api/v1/status")
+    assert status.json()["position"] == {"x": 1, "y": 1}
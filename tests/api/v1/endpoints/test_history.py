@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.command_history import CommandHistory
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+async def _add_history(session, count, robot_id=None):
+    session.add_all(
+        CommandHistory(
+            robot_id=robot_id,
+            command="F",
+            position_x=0,
+            position_y=i,
+            direction="NORTH",
+            obstacle_detected=i % 3 == 0,
+            executed_at=START + timedelta(seconds=i // 2),
+        )
+        for i in range(count)
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_history_pages_with_cursor(client, async_db_session):
+    await _add_history(async_db_session, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/history", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(entry["position"]["y"] for entry in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Newest first, ties on executed_at broken by id, no gaps or repeats
+    assert seen == [6, 5, 4, 3, 2, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_history_filters(client, async_db_session):
+    await _add_history(async_db_session, 10)
+
+    response = await client.get(
+        "/api/v1/history",
+        params={
+            "since": (START + timedelta(seconds=1)).isoformat(),
+            "until": (START + timedelta(seconds=4)).isoformat(),
+            "obstacle_detected": True,
+        },
+    )
+    assert response.status_code == 200
+    assert [entry["position"]["y"] for entry in response.json()["items"]] == [6, 3]
+
+
+@pytest.mark.asyncio
+async def test_history_is_per_robot(client, async_db_session):
+    robot = (await client.post("/api/v1/robots", json={"name": "rover-1"})).json()
+    await client.post(f"/api/v1/robots/{robot['id']}/commands", json={"command": "FF"})
+    await client.post("/api/v1/commands", json={"command": "L"})
+
+    response = await client.get(f"/api/v1/robots/{robot['id']}/history")
+    assert [entry["command"] for entry in response.json()["items"]] == ["FF"]
+    response = await client.get("/api/v1/history")
+    assert [entry["command"] for entry in response.json()["items"]] == ["L"]
+
+
+@pytest.mark.asyncio
+async def test_history_errors(client):
+    assert (await client.get("/api/v1/robots/999/history")).status_code == 404
+    response = await client.get("/api/v1/history", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    response = await client.get("/api/v1/history", params={"limit": 0})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_pose_at_timestamp(client):
+    robot = (
+        await client.post(
+            "/api/v1/robots", json={"name": "rover-1", "position": {"x": 5, "y": 5}}
+        )
+    ).json()
+    await client.post(f"/api/v1/robots/{robot['id']}/commands", json={"command": "FFR"})
+
+    response = await client.get(
+        f"/api/v1/robots/{robot['id']}/history/pose",
+        params={"at": (datetime.utcnow() + timedelta(seconds=1)).isoformat()},
+    )
+    assert response.status_code == 200
+    assert response.json()["position"] == {"x": 5, "y": 7}
+    assert response.json()["direction"] == "EAST"
+
+    response = await client.get(
+        f"/api/v1/robots/{robot['id']}/history/pose",
+        params={"at": START.isoformat()},
+    )
+    assert response.status_code == 404
@@ -0,0 +1,79 @@
+import pytest
+
+from src.services.obstacle_ingest import GRID_HEADER, GRID_MAGIC
+
+
+@pytest.mark.asyncio
+async def test_bulk_load_csv_blocks_robot(client):
+    response = await client.post(
+        "/api/v1/obstacles/bulk",
+        content=b"x,y\n0,2\n0,3\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"received": 2, "inserted": 2, "occupied": 0}
+
+    response = await client.post("/api/v1/commands", json={"command": "FF"})
+    assert response.json()["position"] == {"x": 0, "y": 1}
+    assert response.json()["obstacle_detected"] is True
+
+
+@pytest.mark.asyncio
+async def test_bulk_load_grid(client):
+    body = GRID_HEADER.pack(GRID_MAGIC, 0, 0, 2, 2) + bytes([0, 1, 1, 1])
+    response = await client.post(
+        "/api/v1/obstacles/bulk", params={"format": "grid"}, content=body
+    )
+    assert response.json() == {"received": 3, "inserted": 3, "occupied": 0}
+
+
+@pytest.mark.asyncio
+async def test_bulk_load_errors(client):
+    response = await client.post(
+        "/api/v1/obstacles/bulk",
+        content=b"1,2\nbroken\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 400
+    response = await client.post(
+        "/api/v1/obstacles/bulk",
+        content=b"<xml/>",
+        headers={"Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_obstacle_crud_bumps_map_version(client):
+    response = await client.post("/api/v1/obstacles", json={"x": 0, "y": 2})
+    assert response.status_code == 201
+    assert response.json() == {"x": 0, "y": 2, "version": 1}
+    response = await client.post("/api/v1/obstacles", json={"x": 0, "y": 2})
+    assert response.status_code == 409
+
+    response = await client.post("/api/v1/commands", json={"command": "FF"})
+    assert response.json()["obstacle_detected"] is True
+
+    region = await client.get(
+        "/api/v1/obstacles", params={"min_x": -1, "min_y": 0, "max_x": 1, "max_y": 5}
+    )
+    assert region.json() == {"obstacles": [{"x": 0, "y": 2}], "version": 1}
+
+    response = await client.delete("/api/v1/obstacles/0/2")
+    assert response.json()["version"] == 2
+    assert (await client.delete("/api/v1/obstacles/0/2")).status_code == 404
+
+    response = await client.post("/api/v1/commands", json={"command": "F"})
+    assert response.json()["position"] == {"x": 0, "y": 2}
+
+
+@pytest.mark.asyncio
+async def test_obstacle_cannot_be_placed_on_a_robot(client):
+    robot = (
+        await client.post(
+            "/api/v1/robots", json={"name": "a", "position": {"x": 4, "y": 4}}
+        )
+    ).json()
+    assert robot["position"] == {"x": 4, "y": 4}
+    response = await client.post("/api/v1/obstacles", json={"x": 4, "y": 4})
+    assert response.status_code == 409
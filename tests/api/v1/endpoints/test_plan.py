@@ -0,0 +1,94 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_plan_avoids_obstacles(client):
+    for x in (-1, 0, 1):
+        await client.post("/api/v1/obstacles", json={"x": x, "y": 2})
+
+    response = await client.get("/api/v1/plan", params={"x": 0, "y": 3})
+    assert response.status_code == 200
+    plan = response.json()
+    assert plan["start"] == {"x": 0, "y": 0}
+    assert plan["target"] == {"x": 0, "y": 3}
+
+    response = await client.post("/api/v1/commands", json={"command": plan["commands"]})
+    assert response.json()["position"] == {"x": 0, "y": 3}
+    assert response.json()["obstacle_detected"] is False
+
+
+@pytest.mark.asyncio
+async def test_plan_errors(client):
+    await client.post("/api/v1/obstacles", json={"x": 4, "y": 4})
+    response = await client.get("/api/v1/plan", params={"x": 4, "y": 4})
+    assert response.status_code == 422
+
+    response = await client.get("/api/v1/robots/999/plan", params={"x": 1, "y": 1})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_plan_for_fleet_robot_avoids_other_robots(client):
+    response = await client.post(
+        "/api/v1/robots", json={"name": "rover", "position": {"x": 5, "y": 0}}
+    )
+    robot_id = response.json()["id"]
+    await client.post(
+        "/api/v1/robots", json={"name": "blocker", "position": {"x": 5, "y": 1}}
+    )
+
+    response = await client.get(
+        f"/api/v1/robots/{robot_id}/plan", params={"x": 5, "y": 2}
+    )
+    assert response.status_code == 200
+    assert response.json()["cost"] > 2
+
+
+@pytest.mark.asyncio
+async def test_plan_searches_a_snapshot_of_the_robot_positions(client, monkeypatch):
+    from src.api.v1.endpoints import plan
+    from src.services.occupancy_index import occupancy_index
+
+    response = await client.post(
+        "/api/v1/robots", json={"name": "rover", "position": {"x": 5, "y": 0}}
+    )
+    robot_id = response.json()["id"]
+    response = await client.post(
+        "/api/v1/robots", json={"name": "blocker", "position": {"x": 5, "y": 1}}
+    )
+    blocker_id = response.json()["id"]
+    original = plan.plan_path
+
+    def plan_while_robots_move(*args):
+        # The event loop keeps moving robots while the search runs
+        occupancy_index.remove(blocker_id)
+        return original(*args)
+
+    monkeypatch.setattr(plan, "plan_path", plan_while_robots_move)
+
+    response = await client.get(
+        f"/api/v1/robots/{robot_id}/plan", params={"x": 5, "y": 2}
+    )
+    assert response.status_code == 200
+    assert response.json()["cost"] > 2
+
+
+@pytest.mark.asyncio
+async def test_long_plans_are_run_length_encoded(client):
+    response = await client.get("/api/v1/plan", params={"x": 0, "y": 5000})
+    assert response.status_code == 200
+    assert response.json()["commands"] == "F5000"
+
+    response = await client.post("/api/v1/commands", json={"command": "F5000"})
+    assert response.json()["position"] == {"x": 0, "y": 5000}
+
+
+@pytest.mark.asyncio
+async def test_plans_longer_than_a_command_string_are_rejected(client, monkeypatch):
+    monkeypatch.setattr("src.api.v1.endpoints.plan.MAX_COMMAND_LENGTH", 3)
+
+    response = await client.get("/api/v1/plan", params={"x": 0, "y": 9})
+    assert response.json()["commands"] == "F9"
+
+    response = await client.get("/api/v1/plan", params={"x": 3, "y": 3})
+    assert response.status_code == 422
@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import select
+
+from src.models.command_history import CommandHistory
+
+
+@pytest.mark.asyncio
+async def test_register_robot(client):
+    response = await client.post(
+        "/api/v1/robots",
+        json={"name": "rover-1", "position": {"x": 5, "y": 5}, "direction": "EAST"},
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["name"] == "rover-1"
+    assert data["position"] == {"x": 5, "y": 5}
+    assert data["direction"] == "EAST"
+
+    status = await client.get(f"/api/v1/robots/{data['id']}/status")
+    assert status.json() == {"position": {"x": 5, "y": 5}, "direction": "EAST"}
+
+    robots = await client.get("/api/v1/robots")
+    assert [r["name"] for r in robots.json()] == ["rover-1"]
+
+
+@pytest.mark.asyncio
+async def test_register_duplicate_robot(client):
+    await client.post("/api/v1/robots", json={"name": "rover-1"})
+    response = await client.post(
+        "/api/v1/robots", json={"name": "rover-1", "position": {"x": 3, "y": 3}}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_robot_commands_are_isolated(client, async_db_session):
+    first = (await client.post("/api/v1/robots", json={"name": "a"})).json()
+    second = (
+        await client.post(
+            "/api/v1/robots", json={"name": "b", "position": {"x": 0, "y": -10}}
+        )
+    ).json()
+
+    response = await client.post(
+        f"/api/v1/robots/{first['id']}/commands", json={"command": "FFR"}
+    )
+    assert response.status_code == 200
+    assert response.json()["position"] == {"x": 0, "y": 2}
+
+    await client.post(
+        f"/api/v1/robots/{second['id']}/commands/batch",
+        json={"commands": ["B", "B"]},
+    )
+
+    first_status = await client.get(f"/api/v1/robots/{first['id']}/status")
+    second_status = await client.get(f"/api/v1/robots/{second['id']}/status")
+    legacy_status = await client.get("/api/v1/status")
+    assert first_status.json()["position"] == {"x": 0, "y": 2}
+    assert first_status.json()["direction"] == "EAST"
+    assert second_status.json()["position"] == {"x": 0, "y": -12}
+    assert legacy_status.json()["position"] == {"x": 0, "y": 0}
+
+    history = await async_db_session.execute(
+        select(CommandHistory.robot_id, CommandHistory.command).order_by(
+            CommandHistory.id
+        )
+    )
+    assert history.all() == [
+        (first["id"], "FFR"),
+        (second["id"], "B"),
+        (second["id"], "B"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unknown_robot(client):
+    response = await client.get("/api/v1/robots/999/status")
+    assert response.status_code == 404
+
+    response = await client.post("/api/v1/robots/999/commands", json={"command": "F"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_robots_block_each_other(client):
+    first = (
+        await client.post(
+            "/api/v1/robots", json={"name": "a", "position": {"x": 0, "y": 3}}
+        )
+    ).json()
+    second = (await client.post("/api/v1/robots", json={"name": "b"})).json()
+
+    response = await client.post(
+        f"/api/v1/robots/{second['id']}/commands", json={"command": "FFFF"}
+    )
+    assert response.json()["position"] == {"x": 0, "y": 2}
+    assert response.json()["obstacle_detected"] is True
+
+    await client.post(f"/api/v1/robots/{first['id']}/commands", json={"command": "RF"})
+    response = await client.post(
+        f"/api/v1/robots/{second['id']}/commands", json={"command": "FFFF"}
+    )
+    assert response.json()["position"] == {"x": 0, "y": 6}
+    assert response.json()["obstacle_detected"] is False
+
+
+@pytest.mark.asyncio
+async def test_register_robot_on_occupied_cell(client):
+    await client.post("/api/v1/robots", json={"name": "a"})
+    response = await client.post("/api/v1/robots", json={"name": "b"})
+    assert response.status_code == 409
@@ -1,4 +1,7 @@
 # test_status.py
+import asyncio
+from unittest.mock import patch
+
 import pytest
 
 
@@ -36,3 +39,65 @@ async def test_get_status_with_invalid_commands(client):
     data = response.json()
     assert data["position"] == {"x": 0, "y": 0}
     assert data["direction"] == "NORTH"
+
+
+@pytest.mark.asyncio
+async def test_get_status_etag_and_not_modified(client):
+    response = await client.get("/api/v1/status")
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/v1/status", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    await client.post("/api/v1/commands", json={"command": "F"})
+    response = await client.get("/api/v1/status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["position"] == {"x": 0, "y": 1}
+
+
+@pytest.mark.asyncio
+async def test_get_status_after_commands_skips_database(client):
+    await client.post("/api/v1/commands", json={"command": "RF"})
+
+    with patch("src.api.v1.endpoints.status.load_robot_state") as load:
+        response = await client.get("/api/v1/status")
+
+    load.assert_not_called()
+    assert response.json() == {"position": {"x": 1, "y": 0}, "direction": "EAST"}
+
+
+@pytest.mark.asyncio
+async def test_get_robot_status_not_found(client):
+    response = await client.get("/api/v1/robots/999/status")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_shared_status_load_outlives_the_first_request(client, async_db_session):
+    from src.api.v1.endpoints import status
+
+    original = status.load_robot_state
+    started, release = asyncio.Event(), asyncio.Event()
+    sessions = []
+
+    async def slow_load(session, robot_id):
+        sessions.append(session)
+        started.set()
+        await release.wait()
+        return await original(session, robot_id)
+
+    with patch.object(status, "load_robot_state", slow_load):
+        first = asyncio.create_task(client.get("/api/v1/status"))
+        await started.wait()
+        second = asyncio.create_task(client.get("/api/v1/status"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        release.set()
+        response = await second
+
+    assert response.status_code == 200
+    assert response.json()["position"] == {"x": 0, "y": 0}
+    assert len(sessions) == 1
+    assert sessions[0] is not async_db_session
@@ -8,6 +8,11 @@ from sqlalchemy.pool import StaticPool
 from src.main import app
 from src.models.base import Base
 from src.services.database import get_db
+from src.services.execution_cache import execution_cache
+from src.services.obstacle_index import obstacle_index
+from src.services.occupancy_index import occupancy_index
+from src.services.reachability import reachability_cache
+from src.services.status_cache import status_cache
 
 
 @pytest.fixture(scope="session")
@@ -51,6 +56,16 @@ async def prepare_database():
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    obstacle_index.invalidate()
+    occupancy_index.clear()
+    reachability_cache.clear()
+    execution_cache.clear()
+    status_cache.clear()
+
+
+@pytest.fixture
+def async_session_factory():
+    return AsyncTestingSessionLocal
 
 
 @pytest.fixture
@@ -60,11 +75,15 @@ async def async_db_session():
 
 
 @pytest.fixture
-async def client(async_db_session):
+async def client(async_db_session, monkeypatch):
+    from src.api.v1.endpoints import status
+
     async def override_get_db():
         yield async_db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Status loads open their own session instead of the request's
+    monkeypatch.setattr(status, "AsyncSessionLocal", AsyncTestingSessionLocal)
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
@@ -112,3 +112,25 @@ def test_command_history_repr():
 def test_obstacle_repr():
     obstacle = Obstacle(id=1, position_x=3, position_y=5)
     assert isinstance(repr(obstacle), str)
+
+
+@pytest.mark.asyncio
+async def test_robot_state_version_detects_stale_update(
+    async_db_session, async_session_factory
+):
+    from sqlalchemy.orm.exc import StaleDataError
+
+    state = RobotState(position_x=0, position_y=0, direction="NORTH")
+    async_db_session.add(state)
+    await async_db_session.commit()
+    assert state.version == 1
+
+    async with async_session_factory() as other:
+        concurrent = await other.get(RobotState, state.id)
+        concurrent.position_x = 5
+        await other.commit()
+        assert concurrent.version == 2
+
+    state.position_x = 7
+    with pytest.raises(StaleDataError):
+        await async_db_session.commit()
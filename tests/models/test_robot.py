@@ -155,3 +155,29 @@ def test_execute_commands_with_invalid_characters():
     assert result["position"] == {"x": 0, "y": 2}
     assert result["direction"] == Direction.NORTH
     assert result["obstacle_detected"] is False
+
+
+def test_robot_uses_slots_and_integer_heading():
+    robot = Robot((0, 0), Direction.NORTH)
+    assert not hasattr(robot, "__dict__")
+    with pytest.raises(AttributeError):
+        robot.speed = 1
+
+    assert robot.heading == 0
+    robot.rotate_right()
+    assert robot.heading == 1
+    robot.rotate_left()
+    robot.rotate_left()
+    assert robot.heading == 3
+    assert robot.direction == Direction.WEST
+
+
+def test_robot_position_and_direction_setters():
+    robot = Robot((0, 0), Direction.NORTH)
+    robot.position = Position(4, -2)
+    robot.direction = Direction.SOUTH
+    robot.move_forward()
+
+    assert robot.position == Position(4, -3)
+    assert isinstance(robot.position, Position)
+    assert robot.direction == Direction.SOUTH
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.models.base import Base
+from src.models.command_history import CommandHistory
+from src.models.obstacle import Obstacle
+from src.models.robot_state import RobotState
+from src.services import command_dispatcher as dispatcher_module
+from src.services.command_dispatcher import CommandDispatcher
+from src.services.history_writer import HistoryWriter
+
+
+@pytest.fixture
+async def dispatcher(async_session_factory):
+    command_dispatcher = CommandDispatcher(async_session_factory)
+    yield command_dispatcher
+    await command_dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_commands_execute_in_submission_order(dispatcher, async_db_session):
+    outcomes = await asyncio.gather(
+        *(dispatcher.execute([command]) for command in ["F", "R", "F", "F"])
+    )
+    positions = [results[0]["position"] for _, results in outcomes]
+    assert positions == [
+        {"x": 0, "y": 1},
+        {"x": 0, "y": 1},
+        {"x": 1, "y": 1},
+        {"x": 2, "y": 1},
+    ]
+    start, _ = outcomes[-1]
+    assert start.position == (1, 1)
+
+    await dispatcher.drain()
+    state = (await async_db_session.execute(select(RobotState))).scalar_one()
+    assert (state.position_x, state.position_y, state.direction) == (2, 1, "EAST")
+    history = await async_db_session.execute(
+        select(CommandHistory.command).order_by(CommandHistory.id)
+    )
+    assert history.scalars().all() == ["F", "R", "F", "F"]
+
+
+@pytest.mark.asyncio
+async def test_worker_reads_state_once(dispatcher, async_db_session):
+    async_db_session.add(RobotState(position_x=3, position_y=3, direction="SOUTH"))
+    async_db_session.add(Obstacle(position_x=3, position_y=0))
+    await async_db_session.commit()
+
+    _, results = await dispatcher.execute(["FF"])
+    assert results[0]["position"] == {"x": 3, "y": 1}
+
+    _, results = await dispatcher.execute(["F", "F"])
+    assert [r["position"] for r in results] == [{"x": 3, "y": 1}, {"x": 3, "y": 1}]
+    assert results[0]["obstacle_detected"] is True
+
+
+@pytest.mark.asyncio
+async def test_unknown_robot(dispatcher):
+    with pytest.raises(LookupError):
+        await dispatcher.execute(["F"], robot_id=42)
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_release_their_connection(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'robots.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=1,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    dispatcher = CommandDispatcher(async_sessionmaker(engine, expire_on_commit=False))
+    try:
+        for robot_id in (41, 42, 43):
+            with pytest.raises(LookupError):
+                await dispatcher.execute(["F"], robot_id=robot_id)
+        await asyncio.sleep(0)
+
+        assert engine.pool.checkedout() == 0
+        assert dispatcher._workers == {}
+        _, results = await dispatcher.execute(["F"])
+        assert results[0]["position"] == {"x": 0, "y": 1}
+    finally:
+        await dispatcher.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error",
+    [StaleDataError("row changed"), OperationalError("UPDATE", {}, Exception("down"))],
+)
+async def test_failed_write_back_keeps_history(
+    dispatcher, async_db_session, async_session_factory, monkeypatch, error
+):
+    writer = HistoryWriter(async_session_factory, flush_interval=0.01)
+    monkeypatch.setattr(dispatcher_module, "history_writer", writer)
+
+    def failing_apply_result(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(dispatcher_module, "apply_result", failing_apply_result)
+
+    _, results = await dispatcher.execute(["FF", "R"])
+    assert results[-1]["position"] == {"x": 0, "y": 2}
+    await dispatcher.drain()
+    await writer.flush()
+
+    history = await async_db_session.execute(
+        select(CommandHistory.command).order_by(CommandHistory.id)
+    )
+    assert history.scalars().all() == ["FF", "R"]
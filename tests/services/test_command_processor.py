@@ -2,8 +2,21 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from src.models.robot import Direction
+from src.models.obstacle import Obstacle
+from src.models.robot import Direction, Position
 from src.services.command_processor import CommandProcessor
+from src.services.obstacle_index import ObstacleIndex
+from src.services.occupancy_index import occupancy_index
+from src.services.robot_service import path_bounds
+from src.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def static_occupancy(monkeypatch):
+    """The mocked sessions hold no robot states to reload"""
+    monkeypatch.setattr(
+        occupancy_index, "refresh", AsyncMock(return_value=occupancy_index)
+    )
 
 
 @pytest.mark.asyncio
@@ -155,25 +168,88 @@ async def test_process_commands_with_invalid_characters():
         assert result["obstacle_detected"] is False
 
 
+def _streamed(rows):
+    """A mocked streaming result yielding ``rows`` as a single partition"""
+
+    async def partitions(size=None):
+        yield rows
+
+    stream_result = MagicMock()
+    stream_result.partitions = partitions
+    return stream_result
+
+
 @pytest.mark.asyncio
 async def test_get_obstacles_from_database():
     mock_db_session = AsyncMock()
 
-    mock_obstacles = [
-        type("Obstacle", (), {"position_x": 1, "position_y": 4}),
-        type("Obstacle", (), {"position_x": 3, "position_y": 5}),
-        type("Obstacle", (), {"position_x": 7, "position_y": 4}),
-    ]
-
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = mock_obstacles
+    mock_result.scalar.return_value = 0
 
     mock_db_session.execute.return_value = mock_result
+    mock_db_session.stream.return_value = _streamed([(1, 4), (3, 5), (7, 4)])
 
-    processor = CommandProcessor(mock_db_session)
+    processor = CommandProcessor(mock_db_session, ObstacleIndex())
     obstacles = await processor.get_obstacles()
 
     expected_obstacles = {(1, 4), (3, 5), (7, 4)}
     assert obstacles == expected_obstacles
 
-    mock_db_session.execute.assert_awaited_once()
+    # The change feed position, then the obstacles
+    assert mock_db_session.execute.await_count == 1
+    assert mock_db_session.stream.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_obstacles_served_from_index_after_load():
+    mock_db_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar.return_value = 0
+    mock_db_session.execute.return_value = mock_result
+    mock_db_session.stream.side_effect = lambda stmt: _streamed([(1, 4)])
+
+    index = ObstacleIndex()
+    processor = CommandProcessor(mock_db_session, index)
+    await processor.get_obstacles()
+    # Within the poll interval the change feed is not queried again
+    await processor.get_obstacles()
+    assert mock_db_session.execute.await_count == 1
+    assert mock_db_session.stream.await_count == 1
+
+    index.invalidate()
+    await processor.get_obstacles()
+    assert mock_db_session.execute.await_count == 2
+    assert mock_db_session.stream.await_count == 2
+
+
+def test_path_bounds_covers_swept_cells():
+    low, high = path_bounds((2, 3), Direction.NORTH, "FFRFFFLBBBB")
+    assert low == (2, 1)
+    assert high == (5, 5)
+
+    low, high = path_bounds((0, 0), Direction.EAST, "")
+    assert low == high == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_get_obstacles_scoped_to_bounds_without_cache(
+    async_db_session, monkeypatch
+):
+    monkeypatch.setattr(settings, "OBSTACLE_CACHE_ENABLED", False)
+    async_db_session.add_all([
+        Obstacle(position_x=0, position_y=3),
+        Obstacle(position_x=1, position_y=4),
+        Obstacle(position_x=50, position_y=50),
+    ])
+    await async_db_session.commit()
+
+    processor = CommandProcessor(async_db_session, ObstacleIndex())
+    obstacles = await processor.get_obstacles((Position(-1, 0), Position(1, 3)))
+    assert obstacles == {(0, 3)}
+
+    result = await processor.process_commands(
+        command_string="FFFF", start_position=(0, 0), start_direction=Direction.NORTH
+    )
+    assert result["position"] == {"x": 0, "y": 2}
+    assert result["obstacle_detected"] is True
+    assert not processor.obstacle_index.is_loaded
@@ -0,0 +1,216 @@
+import random
+import time
+
+import pytest
+
+from src.models.robot import HEADING_INDEX, Direction, Position, Robot
+from src.services.command_program import (
+    MAX_EXPANDED_LENGTH,
+    CommandSyntaxError,
+    apply_if_clear,
+    compile_commands,
+    compress,
+    execute,
+    expand,
+    is_compressed,
+    parse_commands,
+)
+from src.services.obstacle_index import ObstacleIndex
+from src.services.occupancy_index import OccupancyIndex
+from src.services.robot_service import RobotCommandExecutor, path_bounds
+
+
+def _plain(program: str) -> str:
+    return "".join(expand(parse_commands(program)))
+
+
+def _random_program(rng: random.Random, depth: int = 0) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        if depth < 3 and rng.random() < 0.3:
+            atom = f"({_random_program(rng, depth + 1)})"
+        else:
+            atom = rng.choice("FFBLR")
+        count = rng.choice(["", "", str(rng.randint(0, 12)), f"*{rng.randint(1, 9)}"])
+        parts.append(atom + count)
+    return "".join(parts)
+
+
+@pytest.mark.parametrize(
+    "program, plain",
+    [
+        ("F3", "FFF"),
+        ("F*3R", "FFFR"),
+        ("(FR)2L", "FRFRL"),
+        ("((FB)2R)*2", "FBFBRFBFBR"),
+        ("F0R", "R"),
+        ("F12", "F" * 12),
+        ("FX2", "FF"),
+        ("()3F", "F"),
+    ],
+)
+def test_expands_run_length_and_repeats(program, plain):
+    assert is_compressed(program)
+    assert _plain(program) == plain
+
+
+@pytest.mark.parametrize("program", ["(F", "F)", "3F", "F*", "(3)", "F**2"])
+def test_rejects_malformed_programs(program):
+    with pytest.raises(CommandSyntaxError):
+        parse_commands(program)
+
+
+def test_rejects_programs_expanding_past_the_limit():
+    with pytest.raises(CommandSyntaxError):
+        parse_commands(f"(F{MAX_EXPANDED_LENGTH})2")
+    with pytest.raises(CommandSyntaxError):
+        parse_commands("(" * 100 + "F" + ")" * 100)
+
+
+def test_plain_strings_are_not_compressed():
+    assert not is_compressed("FFRFFLB")
+    assert not is_compressed("HAHA")
+
+
+@pytest.mark.parametrize("box_checks", [64, 2, 0])
+def test_matches_step_by_step_execution(monkeypatch, box_checks):
+    # Small budgets exercise the fallback to stepping part way through
+    monkeypatch.setattr("src.services.command_program.MIN_BOX_CHECKS", box_checks)
+    rng = random.Random(7)
+    obstacles = {Position(rng.randint(-8, 8), rng.randint(-8, 8)) for _ in range(12)}
+    obstacles.discard(Position(0, 0))
+    for _ in range(300):
+        program = _random_program(rng)
+        direction = rng.choice(list(Direction))
+        expected = Robot(position=(0, 0), direction=direction)
+        RobotCommandExecutor.execute_commands(expected, _plain(program), obstacles)
+        robot = Robot(position=(0, 0), direction=direction)
+
+        detected = execute(robot, program, obstacles)
+
+        assert detected == expected.obstacle_detected, program
+        assert robot.position == expected.position, program
+        assert robot.direction == expected.direction, program
+
+
+def test_long_program_without_obstacles_runs_as_transforms():
+    robot = Robot(position=(0, 0), direction=Direction.NORTH)
+    assert not execute(robot, "(F300000R)3", {Position(5, 5)})
+    assert robot.position == Position(300000, 0)
+    assert robot.direction == Direction.WEST
+
+
+def test_patrol_loop_around_obstacle_runs_one_pass():
+    # The loop returns to its start, so only its first pass can collide
+    started = time.perf_counter()
+    robot = Robot(position=(0, 0), direction=Direction.NORTH)
+    assert not execute(robot, "(FFRFFRFFRFFR)80000", {Position(1, 1)})
+    assert time.perf_counter() - started < 0.5
+    assert robot.position == Position(0, 0)
+    assert robot.direction == Direction.NORTH
+
+
+def test_boxes_blocked_off_the_path_cost_about_as_much_as_stepping():
+    # Each pass sweeps row k and climbs two rows; every pass's box holds an
+    # obstacle on an odd row the path never enters
+    index = ObstacleIndex()
+    index.replace(Position(2, 2 * k + 1) for k in range(30_000))
+    program = "(RFFFBBBLFF)30000"
+
+    started = time.perf_counter()
+    reference = Robot(position=(0, 0), direction=Direction.NORTH)
+    for command in _plain(program):
+        reference.process_command(command)
+        assert reference.position not in index
+    stepping = time.perf_counter() - started
+
+    robot = Robot(position=(0, 0), direction=Direction.NORTH)
+    started = time.perf_counter()
+    assert not execute(robot, program, index)
+    elapsed = time.perf_counter() - started
+
+    assert robot.position == reference.position == Position(0, 60_000)
+    assert elapsed < 3 * stepping + 0.1
+
+
+def test_stops_in_front_of_obstacle_inside_repeat():
+    index = ObstacleIndex()
+    index.replace([Position(0, 70000)])
+    robot = Robot(position=(0, 0), direction=Direction.NORTH)
+
+    assert execute(robot, "F100000", index)
+    assert robot.position == Position(0, 69999)
+    assert robot.obstacle_detected
+
+
+def test_other_robots_block_compressed_paths():
+    occupancy = OccupancyIndex()
+    occupancy.try_move(2, (0, 40))
+    blocked = occupancy.blocking(frozenset(), robot_key=1)
+    robot = Robot(position=(0, 0), direction=Direction.NORTH)
+
+    assert RobotCommandExecutor.execute_commands(robot, "F50", blocked) == {
+        "position": {"x": 0, "y": 39},
+        "direction": "NORTH",
+        "obstacle_detected": True,
+    }
+
+
+def test_path_bounds_of_compressed_program():
+    low, high = path_bounds((1, 1), Direction.EAST, "(F3R)4F10B20")
+    assert low == Position(-9, -2)
+    assert high == Position(11, 1)
+    plain = path_bounds((1, 1), Direction.EAST, _plain("(F3R)4F10B20"))
+    assert (low, high) == plain
+
+
+def test_compiled_poses_for_every_start_heading():
+    compiled = compile_commands("FFRFB3L")
+    assert compiled.poses == ((-2, 2, 0), (2, 2, 1), (2, -2, 2), (-2, -2, 3))
+    assert compiled.boxes[0] == (-2, 0, 1, 2)
+    assert compiled.moves == 6
+    assert compile_commands("FF(RF)2BBL") is compile_commands("FF(RF)2BBL")
+
+
+def test_compiled_moves_match_step_by_step_execution():
+    rng = random.Random(11)
+    for _ in range(200):
+        commands = "".join(rng.choices("FFBLRX", k=rng.randint(0, 30)))
+        compiled = compile_commands(commands)
+        for direction in Direction:
+            start = Position(rng.randint(-50, 50), rng.randint(-50, 50))
+            expected = Robot(position=start, direction=direction)
+            visited = [start]
+            for command in commands:
+                expected.process_command(command)
+                visited.append(expected.position)
+            robot = Robot(position=start, direction=direction)
+
+            compiled.apply(robot)
+
+            assert robot.position == expected.position
+            assert robot.direction == expected.direction
+            assert compiled.bounds(start, HEADING_INDEX[direction]) == (
+                Position(min(x for x, _ in visited), min(y for _, y in visited)),
+                Position(max(x for x, _ in visited), max(y for _, y in visited)),
+            )
+
+
+def test_apply_if_clear_only_skips_paths_without_obstacles():
+    robot = Robot(position=(10, 10), direction=Direction.WEST)
+    assert apply_if_clear(robot, "FFFLF", {Position(0, 0)})
+    assert robot.position == Position(7, 9)
+    assert robot.direction == Direction.SOUTH
+
+    assert not apply_if_clear(robot, "FFFLF", {Position(7, 7)})
+    assert robot.position == Position(7, 9)
+    assert not robot.obstacle_detected
+
+
+@pytest.mark.parametrize(
+    "plain, compressed",
+    [("", ""), ("FFRFFF", "FFRF3"), ("B" * 37 + "LLF", "B37LLF"), ("FRFL", "FRFL")],
+)
+def test_compress_writes_runs_with_counts(plain, compressed):
+    assert compress(plain) == compressed
+    assert _plain(compressed) == plain
@@ -0,0 +1,122 @@
+from unittest.mock import Mock, patch
+
+from src.models.robot import Direction, Position, Robot
+from src.services.execution_cache import CachedExecutor, ExecutionCache
+from src.services.obstacle_index import ObstacleIndex
+from src.services.occupancy_index import OccupancyIndex
+from src.services.robot_service import RobotCommandExecutor
+
+
+def _executor(cache: ExecutionCache) -> tuple[CachedExecutor, Mock]:
+    inner = Mock(wraps=RobotCommandExecutor())
+    return CachedExecutor(inner, cache), inner
+
+
+def _index(*cells: Position) -> ObstacleIndex:
+    index = ObstacleIndex()
+    index.replace(cells)
+    return index
+
+
+def test_repeated_commands_are_served_from_cache():
+    cache = ExecutionCache(max_size=8, ttl=0)
+    executor, inner = _executor(cache)
+    index = _index(Position(0, 3))
+
+    first = executor.execute_commands(Robot((0, 0), Direction.NORTH), "FFFRF", index)
+    robot = Robot((0, 0), Direction.NORTH)
+    second = executor.execute_commands(robot, "FFFRF", index)
+
+    assert first == second
+    assert second == {
+        "position": {"x": 0, "y": 2},
+        "direction": "NORTH",
+        "obstacle_detected": True,
+    }
+    assert robot.position == Position(0, 2)
+    assert robot.obstacle_detected
+    assert inner.execute_commands.call_count == 1
+    assert cache.metrics()["hits"] == 1
+    assert cache.metrics()["misses"] == 1
+
+
+def test_start_pose_is_part_of_the_key():
+    cache = ExecutionCache(max_size=8, ttl=0)
+    executor, inner = _executor(cache)
+    index = _index()
+
+    executor.execute_commands(Robot((0, 0), Direction.NORTH), "F", index)
+    executor.execute_commands(Robot((0, 0), Direction.EAST), "F", index)
+    result = executor.execute_commands(Robot((5, 0), Direction.EAST), "F", index)
+
+    assert result["position"] == {"x": 6, "y": 0}
+    assert inner.execute_commands.call_count == 3
+
+
+def test_obstacle_writes_invalidate_entries():
+    cache = ExecutionCache(max_size=8, ttl=0)
+    executor, _ = _executor(cache)
+    index = _index()
+
+    executor.execute_commands(Robot((0, 0), Direction.NORTH), "FF", index)
+    index.add(Position(0, 2))
+    result = executor.execute_commands(Robot((0, 0), Direction.NORTH), "FF", index)
+
+    assert result["position"] == {"x": 0, "y": 1}
+    assert result["obstacle_detected"] is True
+    assert cache.metrics()["invalidations"] == 1
+    assert len(cache) == 1
+
+
+def test_entries_expire_and_are_evicted():
+    cache = ExecutionCache(max_size=2, ttl=10)
+    executor, inner = _executor(cache)
+    index = _index()
+
+    with patch("src.services.execution_cache.time.monotonic", return_value=100.0):
+        for commands in ("F", "FF", "FFF"):
+            executor.execute_commands(Robot((0, 0), Direction.NORTH), commands, index)
+    assert len(cache) == 2
+    assert cache.metrics()["evictions"] == 1
+
+    with patch("src.services.execution_cache.time.monotonic", return_value=111.0):
+        executor.execute_commands(Robot((0, 0), Direction.NORTH), "FFF", index)
+    assert cache.metrics()["expirations"] == 1
+    assert inner.execute_commands.call_count == 4
+
+
+def test_other_containers_bypass_the_cache():
+    cache = ExecutionCache(max_size=8, ttl=0)
+    executor, inner = _executor(cache)
+
+    for _ in range(2):
+        executor.execute_commands(Robot((0, 0), Direction.NORTH), "F", {Position(9, 9)})
+
+    assert inner.execute_commands.call_count == 2
+    assert len(cache) == 0
+    assert cache.metrics()["misses"] == 2
+
+
+def test_runs_clear_of_other_robots_are_cached():
+    cache = ExecutionCache(max_size=8, ttl=0)
+    executor, inner = _executor(cache)
+    occupancy = OccupancyIndex()
+    occupancy.try_move(1, (0, 0))
+    occupancy.try_move(2, (5, 5))
+    blocked = occupancy.blocking(_index(), robot_key=1)
+
+    for _ in range(2):
+        result = executor.execute_commands(
+            Robot((0, 0), Direction.NORTH), "FF", blocked
+        )
+    assert result["position"] == {"x": 0, "y": 2}
+    assert inner.execute_commands.call_count == 1
+    assert cache.metrics()["hits"] == 1
+
+    # A robot inside the path's box is never answered from the cache
+    occupancy.try_move(2, (0, 2))
+    result = executor.execute_commands(Robot((0, 0), Direction.NORTH), "FF", blocked)
+    assert result["position"] == {"x": 0, "y": 1}
+    assert result["obstacle_detected"] is True
+    assert inner.execute_commands.call_count == 2
+    assert cache.metrics()["misses"] == 2
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.command_history import CommandHistory
+from src.services.export_history import export_history, format_for
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+async def history(async_db_session):
+    async_db_session.add_all(
+        CommandHistory(
+            command="F" * (i + 1),
+            position_x=0,
+            position_y=i,
+            direction="NORTH",
+            obstacle_detected=i == 4,
+            executed_at=START + timedelta(minutes=i),
+        )
+        for i in range(5)
+    )
+    await async_db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_export_parquet_in_chunks(history, async_session_factory, tmp_path):
+    path = tmp_path / "history.parquet"
+    engine = async_session_factory.kw["bind"]
+
+    rows = await export_history(path, chunk_size=2, db_engine=engine)
+
+    assert rows == 5
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("position_y").to_pylist() == [0, 1, 2, 3, 4]
+    assert table.column("obstacle_detected").to_pylist()[-1] is True
+    assert not list(tmp_path.glob("*.partial"))
+
+
+@pytest.mark.asyncio
+async def test_export_arrow_with_time_range(history, async_session_factory, tmp_path):
+    path = tmp_path / "history.arrow"
+    engine = async_session_factory.kw["bind"]
+
+    rows = await export_history(
+        path,
+        since=START + timedelta(minutes=1),
+        until=START + timedelta(minutes=3),
+        db_engine=engine,
+    )
+
+    assert rows == 2
+    with pa.ipc.open_file(path) as reader:
+        table = reader.read_all()
+    assert table.column("command").to_pylist() == ["FF", "FFF"]
+
+
+def test_format_from_extension(tmp_path):
+    assert format_for(tmp_path / "history.arrow") == "arrow"
+    assert format_for(tmp_path / "history.parquet") == "parquet"
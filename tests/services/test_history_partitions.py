@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.services.history_partitions import (
+    PartitionPlan,
+    add_months,
+    maintain_partitions,
+    partition_month,
+    partition_name,
+    plan_partitions,
+)
+
+
+def test_add_months_wraps_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_names_round_trip():
+    assert partition_name(date(2026, 3, 1)) == "command_history_2026_03"
+    assert partition_month("command_history_2026_03") == date(2026, 3, 1)
+    assert partition_month("command_history_default") is None
+
+
+def test_plan_creates_missing_upcoming_months():
+    existing = [date(2026, 10, 1), date(2026, 12, 1)]
+    plan = plan_partitions(
+        existing, date(2026, 10, 18), premake=2, retention_months=None
+    )
+    assert plan == PartitionPlan(create=[date(2026, 11, 1)], expire=[])
+
+
+def test_plan_expires_months_past_retention():
+    existing = [date(2025, month, 1) for month in range(8, 13)] + [date(2026, 1, 1)]
+    plan = plan_partitions(existing, date(2026, 1, 5), premake=0, retention_months=3)
+    assert plan.create == []
+    assert plan.expire == [date(2025, 8, 1), date(2025, 9, 1)]
+
+
+@pytest.mark.asyncio
+async def test_maintenance_skips_non_postgresql():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        assert await maintain_partitions(engine, retention_months=1) == PartitionPlan()
+    finally:
+        await engine.dispose()
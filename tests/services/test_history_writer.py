@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models.command_history import CommandHistory
+from src.services.history_writer import HistoryWriter
+from src.services.robot_state_service import history_row
+
+
+def _row(command):
+    return {
+        "robot_id": None,
+        "command": command,
+        "position_x": 0,
+        "position_y": 1,
+        "direction": "NORTH",
+        "obstacle_detected": False,
+    }
+
+
+async def _count(session):
+    result = await session.execute(select(func.count(CommandHistory.id)))
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_size_threshold(async_session_factory, async_db_session):
+    writer = HistoryWriter(async_session_factory, flush_size=3, flush_interval=60)
+    await writer.add([_row("F"), _row("B"), _row("L")])
+
+    await asyncio.wait_for(writer.flush(), timeout=5)
+    assert await _count(async_db_session) == 3
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_time_threshold(async_session_factory, async_db_session):
+    writer = HistoryWriter(async_session_factory, flush_size=100, flush_interval=0.05)
+    await writer.add([_row("F")])
+
+    await asyncio.sleep(0.2)
+    assert writer.pending == 0
+    assert await _count(async_db_session) == 1
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_backpressure_when_buffer_full(async_session_factory, monkeypatch):
+    writer = HistoryWriter(async_session_factory, max_size=1, flush_size=1)
+    released = asyncio.Event()
+    written = []
+
+    async def slow_write(rows):
+        await released.wait()
+        written.extend(rows)
+
+    monkeypatch.setattr(writer, "_write", slow_write)
+
+    await writer.add([_row("F"), _row("B")])
+    blocked = asyncio.create_task(writer.add([_row("L")]))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    released.set()
+    await asyncio.wait_for(blocked, timeout=5)
+    await writer.stop()
+    assert [row["command"] for row in written] == ["F", "B", "L"]
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_rows(async_session_factory, async_db_session):
+    writer = HistoryWriter(async_session_factory, flush_size=100, flush_interval=60)
+    await writer.add([_row("F"), _row("R")])
+
+    await writer.stop()
+    assert await _count(async_db_session) == 2
+
+
+@pytest.mark.asyncio
+async def test_rows_keep_their_execution_time(async_session_factory, async_db_session):
+    result = {"position": {"x": 0, "y": 1}, "direction": "NORTH"}
+    row = history_row("F", {**result, "obstacle_detected": False})
+    writer = HistoryWriter(async_session_factory, flush_size=100, flush_interval=60)
+    await writer.add([row])
+    await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(writer.flush(), timeout=5)
+    executed_at = await async_db_session.scalar(select(CommandHistory.executed_at))
+    assert executed_at == row["executed_at"]
+    assert datetime.utcnow() - executed_at >= timedelta(seconds=0.05)
+    await writer.stop()
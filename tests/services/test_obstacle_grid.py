@@ -0,0 +1,158 @@
+import sys
+
+import numpy as np
+
+from src.models.robot import Position
+from src.services.obstacle_grid import (
+    COMPACT_TILES,
+    SPARSE_LIMIT,
+    TILE_BYTES,
+    TILE_SIZE,
+    ObstacleGrid,
+)
+
+
+def test_membership_across_tiles_and_negative_coordinates():
+    cells = [Position(0, 0), Position(63, 63), Position(64, 0), Position(-1, -1)]
+    grid = ObstacleGrid(cells)
+
+    assert len(grid) == 4
+    assert grid.tile_count == 3
+    assert set(grid) == set(cells)
+    for cell in cells:
+        assert cell in grid
+    assert Position(1, 0) not in grid
+    assert Position(-64, -1) not in grid
+    assert (63, 63) in grid
+    assert "not a cell" not in grid
+
+
+def test_add_and_discard_keep_count_and_free_empty_tiles():
+    grid = ObstacleGrid()
+    grid.add(Position(5, 5))
+    grid.add(Position(5, 5))
+    grid.add(Position(6, 5))
+    assert len(grid) == 2
+
+    grid.discard(Position(5, 5))
+    grid.discard(Position(5, 5))
+    assert len(grid) == 1
+    assert grid.tile_count == 1
+
+    grid.discard(Position(6, 5))
+    assert len(grid) == 0
+    assert grid.tile_count == 0
+
+
+def test_add_many_matches_scalar_adds():
+    rng = np.random.default_rng(7)
+    xs = rng.integers(-500, 500, 5000)
+    ys = rng.integers(-500, 500, 5000)
+
+    grid = ObstacleGrid()
+    grid.add_many(xs, ys)
+    expected = {Position(int(x), int(y)) for x, y in zip(xs, ys, strict=True)}
+    assert len(grid) == len(expected)
+    assert set(grid) == expected
+
+    probe_xs = rng.integers(-600, 600, 2000)
+    probe_ys = rng.integers(-600, 600, 2000)
+    found = grid.contains_many(probe_xs, probe_ys)
+    assert found.tolist() == [
+        Position(int(x), int(y)) in expected
+        for x, y in zip(probe_xs, probe_ys, strict=True)
+    ]
+
+
+def _set_bytes_per_cell(cells: set[Position]) -> float:
+    return (sys.getsizeof(cells) + sum(sys.getsizeof(cell) for cell in cells)) / len(
+        cells
+    )
+
+
+def test_dense_map_uses_one_bit_per_cell():
+    side = 4 * TILE_SIZE
+    xs, ys = np.meshgrid(np.arange(side), np.arange(side))
+    grid = ObstacleGrid()
+    grid.add_many(xs.ravel(), ys.ravel())
+
+    assert len(grid) == side * side
+    assert grid.nbytes == 16 * TILE_BYTES
+    sample = {Position(x, y) for x in range(TILE_SIZE) for y in range(TILE_SIZE)}
+    assert _set_bytes_per_cell(sample) / (grid.nbytes / len(grid)) > 50
+
+
+def test_isolated_obstacles_are_packed():
+    rng = np.random.default_rng(3)
+    xs = rng.integers(-(10**6), 10**6, 50_000)
+    ys = rng.integers(-(10**6), 10**6, 50_000)
+    grid = ObstacleGrid()
+    grid.add_many(xs, ys)
+
+    expected = {Position(int(x), int(y)) for x, y in zip(xs, ys, strict=True)}
+    assert len(grid) == len(expected)
+    assert grid.nbytes / len(grid) < 20
+    assert _set_bytes_per_cell(expected) / (grid.nbytes / len(grid)) > 4
+
+
+def test_clustered_obstacles_take_two_bytes_each():
+    rng = np.random.default_rng(4)
+    tile_xs = rng.choice(np.arange(-1000, 1000), 500, replace=False)
+    tile_ys = rng.integers(-1000, 1000, 500)
+    xs = np.repeat(tile_xs * TILE_SIZE, 100) + rng.integers(0, TILE_SIZE, 50_000)
+    ys = np.repeat(tile_ys * TILE_SIZE, 100) + rng.integers(0, TILE_SIZE, 50_000)
+    grid = ObstacleGrid()
+    grid.add_many(xs, ys)
+
+    assert grid.tile_count == 500
+    assert grid.nbytes / len(grid) < 2.5
+
+
+def test_packed_and_bitmap_tiles_agree_with_a_set():
+    rng = np.random.default_rng(5)
+    # Tiles around the origin fill up into bitmaps, the others stay packed
+    xs = np.r_[rng.integers(0, 128, 2 * SPARSE_LIMIT), rng.integers(-5000, 5000, 3000)]
+    ys = np.r_[rng.integers(0, 64, 2 * SPARSE_LIMIT), rng.integers(-5000, 5000, 3000)]
+    grid = ObstacleGrid()
+    grid.add_many(xs, ys)
+    expected = {Position(int(x), int(y)) for x, y in zip(xs, ys, strict=True)}
+
+    for cell in list(expected)[:500]:
+        grid.discard(cell)
+        expected.discard(cell)
+    for x, y in rng.integers(-5000, 5000, (2 * COMPACT_TILES, 2)).tolist():
+        grid.add(Position(x, y))
+        expected.add(Position(x, y))
+
+    assert len(grid) == len(expected)
+    assert set(grid) == expected
+    assert sum(1 for _ in grid.tiles()) == grid.tile_count
+    probe_xs = rng.integers(-5000, 5000, 5000)
+    probe_ys = rng.integers(-5000, 5000, 5000)
+    assert grid.contains_many(probe_xs, probe_ys).tolist() == [
+        Position(int(x), int(y)) in expected
+        for x, y in zip(probe_xs, probe_ys, strict=True)
+    ]
+    for cell in list(expected)[:200]:
+        assert cell in grid
+        assert grid.any_in(cell.x, cell.y, cell.x, cell.y)
+    for x, y in rng.integers(-5000, 5000, (200, 2)).tolist():
+        box = [
+            Position(x + dx, y + dy) in expected for dx in range(40) for dy in range(3)
+        ]
+        assert grid.any_in(x, y, x + 39, y + 2) == any(box)
+
+
+def test_any_in_rectangle():
+    grid = ObstacleGrid([Position(5, 5), Position(-100, 300)])
+
+    assert grid.any_in(5, 5, 5, 5)
+    assert grid.any_in(0, 0, 10, 10)
+    assert not grid.any_in(6, 0, 10, 10)
+    assert not grid.any_in(0, 6, 63, 63)
+    assert grid.any_in(-128, 256, -64, 319)
+    assert grid.any_in(-(10**9), -(10**9), 10**9, 10**9)
+    assert not grid.any_in(10, 10, 0, 0)
+
+    grid.discard(Position(5, 5))
+    assert not grid.any_in(0, 0, 63, 63)
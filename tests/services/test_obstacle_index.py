@@ -0,0 +1,86 @@
+import pytest
+
+from src.models.obstacle import Obstacle
+from src.models.robot import Direction, Position, Robot
+from src.services.obstacle_index import ObstacleIndex, record_obstacle_change
+from src.services.robot_service import RobotCommandExecutor
+
+
+@pytest.mark.asyncio
+async def test_load_from_database(async_db_session):
+    async_db_session.add_all([
+        Obstacle(position_x=1, position_y=4),
+        Obstacle(position_x=3, position_y=5),
+    ])
+    await async_db_session.commit()
+
+    index = ObstacleIndex()
+    assert not index.is_loaded
+
+    await index.ensure_loaded(async_db_session)
+    assert index.is_loaded
+    assert index == {Position(1, 4), Position(3, 5)}
+    assert Position(1, 4) in index
+    assert Position(0, 0) not in index
+
+
+def test_writes_bump_version():
+    index = ObstacleIndex()
+    index.replace([Position(0, 1)])
+    version = index.version
+
+    index.add(Position(0, 2))
+    assert index.version == version + 1
+    index.discard(Position(0, 1))
+    assert index.version == version + 2
+    assert set(index) == {Position(0, 2)}
+
+    index.invalidate()
+    assert not index.is_loaded
+    assert index.version == version + 3
+
+
+def test_executor_queries_index_directly():
+    index = ObstacleIndex()
+    index.replace([Position(0, 2)])
+
+    robot = Robot((0, 0), Direction.NORTH)
+    result = RobotCommandExecutor.execute_commands(robot, "FFF", obstacles=index)
+    assert result["position"] == {"x": 0, "y": 1}
+    assert result["obstacle_detected"] is True
+
+
+@pytest.mark.asyncio
+async def test_refresh_applies_change_feed(async_db_session):
+    async_db_session.add(Obstacle(position_x=1, position_y=1))
+    await async_db_session.commit()
+    index = ObstacleIndex()
+    await index.ensure_loaded(async_db_session)
+
+    # Another worker adds one obstacle and removes another
+    await record_obstacle_change(async_db_session, "add", Position(2, 2))
+    await record_obstacle_change(async_db_session, "remove", Position(1, 1))
+    await async_db_session.commit()
+
+    await index.refresh(async_db_session, max_age=60)
+    assert Position(2, 2) not in index
+
+    version = index.version
+    await index.refresh(async_db_session, max_age=0)
+    assert set(index) == {Position(2, 2)}
+    assert index.map_version == 2
+    assert index.version > version
+
+
+@pytest.mark.asyncio
+async def test_refresh_reloads_after_bulk_change(async_db_session):
+    index = ObstacleIndex()
+    await index.ensure_loaded(async_db_session)
+
+    async_db_session.add(Obstacle(position_x=5, position_y=5))
+    await record_obstacle_change(async_db_session, "reload")
+    await async_db_session.commit()
+
+    await index.refresh(async_db_session, max_age=0)
+    assert set(index) == {Position(5, 5)}
+    assert index.map_version == 1
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import select
+
+from src.models.obstacle import Obstacle
+from src.models.robot_state import RobotState
+from src.services.obstacle_index import obstacle_index
+from src.services.obstacle_ingest import (
+    GRID_HEADER,
+    GRID_MAGIC,
+    IngestError,
+    ingest_obstacles,
+    read_obstacles,
+)
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _read(ingest_format, *chunks, chunk_size=100):
+    return [
+        batch
+        async for batch in read_obstacles(
+            _chunks(*chunks), ingest_format, chunk_size=chunk_size
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_csv_across_chunk_boundaries():
+    batches = await _read("csv", b"x,y\n1,2\n3", b",4\n\n5,6", chunk_size=2)
+    assert batches == [[(1, 2), (3, 4)], [(5, 6)]]
+
+
+@pytest.mark.asyncio
+async def test_read_ndjson():
+    batches = await _read("ndjson", b'{"x": 1, "y": -2}\n{"x": 0, "y": 7}\n')
+    assert batches == [[(1, -2), (0, 7)]]
+
+
+@pytest.mark.asyncio
+async def test_read_grid():
+    header = GRID_HEADER.pack(GRID_MAGIC, -1, 10, 3, 2)
+    cells = bytes([1, 0, 0, 0, 0, 1])
+    batches = await _read("grid", header + cells[:4], cells[4:])
+    assert batches == [[(-1, 10), (1, 11)]]
+
+
+@pytest.mark.asyncio
+async def test_invalid_input_is_rejected():
+    with pytest.raises(IngestError, match="line 2"):
+        await _read("csv", b"1,2\nnot,a number\n")
+    with pytest.raises(IngestError):
+        await _read("grid", GRID_HEADER.pack(GRID_MAGIC, 0, 0, 4, 4) + b"\x00")
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_existing_obstacles(async_db_session):
+    async_db_session.add(Obstacle(position_x=1, position_y=2))
+    await async_db_session.commit()
+    await obstacle_index.ensure_loaded(async_db_session)
+    version = obstacle_index.version
+
+    result = await ingest_obstacles(
+        async_db_session,
+        read_obstacles(_chunks(b"1,2\n3,4\n3,4\n5,6\n"), "csv", chunk_size=2),
+    )
+
+    assert (result.received, result.inserted) == (4, 2)
+    rows = await async_db_session.execute(
+        select(Obstacle.position_x, Obstacle.position_y).order_by(Obstacle.id)
+    )
+    assert rows.all() == [(1, 2), (3, 4), (5, 6)]
+    assert not obstacle_index.is_loaded
+    assert obstacle_index.version > version
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_cells_occupied_by_robots(async_db_session):
+    async_db_session.add_all([
+        RobotState(position_x=1, position_y=1, direction="NORTH"),
+        RobotState(robot_id=4, position_x=2, position_y=2, direction="EAST"),
+    ])
+    await async_db_session.commit()
+
+    result = await ingest_obstacles(
+        async_db_session,
+        read_obstacles(_chunks(b"1,1\n2,2\n3,3\n"), "csv", chunk_size=2),
+    )
+
+    assert (result.received, result.inserted, result.occupied) == (3, 1, 2)
+    rows = await async_db_session.execute(
+        select(Obstacle.position_x, Obstacle.position_y)
+    )
+    assert rows.all() == [(3, 3)]
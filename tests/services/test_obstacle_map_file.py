@@ -0,0 +1,100 @@
+import pytest
+
+from src.models.obstacle import Obstacle
+from src.models.robot import Position
+from src.services.obstacle_grid import ObstacleGrid
+from src.services.obstacle_index import (
+    ObstacleIndex,
+    build_map_file,
+    record_obstacle_change,
+)
+from src.services.obstacle_map_file import (
+    MapFileError,
+    ObstacleMapFile,
+    write_map_file,
+)
+
+
+def test_map_file_round_trip(tmp_path):
+    cells = {Position(0, 0), Position(100, 7), Position(-70, -3), Position(-1, 500)}
+    path = tmp_path / "obstacles.map"
+    write_map_file(path, ObstacleGrid(cells).tiles(), len(cells), map_version=9)
+
+    map_file = ObstacleMapFile(path)
+    assert map_file.map_version == 9
+    assert map_file.count == 4
+
+    grid = ObstacleGrid(base=map_file)
+    assert len(grid) == 4
+    assert set(grid) == cells
+    assert Position(100, 7) in grid
+    assert Position(100, 8) not in grid
+    assert grid.contains_many([0, 1, -70], [0, 0, -3]).tolist() == [True, False, True]
+    assert grid.nbytes == 0
+
+
+def test_writes_shadow_the_mapped_tiles(tmp_path):
+    path = tmp_path / "obstacles.map"
+    write_map_file(path, ObstacleGrid([Position(1, 1)]).tiles(), 1, map_version=1)
+    grid = ObstacleGrid(base=ObstacleMapFile(path))
+
+    grid.discard(Position(1, 1))
+    grid.add(Position(2, 2))
+    assert set(grid) == {Position(2, 2)}
+    assert len(grid) == 1
+    assert grid.tile_count == 1
+
+    grid.discard(Position(2, 2))
+    assert Position(1, 1) not in grid
+    assert list(grid) == []
+    assert Position(1, 1) in ObstacleGrid(base=ObstacleMapFile(path))
+
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / "obstacles.map"
+    write_map_file(path, ObstacleGrid([Position(1, 1)]).tiles(), 1, map_version=1)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(MapFileError):
+        ObstacleMapFile(path)
+
+
+@pytest.mark.asyncio
+async def test_index_maps_file_and_follows_swaps(async_db_session, tmp_path):
+    async_db_session.add(Obstacle(position_x=1, position_y=4))
+    await record_obstacle_change(async_db_session, "reload")
+    await async_db_session.commit()
+    path = tmp_path / "obstacles.map"
+    assert await build_map_file(async_db_session, path) == 1
+
+    # Not in the file and not announced on the feed: only a rebuild shows it
+    async_db_session.add(Obstacle(position_x=8, position_y=8))
+    await record_obstacle_change(async_db_session, "add", Position(3, 3))
+    await async_db_session.commit()
+
+    index = ObstacleIndex(map_file=str(path))
+    await index.ensure_loaded(async_db_session)
+    assert set(index) == {Position(1, 4), Position(3, 3)}
+    assert index.map_version == 2
+
+    await build_map_file(async_db_session, path)
+    await index.refresh(async_db_session, max_age=0)
+    assert set(index) == {Position(1, 4), Position(8, 8)}
+
+
+@pytest.mark.asyncio
+async def test_index_falls_back_to_database(async_db_session, tmp_path):
+    path = tmp_path / "obstacles.map"
+    await build_map_file(async_db_session, path)
+
+    # A bulk load after the file was built makes it stale
+    async_db_session.add(Obstacle(position_x=5, position_y=5))
+    await record_obstacle_change(async_db_session, "reload")
+    await async_db_session.commit()
+
+    index = ObstacleIndex(map_file=str(path))
+    await index.ensure_loaded(async_db_session)
+    assert set(index) == {Position(5, 5)}
+
+    missing = ObstacleIndex(map_file=str(tmp_path / "missing.map"))
+    await missing.ensure_loaded(async_db_session)
+    assert set(missing) == {Position(5, 5)}
@@ -0,0 +1,133 @@
+import pytest
+
+from src.models.robot import Direction, Position, Robot
+from src.models.robot_state import RobotState
+from src.services.occupancy_index import OccupancyIndex
+from src.services.robot_service import RobotCommandExecutor
+
+
+def test_try_move_reserves_and_releases_cells():
+    index = OccupancyIndex()
+    assert index.try_move(1, (0, 0))
+    assert index.try_move(2, (0, 1))
+    assert not index.try_move(2, (0, 0))
+    assert index.position_of(2) == Position(0, 1)
+
+    assert index.try_move(1, (5, 5))
+    assert not index.is_occupied((0, 0))
+    assert index.try_move(2, (0, 0))
+    assert index.position_of(2) == Position(0, 0)
+
+    index.remove(1)
+    assert index.position_of(1) is None
+    assert len(index) == 1
+
+
+def test_blocking_excludes_own_cell():
+    index = OccupancyIndex()
+    obstacles = {Position(3, 3)}
+    assert index.blocking(obstacles, None) is obstacles
+
+    index.try_move(None, (0, 0))
+    index.try_move(7, (0, 2))
+    assert index.blocking(obstacles, 99) is not obstacles
+
+    robot = Robot((0, 0), Direction.NORTH)
+    result = RobotCommandExecutor.execute_commands(
+        robot, "FFF", index.blocking(obstacles, None)
+    )
+    assert result["position"] == {"x": 0, "y": 1}
+    assert result["obstacle_detected"] is True
+
+
+def test_snapshot_is_not_changed_by_later_moves():
+    index = OccupancyIndex()
+    index.try_move(1, (0, 0))
+    index.try_move(2, (4, 4))
+    blocked = index.snapshot().blocking(set(), 1)
+
+    index.try_move(2, (5, 5))
+    index.remove(1)
+    index.try_move(3, (6, 6))
+
+    assert Position(4, 4) in blocked
+    assert Position(5, 5) not in blocked
+    assert Position(6, 6) not in blocked
+    assert Position(0, 0) not in blocked
+
+
+@pytest.mark.asyncio
+async def test_load_from_robot_states(async_db_session):
+    async_db_session.add_all([
+        RobotState(position_x=1, position_y=1, direction="NORTH"),
+        RobotState(robot_id=4, position_x=2, position_y=2, direction="EAST"),
+    ])
+    await async_db_session.commit()
+
+    index = OccupancyIndex()
+    await index.load(async_db_session)
+    assert index.position_of(None) == Position(1, 1)
+    assert index.position_of(4) == Position(2, 2)
+    assert index.is_blocked_for(Position(1, 1), 4)
+    assert not index.is_blocked_for(Position(1, 1), None)
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_robots_moved_by_other_workers(async_db_session):
+    state = RobotState(robot_id=4, position_x=2, position_y=2, direction="EAST")
+    async_db_session.add(state)
+    await async_db_session.commit()
+    index = OccupancyIndex()
+    await index.refresh(async_db_session)
+    assert index.position_of(4) == Position(2, 2)
+
+    # Written by another worker; invisible until the poll interval passes
+    state.position_x = 9
+    await async_db_session.commit()
+    await index.refresh(async_db_session, max_age=60)
+    assert index.position_of(4) == Position(2, 2)
+
+    await index.refresh(async_db_session, max_age=0)
+    assert index.position_of(4) == Position(9, 2)
+    assert not index.is_occupied((2, 2))
+
+
+@pytest.mark.asyncio
+async def test_reload_keeps_reservations_until_settled(async_db_session):
+    state = RobotState(robot_id=1, position_x=0, position_y=0)
+    async_db_session.add(state)
+    await async_db_session.commit()
+    index = OccupancyIndex()
+    await index.load(async_db_session)
+
+    # Reserved, but the state write has not committed yet
+    assert index.try_move(1, (0, 5))
+    await index.load(async_db_session)
+    assert index.position_of(1) == Position(0, 5)
+    assert not index.try_move(2, (0, 5))
+
+    state.position_y = 5
+    await async_db_session.commit()
+    index.settle(1, (0, 5))
+    state.position_y = 7
+    await async_db_session.commit()
+    await index.load(async_db_session)
+    assert index.position_of(1) == Position(0, 7)
+
+
+@pytest.mark.asyncio
+async def test_reload_keeps_reservations_made_while_reading(async_db_session):
+    async_db_session.add(RobotState(robot_id=4, position_x=2, position_y=2))
+    await async_db_session.commit()
+    index = OccupancyIndex()
+    execute = async_db_session.execute
+
+    async def reserve_then_execute(*args, **kwargs):
+        index.try_move(5, (3, 3))
+        return await execute(*args, **kwargs)
+
+    async_db_session.execute = reserve_then_execute
+    await index.refresh(async_db_session, max_age=0)
+
+    assert index.position_of(5) == Position(3, 3)
+    assert index.position_of(4) == Position(2, 2)
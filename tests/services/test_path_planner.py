@@ -0,0 +1,50 @@
+import pytest
+
+from src.models.robot import Direction, Position, Robot
+from src.services.path_planner import PlanningError, plan_path
+from src.services.robot_service import RobotCommandExecutor
+
+
+def _follow(start, direction, commands, obstacles):
+    robot = Robot(start, direction)
+    result = RobotCommandExecutor.execute_commands(robot, commands, obstacles)
+    assert result["obstacle_detected"] is False
+    return robot.position
+
+
+def test_straight_line_and_reverse():
+    plan = plan_path((0, 0), Direction.NORTH, (0, 3), set())
+    assert plan.commands == "FFF"
+    assert plan.cost == 3
+
+    # Backing up is cheaper than turning around
+    assert plan_path((0, 0), Direction.NORTH, (0, -2), set()).commands == "BB"
+    assert plan_path((0, 0), Direction.NORTH, (0, 0), set()).commands == ""
+
+
+def test_turn_costs_are_minimised():
+    plan = plan_path((0, 0), Direction.NORTH, (3, 3), set(), rotation_cost=5)
+    assert plan.cost == 6 + 5
+    assert plan.commands.count("R") + plan.commands.count("L") == 1
+    assert _follow((0, 0), Direction.NORTH, plan.commands, set()) == (3, 3)
+
+
+def test_detours_around_a_wall():
+    wall = {Position(x, 2) for x in range(-3, 4)}
+    plan = plan_path((0, 0), Direction.NORTH, (0, 4), wall)
+    assert _follow((0, 0), Direction.NORTH, plan.commands, wall) == (0, 4)
+    # Around the end of the wall and back: twelve moves and three turns,
+    # backing up along the wall instead of turning around
+    assert plan.cost == 15
+
+
+def test_planning_errors():
+    with pytest.raises(PlanningError, match="blocked"):
+        plan_path((0, 0), Direction.NORTH, (0, 2), {Position(0, 2)})
+
+    boxed_in = {Position(1, 0), Position(-1, 0), Position(0, 1), Position(0, -1)}
+    with pytest.raises(PlanningError, match="unreachable"):
+        plan_path((0, 0), Direction.NORTH, (5, 5), boxed_in)
+
+    with pytest.raises(PlanningError, match="nodes"):
+        plan_path((0, 0), Direction.NORTH, (50, 50), set(), max_nodes=10)
@@ -0,0 +1,74 @@
+from collections import deque
+
+import numpy as np
+
+from src.models.robot import Position
+from src.services.obstacle_grid import ObstacleGrid
+from src.services.obstacle_index import ObstacleIndex
+from src.services.reachability import ReachabilityCache, reachable_cells
+
+
+def _bfs(start, radius, obstacles):
+    seen = {start: 0}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if seen[cell] == radius:
+            continue
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            neighbour = Position(cell.x + dx, cell.y + dy)
+            if neighbour not in seen and neighbour not in obstacles:
+                seen[neighbour] = seen[cell] + 1
+                queue.append(neighbour)
+    return set(seen)
+
+
+def _cells(reachable):
+    return {
+        Position(x, y)
+        for y, first, length in reachable.runs()
+        for x in range(first, first + length)
+    }
+
+
+def test_matches_plain_bfs_around_obstacles():
+    rng = np.random.default_rng(3)
+    obstacles = {
+        Position(int(x), int(y)) for x, y in rng.integers(-12, 12, size=(150, 2))
+    }
+    obstacles.discard(Position(0, 0))
+    index = ObstacleIndex()
+    index.replace(obstacles)
+
+    for container in (obstacles, index):
+        reachable = reachable_cells((0, 0), 10, container)
+        expected = _bfs(Position(0, 0), 10, obstacles)
+        assert _cells(reachable) == expected
+        assert reachable.count == len(expected)
+
+
+def test_open_field_is_a_diamond():
+    reachable = reachable_cells((5, -5), 3, set())
+    assert reachable.count == 1 + 2 * 3 * 4
+    assert reachable.origin == (2, -8)
+    assert reachable.runs()[0] == (-8, 5, 1)
+    assert reachable_cells((0, 0), 0, set()).runs() == [(0, 0, 1)]
+
+
+def test_grid_window_crosses_tiles():
+    cells = [Position(-1, -1), Position(0, 0), Position(63, 64), Position(70, 2)]
+    mask = ObstacleGrid(cells).window(-2, -2, 80, 70)
+    assert set(zip(*np.nonzero(mask), strict=True)) == {
+        (cell.y + 2, cell.x + 2) for cell in cells
+    }
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ReachabilityCache(max_size=2)
+    entry = reachable_cells((0, 0), 1, set())
+    cache.put("a", entry)
+    cache.put("b", entry)
+    assert cache.get("a") is entry
+    cache.put("c", entry)
+    assert cache.get("b") is None
+    assert len(cache) == 2
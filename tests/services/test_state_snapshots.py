@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from src.models.command_history import CommandHistory
+from src.models.robot import Direction, Robot
+from src.models.robot_snapshot import RobotSnapshot
+from src.services.robot_service import RobotCommandExecutor
+from src.services.state_snapshots import (
+    pose_at,
+    replay,
+    run_snapshots,
+    take_snapshots,
+)
+
+START = datetime(2026, 1, 1)
+
+
+def _history(i, command, x=None, y=None, direction=None):
+    return CommandHistory(
+        command=command,
+        position_x=x,
+        position_y=y,
+        direction=direction,
+        executed_at=START + timedelta(minutes=i),
+    )
+
+
+def test_replay_re_executes_unrecorded_commands():
+    robot = replay(
+        Robot((0, 0), Direction.NORTH),
+        [_history(0, "FFR"), _history(1, "F")],
+        obstacles=set(),
+    )
+    assert (robot.position, robot.direction) == ((1, 2), Direction.EAST)
+
+
+def test_replay_prefers_recorded_pose():
+    # The obstacle at (0, 1) was removed since the command ran
+    robot = replay(
+        Robot((0, 0), Direction.NORTH),
+        [_history(0, "FF", 0, 0, "NORTH")],
+        obstacles=set(),
+    )
+    assert robot.position == (0, 0)
+
+
+def test_replay_skips_rows_before_the_last_recorded_pose():
+    rows = [_history(0, "F", 0, 1, "NORTH"), _history(1, "R", 0, 1, "EAST")]
+    rows += [_history(2, "F"), _history(3, "F", direction="EAST")]
+    with patch.object(RobotCommandExecutor, "execute_commands") as execute:
+        execute.side_effect = lambda robot, commands, obstacles: robot.move_forward()
+        robot = replay(Robot((0, 0), Direction.NORTH), rows, obstacles=set())
+
+    assert [call.args[1] for call in execute.call_args_list] == ["F", "F"]
+    assert (robot.position, robot.direction) == ((2, 1), Direction.EAST)
+
+
+@pytest.mark.asyncio
+async def test_take_snapshots_every_n_commands(async_db_session):
+    async_db_session.add_all(_history(i, "F", 0, i + 1, "NORTH") for i in range(5))
+    await async_db_session.commit()
+
+    assert await take_snapshots(async_db_session, None, every=2) == 2
+    assert await take_snapshots(async_db_session, None, every=2) == 0
+
+    result = await async_db_session.execute(
+        select(RobotSnapshot).order_by(RobotSnapshot.id)
+    )
+    snapshots = result.scalars().all()
+    assert [(s.position_y, s.taken_at) for s in snapshots] == [
+        (2, START + timedelta(minutes=1)),
+        (4, START + timedelta(minutes=3)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pose_at_replays_from_nearest_snapshot(async_db_session):
+    # History rows without recorded poses must be re-executed from the snapshot
+    async_db_session.add_all([_history(i, "F") for i in range(4)])
+    await async_db_session.commit()
+    rows = (await async_db_session.execute(select(CommandHistory))).scalars().all()
+    async_db_session.add(
+        RobotSnapshot(
+            history_id=rows[1].id,
+            position_x=10,
+            position_y=10,
+            direction="EAST",
+            taken_at=rows[1].executed_at,
+        )
+    )
+    await async_db_session.commit()
+
+    robot = await pose_at(async_db_session, None, START + timedelta(minutes=3))
+    assert robot.position == (12, 10)
+    robot = await pose_at(async_db_session, None, START + timedelta(minutes=1))
+    assert robot.position == (10, 10)
+    # Before the snapshot, replay starts from the configured start position
+    robot = await pose_at(async_db_session, None, START)
+    assert robot.position == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_pose_at_reads_the_last_recorded_pose(async_db_session):
+    async_db_session.add_all([
+        _history(0, "F", 0, 1, "NORTH"),
+        _history(2, "R", 0, 1, "EAST"),
+        _history(2, "F", 1, 1, "EAST"),
+        # Inserted last, but executed before the others
+        _history(1, "B", 5, 5, "SOUTH"),
+    ])
+    await async_db_session.commit()
+
+    with patch.object(RobotCommandExecutor, "execute_commands") as execute:
+        robot = await pose_at(async_db_session, None, START + timedelta(minutes=5))
+        assert (robot.position, robot.direction) == ((1, 1), Direction.EAST)
+        robot = await pose_at(async_db_session, None, START + timedelta(minutes=1))
+        assert (robot.position, robot.direction) == ((5, 5), Direction.SOUTH)
+    execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_record_each_snapshot_once(async_db_session):
+    rows = [_history(i, "F", 0, i + 1, "NORTH") for i in range(2)]
+    for row in rows:
+        row.robot_id = 1
+    async_db_session.add_all(rows)
+    await async_db_session.commit()
+    assert await take_snapshots(async_db_session, 1, every=2) == 1
+
+    # A second worker that read the snapshots before the first one committed
+    with patch("src.services.state_snapshots.latest_snapshot", return_value=None):
+        assert await take_snapshots(async_db_session, 1, every=2) == 0
+
+    result = await async_db_session.execute(select(RobotSnapshot))
+    assert len(result.scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_task_survives_unexpected_errors(async_session_factory):
+    fleet = AsyncMock(side_effect=[RuntimeError("boom"), asyncio.CancelledError()])
+    with (
+        patch("src.services.state_snapshots.snapshot_fleet", fleet),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await run_snapshots(async_session_factory, interval=0)
+    assert fleet.await_count == 2
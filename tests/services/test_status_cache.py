@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.services.status_cache import RobotStatus, StatusCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = StatusCache(ttl=60)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return RobotStatus(1, 2, "EAST")
+
+    results = await asyncio.gather(*(cache.get(None, load) for _ in range(20)))
+
+    assert calls == 1
+    assert set(results) == {RobotStatus(1, 2, "EAST")}
+    assert await cache.get(None, load) == RobotStatus(1, 2, "EAST")
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_write_during_load_wins():
+    cache = StatusCache(ttl=60)
+
+    async def load():
+        cache.put(7, RobotStatus(5, 5, "SOUTH"))
+        return RobotStatus(0, 0, "NORTH")
+
+    assert await cache.get(7, load) == RobotStatus(5, 5, "SOUTH")
+    assert cache.peek(7) == RobotStatus(5, 5, "SOUTH")
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_missing_robots_are_not_cached():
+    cache = StatusCache(ttl=1)
+    cache.put(3, RobotStatus(0, 1, "NORTH"))
+
+    with patch("src.services.status_cache.time.monotonic", return_value=1e12):
+        assert cache.peek(3) is None
+
+    async def missing():
+        return None
+
+    assert await cache.get(4, missing) is None
+    assert cache.peek(4) is None
+
+
+def test_etag_follows_content():
+    assert RobotStatus(1, 2, "EAST").etag == RobotStatus(1, 2, "EAST").etag
+    assert RobotStatus(1, 2, "EAST").etag != RobotStatus(2, 1, "EAST").etag
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from src.models.robot import Direction, Position, Robot
+from src.services.obstacle_index import ObstacleIndex
+from src.services.robot_service import RobotCommandExecutor, create_executor
+from src.services.vectorized_executor import VectorizedCommandExecutor
+
+
+def _run_both(start, direction, commands, obstacles):
+    scalar = RobotCommandExecutor.execute_commands(
+        Robot(start, direction), commands, obstacles
+    )
+    robot = Robot(start, direction)
+    vectorized = VectorizedCommandExecutor.execute_commands(robot, commands, obstacles)
+    assert robot.position == (
+        vectorized["position"]["x"],
+        vectorized["position"]["y"],
+    )
+    assert robot.direction.value == vectorized["direction"]
+    return scalar, vectorized
+
+
+@pytest.mark.parametrize(
+    "commands,obstacles",
+    [
+        ("", set()),
+        ("XXXX", set()),
+        ("FXF", set()),
+        ("FFRFLB", set()),
+        ("F", {Position(0, 1)}),
+        ("FFFR", {Position(0, 2)}),
+        ("RRFF", {Position(0, -1)}),
+        ("LLLLBBB", {Position(0, -4)}),
+    ],
+)
+def test_matches_scalar_engine(commands, obstacles):
+    scalar, vectorized = _run_both((0, 0), Direction.NORTH, commands, obstacles)
+    assert vectorized == scalar
+
+
+def test_matches_scalar_engine_on_random_commands():
+    rng = random.Random(42)
+    obstacles = {
+        Position(rng.randint(-15, 15), rng.randint(-15, 15)) for _ in range(120)
+    }
+    obstacles.discard(Position(0, 0))
+    index = ObstacleIndex()
+    index.replace(obstacles)
+
+    for _ in range(200):
+        commands = "".join(rng.choices("FFFBLRX", k=rng.randint(0, 60)))
+        direction = rng.choice(list(Direction))
+        for container in (obstacles, index):
+            scalar, vectorized = _run_both((0, 0), direction, commands, container)
+            assert vectorized == scalar, commands
+
+
+def test_index_writes_seen_by_vectorized_engine():
+    index = ObstacleIndex()
+    index.replace([Position(0, 3)])
+    executor = VectorizedCommandExecutor()
+
+    result = executor.execute_commands(Robot((0, 0), Direction.NORTH), "FFFF", index)
+    assert result["position"] == {"x": 0, "y": 2}
+
+    index.add(Position(0, 1))
+    result = executor.execute_commands(Robot((0, 0), Direction.NORTH), "FFFF", index)
+    assert result["position"] == {"x": 0, "y": 0}
+    assert result["obstacle_detected"] is True
+
+
+def test_create_executor():
+    assert isinstance(create_executor("scalar"), RobotCommandExecutor)
+    assert isinstance(create_executor("numpy"), VectorizedCommandExecutor)
+    with pytest.raises(ValueError):
+        create_executor("gpu")
+
+
+def test_cells_beyond_32_bits_do_not_alias_obstacles():
+    # (2**32, 1) packs to the same key as (0, 1)
+    obstacles = {Position(0, 1), Position(2**32 + 1, 0)}
+    robot = Robot((2**32, 0), Direction.NORTH)
+
+    result = VectorizedCommandExecutor.execute_commands(robot, "FRF", obstacles)
+
+    assert result["position"] == {"x": 2**32 + 1, "y": 1}
+    assert result["obstacle_detected"] is False
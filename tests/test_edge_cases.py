@@ -1,5 +1,5 @@
 from src.models.robot import Direction, Position, Robot
-from src.services.robot_service import RobotCommandExecutor
+from src.services.robot_service import RobotCommandExecutor, Trajectory
 
 
 def test_robot_at_boundary_positions():
@@ -91,3 +91,43 @@ def test_consecutive_obstacle_encounters():
     result1 = executor.execute_commands(robot, "F", obstacles=obstacles)
     assert result1["position"] == {"x": 0, "y": 0}
     assert result1["obstacle_detected"] is True
+
+
+def test_iter_steps_yields_every_command_lazily():
+    robot = Robot((0, 0), Direction.NORTH)
+    steps = RobotCommandExecutor.iter_steps(robot, "FRXF")
+
+    first = next(steps)
+    assert first == {
+        "step": 0,
+        "command": "F",
+        "position": {"x": 0, "y": 1},
+        "direction": "NORTH",
+        "obstacle_detected": False,
+    }
+    assert [s["position"] for s in steps] == [
+        {"x": 0, "y": 1},
+        {"x": 0, "y": 1},
+        {"x": 1, "y": 1},
+    ]
+
+
+def test_trajectory_records_the_steps_of_iter_steps():
+    obstacles = {Position(2, 3)}
+    trajectory = Trajectory()
+    result = trajectory.record(Robot((0, 0), Direction.NORTH), "F3RF2L", obstacles)
+
+    expected = list(
+        RobotCommandExecutor.iter_steps(
+            Robot((0, 0), Direction.NORTH), "FFFRFFL", obstacles
+        )
+    )
+    assert list(trajectory.steps()) == expected
+    assert result == {
+        "position": expected[-1]["position"],
+        "direction": expected[-1]["direction"],
+        "obstacle_detected": True,
+    }
+
+    trajectory.record(Robot((0, 0), Direction.NORTH), "", obstacles)
+    assert list(trajectory.steps()) == []
@@ -0,0 +1,26 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src import main
+from src.services.obstacle_index import obstacle_index
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_enabled", [True, False])
+async def test_startup_loads_obstacles_only_when_cached(
+    monkeypatch, async_session_factory, cache_enabled
+):
+    monkeypatch.setattr(main.settings, "OBSTACLE_CACHE_ENABLED", cache_enabled)
+    monkeypatch.setattr(main.settings, "SNAPSHOT_INTERVAL", 0)
+    monkeypatch.setattr(main.settings, "HISTORY_WRITE_BEHIND", False)
+    monkeypatch.setattr(main, "initialize_database", AsyncMock())
+    monkeypatch.setattr(main, "AsyncSessionLocal", async_session_factory)
+    monkeypatch.setattr(main, "engine", AsyncMock())
+    load = AsyncMock()
+    monkeypatch.setattr(obstacle_index, "load", load)
+
+    async with main.lifespan(main.app):
+        pass
+
+    assert load.await_count == int(cache_enabled)